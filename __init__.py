@@ -6,4 +6,10 @@ if str(project_root) not in sys.path:
     sys.path.insert(0, str(project_root))
     
 from .app import get_factor_library
-factor_lib = get_factor_library()
\ No newline at end of file
+
+
+def __getattr__(name):
+    """首次访问 factor_lib 时才加载配置并创建因子库"""
+    if name == "factor_lib":
+        return get_factor_library()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
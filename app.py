@@ -7,6 +7,8 @@
 3. 提供全局访问接口
 """
 
+import copy
+from functools import lru_cache
 from pathlib import Path
 from typing import Optional, Dict, Any
 import yaml
@@ -16,6 +18,15 @@ from evaluation.engine import EvaluatorEngine
 from factor_library import FactorLibrary, FactorStore, AdmissionRule
 
 
+@lru_cache(maxsize=8)
+def _load_yaml(path_str: str, mtime_ns: int, size: int) -> Dict[str, Any]:
+    """读取并解析 YAML 配置文件，以 (路径, 修改时间, 文件大小) 为键缓存，文件修改后自动重新解析
+    返回的字典由所有调用方共享，不可原地修改
+    """
+    with open(path_str, "r", encoding="utf-8") as f:
+        return yaml.safe_load(f)
+
+
 class AppConfig:
     """应用配置管理"""
     
@@ -37,13 +48,14 @@ class AppConfig:
             # 默认配置文件路径
             config_path = Path(__file__).parent / "config.yaml"
         
-        config_path = Path(config_path)
+        config_path = Path(config_path).resolve()
         
         if not config_path.exists():
             raise FileNotFoundError(f"配置文件不存在: {config_path}")
         
-        with open(config_path, "r", encoding="utf-8") as f:
-            config = yaml.safe_load(f)
+        stat = config_path.stat()
+        # 返回副本，调用方修改配置不会影响缓存中的解析结果
+        config = copy.deepcopy(_load_yaml(str(config_path), stat.st_mtime_ns, stat.st_size))
         
         cls._config = config
         return config
@@ -79,8 +91,13 @@ class AppConfig:
         if cls._factor_lib_instance is not None and not force_reload:
             return cls._factor_lib_instance
         
-        # 加载配置
-        config = cls.load_config(config_path)
+        # 强制重新加载时丢弃已缓存的配置
+        if force_reload:
+            _load_yaml.cache_clear()
+            cls._config = None
+        
+        # 加载配置（未指定路径时复用已加载的默认配置）
+        config = cls.load_config(config_path) if config_path is not None else cls.get_config()
         
         # 解析存储配置
         storage_config = config.get("storage", {})
@@ -101,6 +118,13 @@ class AppConfig:
             # 相对于当前工作目录
             base_dir = Path(base_dir_str).resolve()
         
+        # 因子计算结果的磁盘缓存目录（可选，相对于 base_dir）
+        cache_dir_str = storage_config.get("cache_dir")
+        cache_dir = base_dir / cache_dir_str if cache_dir_str else None
+        # 缓存目录大小上限（MB），超出时淘汰最久未使用的结果；null 表示不限制
+        cache_max_mb = storage_config.get("cache_max_mb", 2048)
+        cache_max_bytes = int(cache_max_mb * 1024 ** 2) if cache_max_mb is not None else None
+        
         # 创建存储实例
         manual_store = FactorStore(
             base_dir=base_dir / manual_dir,
@@ -131,6 +155,8 @@ class AppConfig:
             factor_engine=factor_engine,
             evaluator_engine=evaluator_engine,
             admission_rule=admission_rule,
+            cache_dir=cache_dir,
+            cache_max_bytes=cache_max_bytes,
         )
         
         return cls._factor_lib_instance
@@ -140,6 +166,7 @@ class AppConfig:
         """重置实例（主要用于测试）"""
         cls._factor_lib_instance = None
         cls._config = None
+        _load_yaml.cache_clear()
 
 
 # 便捷的全局访问函数
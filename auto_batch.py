@@ -9,33 +9,136 @@
 5. 生成评价报告
 """
 
+from __future__ import annotations
+
+import os
 import sys
 import json
 import hashlib
+import logging
 import argparse
+import traceback
+from collections import ChainMap
+from operator import itemgetter
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
-from typing import Dict, List, Optional, Set
+from typing import TYPE_CHECKING, Dict, Iterator, List, Optional, Set, Tuple
 import pandas as pd
 from datetime import datetime
 
-# 导入所有 auto 因子
-import factors.auto  # noqa: F401
-# 注册自定义因子
+# 因子注册、评价引擎（scipy/matplotlib/numba）等重依赖延迟到首次使用时导入，
+# 使 --help 和参数错误无需支付导入开销
+if TYPE_CHECKING:
+    from factor_engine import FactorEngine, FactorSpec
+    from evaluation.engine import EvaluatorEngine
+    from evaluation.interfaces import EvalResult
+
+# orjson 可选：可用时用于更快地读写 hash 记录
 try:
-    import factors.auto_factors  # noqa: F401
+    import orjson
 except ImportError:
-    pass
+    orjson = None
+
+
+logger = logging.getLogger(__name__)
+
+
+def _configure_logging(level: str = "INFO") -> None:
+    """
+    配置本脚本的日志输出：输出到 stdout 的 StreamHandler，只输出消息本身
+    
+    Args:
+        level: 日志级别名称，如 DEBUG / INFO / WARNING
+    """
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(handler)
+    logger.setLevel(level)
+    logger.propagate = False
+
+
+# 摘要/入库判断用到的指标及其缺省值
+_METRIC_DEFAULTS = {
+    "rank_ic_mean": 0.0,
+    "rank_ic_ir": 0.0,
+    "group_ls_mean": 0.0,
+    "top_turnover_20_mean": 0.0,
+    "monotonic_mean": 0.0,
+}
+_get_metrics = itemgetter(*_METRIC_DEFAULTS)
 
-from data_manager import LoacalDatasource
-from factor_engine import list_factors, FactorEngine, FactorSpec
-from evaluation.engine import EvaluatorEngine
-from evaluation.interfaces import EvalResult
-from app import get_factor_library, get_config
+
+def _unpack_metrics(metrics: Dict[str, float]) -> Tuple[float, ...]:
+    """一次取出 (rank_ic, rank_ic_ir, group_ls, turnover, monotonic)，缺失时取缺省值"""
+    return _get_metrics(ChainMap(metrics, _METRIC_DEFAULTS))
+
+
+def _import_factor_modules() -> None:
+    """导入所有 auto 因子模块（导入时通过装饰器完成注册）"""
+    import factors.auto  # noqa: F401
+    # 注册自定义因子
+    try:
+        import factors.auto_factors  # noqa: F401
+    except ImportError:
+        pass
+
+
+# 子进程中共享的基础数据、未来收益表以及主进程的引擎（由 initializer 注入一次，
+# 避免每个任务重复传输和计算，并保证并行评价与串行评价使用同一套引擎配置）
+_WORKER_DF: Optional[pd.DataFrame] = None
+_WORKER_RET_DF: Optional[pd.DataFrame] = None
+_WORKER_FACTOR_ENGINE: Optional[FactorEngine] = None
+_WORKER_EVALUATOR_ENGINE: Optional[EvaluatorEngine] = None
+
+
+def _init_worker(
+    df: pd.DataFrame,
+    ret_df: pd.DataFrame,
+    factor_engine: FactorEngine,
+    evaluator_engine: EvaluatorEngine,
+):
+    """进程池初始化：每个子进程只接收一次基础数据、未来收益表和因子库配置的引擎"""
+    global _WORKER_DF, _WORKER_RET_DF, _WORKER_FACTOR_ENGINE, _WORKER_EVALUATOR_ENGINE
+    _WORKER_DF = df
+    _WORKER_RET_DF = ret_df
+    _WORKER_FACTOR_ENGINE = factor_engine
+    _WORKER_EVALUATOR_ENGINE = evaluator_engine
+
+
+def _evaluate_factor_worker(
+    factor_spec: FactorSpec,
+    horizons: List[int],
+) -> Tuple[Dict[int, EvalResult], Optional[str]]:
+    """
+    在子进程中计算并评价单个因子（顶层函数，便于 pickle）
+    
+    Args:
+        factor_spec: 因子规格
+        horizons: 评价周期列表
+        
+    Returns:
+        (评价结果字典 {horizon: EvalResult}, 错误堆栈；成功时为 None)
+    """
+    try:
+        factor = _WORKER_FACTOR_ENGINE.compute_one(_WORKER_DF, factor_spec)
+        reports = _WORKER_EVALUATOR_ENGINE.evaluate_multi_horizons(
+            df=_WORKER_DF,
+            factor=factor,
+            horizons=horizons,
+            evaluator="common_eval",
+            ret_df=_WORKER_RET_DF,
+        )
+        return reports, None
+    except Exception:
+        return {}, traceback.format_exc()
 
 
 class AutoFactorProcessor:
     """自动因子处理器"""
     
+    # 每处理多少个因子落盘一次 hash 记录（其余时间只更新内存）
+    HASH_SAVE_INTERVAL = 50
+    
     def __init__(
         self,
         data_path: str = "./data/daily_price.parquet",
@@ -45,6 +148,7 @@ class AutoFactorProcessor:
         hash_record_path: str = "./factor_hash_records.json",
         force_reprocess: bool = False,
         factor_names: Optional[List[str]] = None,
+        n_jobs: int = 1,
     ):
         """
         初始化处理器
@@ -57,6 +161,7 @@ class AutoFactorProcessor:
             hash_record_path: hash 记录文件路径
             force_reprocess: 是否强制重新处理所有因子
             factor_names: 指定处理的因子名称列表，None 表示处理所有因子
+            n_jobs: 并行评价的进程数，1 表示串行，-1 表示使用全部 CPU 核心
         """
         self.data_path = data_path
         self.start_date = start_date
@@ -65,42 +170,99 @@ class AutoFactorProcessor:
         self.hash_record_path = Path(hash_record_path)
         self.force_reprocess = force_reprocess
         self.factor_names = set(factor_names) if factor_names else None
+        self.n_jobs = n_jobs if n_jobs > 0 else (os.cpu_count() or 1)
         
         # Hash 记录管理
         self.hash_records: Dict[str, str] = self._load_hash_records()
+        self._hash_dirty_count = 0
         
         # 初始化组件
-        print("=" * 80)
-        print("初始化自动因子处理器")
-        print("=" * 80)
+        logger.info("=" * 80)
+        logger.info("初始化自动因子处理器")
+        logger.info("=" * 80)
         
-        # 加载数据
-        print(f"\n加载数据: {data_path}")
-        datasource = LoacalDatasource(file_path=data_path)
-        self.df = datasource.load_data(start=start_date, end=end_date)
-        print(f"✓ 数据加载完成: {len(self.df)} 行")
+        # 数据延迟到首次需要时加载（所有因子都被跳过时无需读取数据）
+        self._df: Optional[pd.DataFrame] = None
+        # 所有因子共用的未来收益表，首次评价时计算
+        self._ret_df: Optional[pd.DataFrame] = None
+        # 需要加载的字段，None 表示全部字段
+        self._data_fields: Optional[List[str]] = None
         
-        # 初始化引擎
-        self.factor_engine = FactorEngine()
-        self.evaluator_engine = EvaluatorEngine()
+        # 注册所有 auto 因子及自定义因子
+        _import_factor_modules()
+        from app import get_factor_library, get_config
         
         # 初始化因子库
         self.factor_lib = get_factor_library()
         config = get_config()
         self.admission_rule = self.factor_lib.admission_rule
         
-        print(f"✓ 因子库初始化完成")
-        print(f"  - 入库规则: |IC| >= {self.admission_rule.min_rank_ic}, |IR| >= {self.admission_rule.min_rank_ic_ir}, "
-              f"换手率/周期 <= {self.admission_rule.max_top_turnover_20_mean}, |单调性| >= {self.admission_rule.min_monotonic_mean}")
-        print(f"  - 评价周期: {self.horizons}")
-        print(f"  - Hash 记录: {len(self.hash_records)} 个已处理因子")
-        print(f"  - 强制重新处理: {'是' if self.force_reprocess else '否'}")
-        if self.factor_names:
-            print(f"  - 指定因子: {len(self.factor_names)} 个")
-        print(f"  - Hash 记录: {len(self.hash_records)} 个已处理因子")
-        print(f"  - 强制重新处理: {'是' if self.force_reprocess else '否'}")
+        # 复用因子库已创建的引擎，保证评价与入库使用同一套配置
+        self.factor_engine = self.factor_lib.factor_engine
+        self.evaluator_engine = self.factor_lib.evaluator_engine
+        
+        # 已入库因子名称（只扫描一次目录，入库成功时增量更新）
+        self._existing_names: Set[str] = set(self.factor_lib.iter_entry_names())
+        
+        logger.info(f"✓ 因子库初始化完成")
+        logger.info(f"  - 入库规则: |IC| >= {self.admission_rule.min_rank_ic}, |IR| >= {self.admission_rule.min_rank_ic_ir}, "
+                    f"换手率/周期 <= {self.admission_rule.max_top_turnover_20_mean}, |单调性| >= {self.admission_rule.min_monotonic_mean}")
+        logger.info(f"  - 评价周期: {self.horizons}")
+        logger.info(f"  - 并行进程数: {self.n_jobs}")
+        logger.info(f"  - Hash 记录: {len(self.hash_records)} 个已处理因子")
+        logger.info(f"  - 强制重新处理: {'是' if self.force_reprocess else '否'}")
         if self.factor_names:
-            print(f"  - 指定因子: {len(self.factor_names)} 个")
+            logger.info(f"  - 指定因子: {len(self.factor_names)} 个")
+    
+    @property
+    def df(self) -> pd.DataFrame:
+        """基础数据，首次访问时加载"""
+        return self._ensure_data_loaded()
+    
+    def _ensure_data_loaded(self) -> pd.DataFrame:
+        """
+        确保基础数据已加载
+        
+        Returns:
+            MultiIndex(date, code) 的基础数据
+        """
+        if self._df is None:
+            logger.info(f"\n加载数据: {self.data_path}")
+            from data_manager import LoacalDatasource
+            datasource = LoacalDatasource(file_path=self.data_path, prefetch=True)
+            self._df = datasource.load_data(
+                start=self.start_date,
+                end=self.end_date,
+                fields=self._data_fields,
+            )
+            logger.info(f"✓ 数据加载完成: {len(self._df)} 行")
+        return self._df
+    
+    @property
+    def ret_df(self) -> pd.DataFrame:
+        """所有评价周期的未来收益表，首次访问时由基础数据计算"""
+        if self._ret_df is None:
+            from evaluation import build_forward_returns
+            self._ret_df = build_forward_returns(self.df, self.horizons)
+        return self._ret_df
+    
+    @staticmethod
+    def _collect_required_fields(factor_specs: List[FactorSpec]) -> Optional[List[str]]:
+        """
+        汇总因子所需的字段（含计算收益率用的 close）
+        
+        Args:
+            factor_specs: 因子规格列表
+            
+        Returns:
+            字段列表；任一因子未声明 required_fields 时返回 None（加载全部字段）
+        """
+        fields = {"close"}
+        for spec in factor_specs:
+            if not spec.required_fields:
+                return None
+            fields.update(spec.required_fields)
+        return sorted(fields)
     
     @staticmethod
     def _compute_factor_hash(factor_spec: FactorSpec) -> str:
@@ -113,9 +275,14 @@ class AutoFactorProcessor:
         Returns:
             Hash 字符串
         """
-        # 构造用于计算 hash 的字符串，包含因子的关键属性
-        hash_content = f"{factor_spec.name}|{factor_spec.version}|{factor_spec.func.__code__.co_code}"
-        return hashlib.md5(hash_content.encode()).hexdigest()
+        # 直接对因子的关键属性逐段增量 hash，避免拼接中间字符串
+        h = hashlib.blake2b(digest_size=16)
+        h.update(factor_spec.name.encode())
+        h.update(b"|")
+        h.update(factor_spec.version.encode())
+        h.update(b"|")
+        h.update(factor_spec.func.__code__.co_code)
+        return h.hexdigest()
     
     def _load_hash_records(self) -> Dict[str, str]:
         """
@@ -128,24 +295,42 @@ class AutoFactorProcessor:
             return {}
         
         try:
-            with open(self.hash_record_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            data = self.hash_record_path.read_bytes()
+            if orjson is not None:
+                return orjson.loads(data)
+            return json.loads(data)
         except Exception as e:
-            print(f"警告: 无法加载 hash 记录文件 ({e})，将使用空记录")
+            logger.warning(f"警告: 无法加载 hash 记录文件 ({e})，将使用空记录")
             return {}
     
     def _save_hash_records(self):
         """
-        保存 hash 记录到文件
+        保存 hash 记录到文件（先写临时文件再原子替换）
         """
         try:
             # 确保目录存在
             self.hash_record_path.parent.mkdir(parents=True, exist_ok=True)
             
-            with open(self.hash_record_path, 'w', encoding='utf-8') as f:
-                json.dump(self.hash_records, f, indent=2, ensure_ascii=False)
+            # 紧凑格式（无缩进），文件仍是标准 JSON，旧记录可直接读取
+            if orjson is not None:
+                data = orjson.dumps(self.hash_records)
+            else:
+                data = json.dumps(self.hash_records, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+            
+            tmp_path = self.hash_record_path.with_name(self.hash_record_path.name + ".tmp")
+            tmp_path.write_bytes(data)
+            os.replace(tmp_path, self.hash_record_path)
+            self._hash_dirty_count = 0
         except Exception as e:
-            print(f"        ⚠ 警告: 无法保存 hash 记录 ({e})")
+            logger.warning(f"        ⚠ 警告: 无法保存 hash 记录 ({e})")
+    
+    def _mark_hash_dirty(self):
+        """
+        标记 hash 记录有更新，累计到 HASH_SAVE_INTERVAL 个时落盘一次
+        """
+        self._hash_dirty_count += 1
+        if self._hash_dirty_count >= self.HASH_SAVE_INTERVAL:
+            self._save_hash_records()
     
     def _should_process_factor(self, factor_spec: FactorSpec) -> tuple:
         """
@@ -161,13 +346,13 @@ class AutoFactorProcessor:
         if self.force_reprocess:
             return True, "强制重新处理"
         
-        # 计算当前 hash 值
-        current_hash = self._compute_factor_hash(factor_spec)
-        
-        # 检查是否有历史记录
+        # 检查是否有历史记录（无记录时无需计算 hash）
         if factor_spec.name not in self.hash_records:
             return True, "首次处理"
         
+        # 计算当前 hash 值
+        current_hash = self._compute_factor_hash(factor_spec)
+        
         # 对比 hash 值
         old_hash = self.hash_records[factor_spec.name]
         if old_hash != current_hash:
@@ -175,6 +360,26 @@ class AutoFactorProcessor:
         
         return False, f"代码未变更 (hash: {current_hash[:8]}...)"
     
+    def _partition_factors(
+        self,
+        factor_specs: List[FactorSpec]
+    ) -> Tuple[List[Tuple[FactorSpec, str]], List[Tuple[FactorSpec, str]]]:
+        """
+        在进入主循环前一次性判断所有因子是否需要处理
+        
+        Args:
+            factor_specs: 因子规格列表
+            
+        Returns:
+            (待处理列表, 跳过列表)，元素为 (因子规格, 原因说明)
+        """
+        to_process: List[Tuple[FactorSpec, str]] = []
+        to_skip: List[Tuple[FactorSpec, str]] = []
+        for spec in factor_specs:
+            should_process, reason = self._should_process_factor(spec)
+            (to_process if should_process else to_skip).append((spec, reason))
+        return to_process, to_skip
+    
     def get_auto_factors(self) -> List[FactorSpec]:
         """
         获取所有 auto 因子
@@ -182,12 +387,11 @@ class AutoFactorProcessor:
         Returns:
             因子规格列表
         """
+        from factor_engine import list_factors
         all_factors = list(list_factors())
         
-        # 获取已入库的因子名称
-        existing_manual = {entry.spec.name for entry in self.factor_lib.manual_store.list_entries()}
-        existing_auto = {entry.spec.name for entry in self.factor_lib.auto_store.list_entries()}
-        existing_names = existing_manual | existing_auto
+        # 已入库的因子名称
+        existing_names = self._existing_names
         
         # 筛选未入库的因子
         auto_factors = [f for f in all_factors if f.name not in existing_names]
@@ -196,11 +400,11 @@ class AutoFactorProcessor:
         if self.factor_names:
             auto_factors = [f for f in auto_factors if f.name in self.factor_names]
         
-        print(f"\n找到 {len(all_factors)} 个已注册因子")
-        print(f"  - 已入库: {len(existing_names)} 个")
+        logger.info(f"\n找到 {len(all_factors)} 个已注册因子")
+        logger.info(f"  - 已入库: {len(existing_names)} 个")
         if self.factor_names:
-            print(f"  - 指定处理: {len(self.factor_names)} 个")
-        print(f"  - 待处理: {len(auto_factors)} 个")
+            logger.info(f"  - 指定处理: {len(self.factor_names)} 个")
+        logger.info(f"  - 待处理: {len(auto_factors)} 个")
         
         return auto_factors
     
@@ -217,38 +421,38 @@ class AutoFactorProcessor:
         Returns:
             评价结果字典 {horizon: EvalResult}
         """
-        print(f"\n{'=' * 80}")
-        print(f"处理因子: {factor_spec.name} ({factor_spec.version})")
-        print(f"{'=' * 80}")
+        logger.info(f"\n{'=' * 80}")
+        logger.info(f"处理因子: {factor_spec.name} ({factor_spec.version})")
+        logger.info(f"{'=' * 80}")
         
         try:
             # 计算因子
-            print(f"  [1/2] 计算因子值...")
+            logger.debug(f"  [1/2] 计算因子值...")
             factor = self.factor_engine.compute_one(self.df, factor_spec)
-            print(f"        ✓ 计算完成 (非空值: {factor.notna().sum()})")
+            logger.debug(f"        ✓ 计算完成 (非空值: {factor.notna().sum()})")
             
             # 评价因子
-            print(f"  [2/2] 评价因子表现...")
+            logger.debug(f"  [2/2] 评价因子表现...")
             reports = self.evaluator_engine.evaluate_multi_horizons(
                 df=self.df,
                 factor=factor,
                 horizons=self.horizons,
-                evaluator="common_eval"
+                evaluator="common_eval",
+                ret_df=self.ret_df,
             )
-            print(f"        ✓ 评价完成")
+            logger.info(f"        ✓ 评价完成")
             
             return reports
             
         except Exception as e:
-            print(f"        ✗ 错误: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception(f"        ✗ 错误: {e}")
             return {}
     
     def try_auto_admit(
         self,
         factor_spec: FactorSpec,
-        reports: Dict[int, EvalResult]
+        reports: Dict[int, EvalResult],
+        horizons: Optional[List[int]] = None,
     ) -> bool:
         """
         尝试自动入库
@@ -256,60 +460,68 @@ class AutoFactorProcessor:
         Args:
             factor_spec: 因子规格
             reports: 评价结果
+            horizons: 已排序的周期列表，None 时按 reports 的键排序
             
         Returns:
             是否入库成功
         """
         if not reports:
-            print(f"\n  [入库判断] 跳过（无评价结果）")
+            logger.info(f"\n  [入库判断] 跳过（无评价结果）")
             return False
         
         # 按照从短到长的顺序检查每个周期，找到第一个通过的
-        print(f"\n  [入库判断] 检查各周期评价结果")
+        logger.info(f"\n  [入库判断] 检查各周期评价结果")
+        if horizons is None:
+            horizons = sorted(reports)
         
-        for horizon in sorted(reports.keys()):
+        # 所有周期一次性批量判断是否通过入库规则
+        passed = self.admission_rule.pass_mask(
+            [reports[h].metrics for h in horizons], horizons
+        )
+        first = int(passed.argmax()) if passed.any() else -1
+        
+        # Rank IC 和 IR，换手率，单调性等指标综合判断（明细输出到第一个通过的周期为止）
+        if logger.isEnabledFor(logging.DEBUG):
+            last = first if first >= 0 else len(horizons) - 1
+            for horizon, is_pass in zip(horizons[:last + 1], passed[:last + 1]):
+                rank_ic, rank_ic_ir, _, turnover, monotonic = _unpack_metrics(reports[horizon].metrics)
+                logger.debug(f"        - {horizon:>2}日: Rank IC={rank_ic:>7.4f}, IR={rank_ic_ir:>6.4f}, "
+                             f"换手率/周期={turnover/horizon:>7.4f}, "
+                             f"|单调性|={monotonic:>7.4f}  "
+                             f"{'✓ 通过' if is_pass else '✗ 未通过'}")
+        
+        # 找到第一个通过的周期就使用它
+        if first >= 0:
+            horizon = horizons[first]
             eval_result = reports[horizon]
-            metrics = eval_result.metrics
-            rank_ic = metrics.get("rank_ic_mean", 0.0)
-            rank_ic_ir = metrics.get("rank_ic_ir", 0.0)
+            rank_ic, rank_ic_ir, _, _, _ = _unpack_metrics(eval_result.metrics)
+            logger.info(f"\n  [入库决策] 使用 {horizon} 日评价结果进行入库")
             
-            # 判断是否通过入库规则（传递 metrics 字典和 horizon）
-            is_pass = self.admission_rule.is_pass(metrics, horizon)
+            # 尝试自动入库
+            success = self.factor_lib.auto_admit_from_eval(
+                spec=factor_spec,
+                eval_result=eval_result,
+                description=f"自动挖掘因子 (周期: {horizon}日, Rank IC: {rank_ic:.4f}, IR: {rank_ic_ir:.4f})",
+                tags=["auto", "quantitative", f"horizon_{horizon}"]
+            )
             
-            # print(f"        - {horizon:>2}日: Rank IC={rank_ic:>7.4f}, IR={rank_ic_ir:>6.4f}  {'✓ 通过' if is_pass else '✗ 未通过'}")
-            # Rank IC 和 IR，换手率，单调性等指标综合判断
-            print(f"        - {horizon:>2}日: Rank IC={rank_ic:>7.4f}, IR={rank_ic_ir:>6.4f}, "
-                  f"换手率/周期={metrics.get('top_turnover_20_mean', 0.0)/horizon:>7.4f}, "
-                  f"|单调性|={metrics.get('monotonic_mean', 0.0):>7.4f}  "
-                  f"{'✓ 通过' if is_pass else '✗ 未通过'}")
+            if success:
+                self._existing_names.add(factor_spec.name)
+                logger.info(f"        ✓ 入库成功！")
+            else:
+                logger.info(f"        ✗ 入库失败")
             
-            # 找到第一个通过的周期就使用它
-            if is_pass:
-                print(f"\n  [入库决策] 使用 {horizon} 日评价结果进行入库")
-                
-                # 尝试自动入库
-                success = self.factor_lib.auto_admit_from_eval(
-                    spec=factor_spec,
-                    eval_result=eval_result,
-                    description=f"自动挖掘因子 (周期: {horizon}日, Rank IC: {rank_ic:.4f}, IR: {rank_ic_ir:.4f})",
-                    tags=["auto", "quantitative", f"horizon_{horizon}"]
-                )
-                
-                if success:
-                    print(f"        ✓ 入库成功！")
-                else:
-                    print(f"        ✗ 入库失败")
-                
-                return success
+            return success
         
         # 所有周期都未通过
-        print(f"\n  [入库决策] 所有周期均未达到入库标准，放弃入库")
+        logger.info(f"\n  [入库决策] 所有周期均未达到入库标准，放弃入库")
         return False
     
     def print_summary(
         self,
         factor_spec: FactorSpec,
-        reports: Dict[int, EvalResult]
+        reports: Dict[int, EvalResult],
+        horizons: Optional[List[int]] = None,
     ):
         """
         打印因子评价摘要
@@ -317,18 +529,98 @@ class AutoFactorProcessor:
         Args:
             factor_spec: 因子规格
             reports: 评价结果
+            horizons: 已排序的周期列表，None 时按 reports 的键排序
+        """
+        if not logger.isEnabledFor(logging.INFO):
+            return
+        
+        logger.info(f"\n  [评价摘要]")
+        logger.info(f"  {'周期':>6} | {'Rank IC':>10} | {'IC IR':>10} | {'多空收益':>10} | {'换手率':>10}")
+        logger.info(f"  {'-' * 65}")
+        
+        for horizon in (horizons if horizons is not None else sorted(reports)):
+            rank_ic, rank_ic_ir, group_ls, turnover, _ = _unpack_metrics(reports[horizon].metrics)
+            logger.info(f"  {horizon:>4}日 | "
+                        f"{rank_ic:>10.4f} | "
+                        f"{rank_ic_ir:>10.4f} | "
+                        f"{group_ls:>10.4f} | "
+                        f"{turnover:>10.4f}")
+    
+    def _handle_reports(
+        self,
+        factor_spec: FactorSpec,
+        reports: Dict[int, EvalResult]
+    ) -> bool:
         """
-        print(f"\n  [评价摘要]")
-        print(f"  {'周期':>6} | {'Rank IC':>10} | {'IC IR':>10} | {'多空收益':>10} | {'换手率':>10}")
-        print(f"  {'-' * 65}")
+        处理单个因子的评价结果：打印摘要、尝试入库、更新 hash 记录
         
-        for horizon, report in sorted(reports.items()):
-            m = report.metrics
-            print(f"  {horizon:>4}日 | "
-                  f"{m.get('rank_ic_mean', 0):>10.4f} | "
-                  f"{m.get('rank_ic_ir', 0):>10.4f} | "
-                  f"{m.get('group_ls_mean', 0):>10.4f} | "
-                  f"{m.get('top_turnover_20_mean', 0):>10.4f}")
+        Args:
+            factor_spec: 因子规格
+            reports: 评价结果
+            
+        Returns:
+            是否入库成功
+        """
+        if not reports:
+            return False
+        
+        horizons = sorted(reports)
+        
+        # 打印摘要
+        self.print_summary(factor_spec, reports, horizons)
+        
+        # 尝试自动入库
+        success = self.try_auto_admit(factor_spec, reports, horizons)
+        
+        # 更新 hash 记录（无论是否入库成功，都记录已处理）
+        current_hash = self._compute_factor_hash(factor_spec)
+        self.hash_records[factor_spec.name] = current_hash
+        self._mark_hash_dirty()
+        logger.info(f"        ✓ Hash 已更新: {current_hash[:16]}...")
+        
+        return success
+    
+    def _evaluate_parallel(
+        self,
+        factor_specs: List[FactorSpec]
+    ) -> Iterator[Tuple[FactorSpec, Dict[int, EvalResult]]]:
+        """
+        使用进程池并行评价多个因子，按完成顺序返回结果
+        
+        Args:
+            factor_specs: 待评价的因子规格列表
+            
+        Yields:
+            (因子规格, 评价结果字典)
+        """
+        if not factor_specs:
+            return
+        
+        max_workers = min(self.n_jobs, len(factor_specs))
+        logger.info(f"\n并行评价 {len(factor_specs)} 个因子 (进程数: {max_workers})")
+        
+        with ProcessPoolExecutor(
+            max_workers=max_workers,
+            initializer=_init_worker,
+            initargs=(self.df, self.ret_df, self.factor_engine, self.evaluator_engine),
+        ) as executor:
+            futures = {
+                executor.submit(_evaluate_factor_worker, spec, self.horizons): spec
+                for spec in factor_specs
+            }
+            for future in as_completed(futures):
+                factor_spec = futures[future]
+                reports, error = future.result()
+                
+                logger.info(f"\n{'=' * 80}")
+                logger.info(f"处理因子: {factor_spec.name} ({factor_spec.version})")
+                logger.info(f"{'=' * 80}")
+                if error:
+                    logger.error(f"        ✗ 错误:\n{error}")
+                else:
+                    logger.info(f"        ✓ 评价完成")
+                
+                yield factor_spec, reports
     
     def process_all(self) -> Dict[str, bool]:
         """
@@ -340,70 +632,76 @@ class AutoFactorProcessor:
         auto_factors = self.get_auto_factors()
         
         if not auto_factors:
-            print("\n没有待处理的因子")
+            logger.info("\n没有待处理的因子")
             return {}
         
         results = {}
         success_count = 0
-        skipped_count = 0
-        
-        for i, factor_spec in enumerate(auto_factors, 1):
-            print(f"\n\n{'#' * 80}")
-            print(f"# 进度: {i}/{len(auto_factors)}")
-            print(f"{'#' * 80}")
-            
-            # 检查是否需要处理
-            should_process, reason = self._should_process_factor(factor_spec)
-            
-            if not should_process:
-                print(f"\n跳过因子: {factor_spec.name} ({factor_spec.version})")
-                print(f"  原因: {reason}")
+        pending: List[FactorSpec] = []
+        
+        # 先统一判断哪些因子需要处理，跳过的因子一次性输出
+        to_process, to_skip = self._partition_factors(auto_factors)
+        skipped_count = len(to_skip)
+        if to_skip:
+            logger.info(f"\n跳过 {skipped_count} 个未变更因子:")
+            for factor_spec, reason in to_skip:
+                logger.info(f"  - {factor_spec.name} ({factor_spec.version}): {reason}")
                 results[factor_spec.name] = None  # None 表示跳过
-                skipped_count += 1
-                continue
-            
-            print(f"\n处理原因: {reason}")
-            
-            # 评价因子
-            reports = self.evaluate_factor(factor_spec)
-            
-            if reports:
-                # 打印摘要
-                self.print_summary(factor_spec, reports)
+        
+        # 只加载待处理因子用到的字段
+        if self._df is None:
+            self._data_fields = self._collect_required_fields([spec for spec, _ in to_process])
+        
+        try:
+            for i, (factor_spec, reason) in enumerate(to_process, 1):
+                logger.info(f"\n\n{'#' * 80}")
+                logger.info(f"# 进度: {i}/{len(to_process)}")
+                logger.info(f"{'#' * 80}")
                 
-                # 尝试自动入库
-                success = self.try_auto_admit(factor_spec, reports)
-                results[factor_spec.name] = success
+                logger.info(f"\n处理原因: {reason}")
                 
-                # 更新 hash 记录（无论是否入库成功，都记录已处理）
-                current_hash = self._compute_factor_hash(factor_spec)
-                self.hash_records[factor_spec.name] = current_hash
+                # 至少有一个因子需要处理时才加载数据
+                self._ensure_data_loaded()
                 
-                # 立即保存 hash 记录
-                self._save_hash_records()
-                print(f"        ✓ Hash 已更新: {current_hash[:16]}...")
+                if self.n_jobs > 1:
+                    # 并行模式：先收集，稍后统一提交到进程池
+                    pending.append(factor_spec)
+                    continue
                 
+                # 评价因子
+                reports = self.evaluate_factor(factor_spec)
+                success = self._handle_reports(factor_spec, reports)
+                results[factor_spec.name] = success
                 if success:
                     success_count += 1
-            else:
-                results[factor_spec.name] = False
+            
+            # 并行评价，入库判断与 hash 保存仍在主进程中串行执行
+            for factor_spec, reports in self._evaluate_parallel(pending):
+                success = self._handle_reports(factor_spec, reports)
+                results[factor_spec.name] = success
+                if success:
+                    success_count += 1
+        finally:
+            # 无论是否中途出错，都保存已处理因子的 hash 记录
+            if self._hash_dirty_count:
+                self._save_hash_records()
         
         # 打印最终统计
-        print(f"\n\n{'=' * 80}")
-        print(f"处理完成")
-        print(f"{'=' * 80}")
-        print(f"  - 总共待处理: {len(auto_factors)} 个因子")
-        print(f"  - 跳过未变更: {skipped_count} 个")
-        print(f"  - 实际处理: {len(auto_factors) - skipped_count} 个")
-        print(f"  - 成功入库: {success_count} 个")
-        print(f"  - 未通过: {len(auto_factors) - skipped_count - success_count} 个")
+        logger.info(f"\n\n{'=' * 80}")
+        logger.info(f"处理完成")
+        logger.info(f"{'=' * 80}")
+        logger.info(f"  - 总共待处理: {len(auto_factors)} 个因子")
+        logger.info(f"  - 跳过未变更: {skipped_count} 个")
+        logger.info(f"  - 实际处理: {len(auto_factors) - skipped_count} 个")
+        logger.info(f"  - 成功入库: {success_count} 个")
+        logger.info(f"  - 未通过: {len(auto_factors) - skipped_count - success_count} 个")
         
         # 显示因子库统计
         stats = self.factor_lib.get_factor_count()
-        print(f"\n当前因子库统计:")
-        print(f"  - 手动入库: {stats['manual']} 个")
-        print(f"  - 自动入库: {stats['auto']} 个")
-        print(f"  - 总计: {stats['total']} 个")
+        logger.info(f"\n当前因子库统计:")
+        logger.info(f"  - 手动入库: {stats['manual']} 个")
+        logger.info(f"  - 自动入库: {stats['auto']} 个")
+        logger.info(f"  - 总计: {stats['total']} 个")
         
         return results
 
@@ -432,6 +730,13 @@ def parse_arguments():
   
   # 指定 hash 记录文件路径
   python auto_batch.py --hash-record ./my_hash_records.json
+  
+  # 使用 8 个进程并行评价
+  python auto_batch.py --n-jobs 8
+  
+  # 输出各周期入库判断明细 / 静默运行
+  python auto_batch.py --log-level DEBUG
+  python auto_batch.py --quiet
         """
     )
     
@@ -485,6 +790,27 @@ def parse_arguments():
         help="指定要处理的因子名称列表（默认处理所有因子）"
     )
     
+    parser.add_argument(
+        "--n-jobs",
+        type=int,
+        default=1,
+        help="并行评价的进程数，-1 表示使用全部 CPU 核心 (默认: 1，串行)"
+    )
+    
+    parser.add_argument(
+        "--log-level",
+        type=str,
+        default="INFO",
+        choices=["DEBUG", "INFO", "WARNING", "ERROR"],
+        help="日志级别，DEBUG 会输出各周期的入库判断明细 (默认: INFO)"
+    )
+    
+    parser.add_argument(
+        "--quiet",
+        action="store_true",
+        help="静默模式，只输出警告和错误（等价于 --log-level WARNING）"
+    )
+    
     return parser.parse_args()
 
 
@@ -492,11 +818,12 @@ def main():
     """主函数"""
     # 解析命令行参数
     args = parse_arguments()
+    _configure_logging("WARNING" if args.quiet else args.log_level)
     
-    print("\n" + "=" * 80)
-    print("自动因子入库脚本")
-    print(f"运行时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-    print("=" * 80)
+    logger.info("\n" + "=" * 80)
+    logger.info("自动因子入库脚本")
+    logger.info(f"运行时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    logger.info("=" * 80)
     
     try:
         # 创建处理器
@@ -508,21 +835,20 @@ def main():
             hash_record_path=args.hash_record,
             force_reprocess=args.force,
             factor_names=args.factors,
+            n_jobs=args.n_jobs,
         )
         
         # 处理所有因子
         results = processor.process_all()
         
-        print("\n" + "=" * 80)
-        print("脚本执行完成")
-        print("=" * 80)
+        logger.info("\n" + "=" * 80)
+        logger.info("脚本执行完成")
+        logger.info("=" * 80)
         
         return 0
         
     except Exception as e:
-        print(f"\n错误: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception(f"\n错误: {e}")
         return 1
 
 
@@ -1,15 +1,71 @@
+import os
+from functools import lru_cache
+import numpy as np
 import pandas as pd
 from data_manager.interfaces import IDataSource
 from pathlib import Path
 
+# 尝试导入 pyarrow，可用时 parquet 读取支持列裁剪和谓词下推，并在 arrow 中完成排序和编码
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.dataset as ds
+except ImportError:
+    pa = pc = ds = None
+
+
+# 以下缓存均以 (路径, 修改时间, 文件大小) 为键，文件变化后自动失效
+@lru_cache(maxsize=8)
+def _read_file_cached(path_str: str, mtime_ns: int, size: int, columns: tuple | None = None) -> pd.DataFrame:
+    """读取并排序文件（未安装 pyarrow 时使用），返回的结果不可原地修改
+    Args:
+        columns (Optional[tuple]): 只读取的字段（不含 date, code），None 表示读取全部字段
+    """
+    path = Path(path_str)
+    if path.suffix == ".csv":
+        usecols = None if columns is None else (lambda c: c in ('date', 'code') or c in columns)
+        df = pd.read_csv(path, parse_dates=['date'], usecols=usecols)
+    else:
+        try:
+            df = pd.read_parquet(path, columns=None if columns is None else ['date', 'code', *columns])
+        except (KeyError, ValueError):
+            # 字段不存在时读取全部字段，由调用方给出缺失字段的报错
+            df = pd.read_parquet(path)
+    df.set_index(['date', 'code'], inplace=True)
+    df.sort_index(inplace=True)
+    return df
+
+
+@lru_cache(maxsize=8)
+def _parquet_dataset_cached(path_str: str, mtime_ns: int, size: int) -> "ds.Dataset":
+    """打开 parquet 数据集，复用已解析的文件元数据"""
+    # code 列按字典读取，不再为每一行构造字符串
+    fmt = ds.ParquetFileFormat(read_options=ds.ParquetReadOptions(dictionary_columns=['code']))
+    return ds.dataset(path_str, format=fmt)
+
+
+@lru_cache(maxsize=8)
+def _csv_dataset_cached(path_str: str, mtime_ns: int, size: int) -> "ds.Dataset":
+    """将 csv 读入内存并包装为数据集"""
+    table = pa.Table.from_pandas(pd.read_csv(path_str, parse_dates=['date']), preserve_index=False)
+    return ds.dataset(table)
+
+
+def _file_key(path: Path) -> tuple:
+    """缓存键：(路径, 修改时间, 文件大小)"""
+    stat = path.stat()
+    return str(path.resolve()), stat.st_mtime_ns, stat.st_size
+
 
 class LoacalDatasource(IDataSource):
-    def __init__(self, file_path: str | Path):
+    def __init__(self, file_path: str | Path, prefetch: bool = False):
         """本地数据源初始化，指定本地文件路径。
         Args:
             file_path (str | Path): 本地文件路径
+            prefetch (bool, optional): 读取前提示内核顺序预读整个文件，降低冷缓存下的加载时间. Defaults to False.
         """
         self.file_path = Path(file_path)
+        self.prefetch = prefetch
 
     def load_data(self, start=None, end=None, fields=None, codes=None) -> pd.DataFrame:
         """从本地文件加载数据
@@ -21,44 +77,194 @@ class LoacalDatasource(IDataSource):
         Returns:
             pd.DataFrame: MultiIndex(date, code) 的基础数据
         """
-        df = self._load_file()
-
         # 先将start, end转为pd.Timestamp类型
         if start is not None:
             start = pd.Timestamp(start)
         if end is not None:
             end = pd.Timestamp(end)
 
-        if start is not None:
-            df = df[df.index.get_level_values('date') >= pd.Timestamp(start)]
-        if end is not None:
-            df = df[df.index.get_level_values('date') <= pd.Timestamp(end)]
+        if pa is not None:
+            # 日期、标的、字段过滤全部下推到 arrow 读取阶段
+            return self._load_arrow(start=start, end=end, fields=fields, codes=codes)
+
+        df = self._load_file(fields)
+
+        # 数据已按 (date, code) 排序，日期区间对应一段连续的行
+        if start is not None or end is not None:
+            df = df.iloc[self._date_slice(df.index, start, end)]
         if codes is not None:
-            df = df[df.index.get_level_values('code').isin(codes)]
+            df = df[self._code_mask(df.index, codes)]
         if fields is not None:
             if not set(fields).issubset(set(df.columns)):
                 missing_fields = set(fields) - set(df.columns)
                 raise ValueError(f"请求的字段不存在: {missing_fields}")
             df = df[fields]
 
-        return df
+        # 返回副本，避免调用方修改到缓存的数据
+        return df.copy()
 
-    def _load_file(self) -> pd.DataFrame:
-        """加载本地文件数据
+    def _load_file(self, fields=None) -> pd.DataFrame:
+        """加载本地文件数据（未安装 pyarrow 时使用），同一文件未变化时直接复用缓存
+        Args:
+            fields (Optional[list[str]], optional): 需要加载的字段列表，只读取这些列. Defaults to None.
         Returns:
-            pd.DataFrame: MultiIndex(date, code) 的基础数据
+            pd.DataFrame: MultiIndex(date, code) 的基础数据（缓存对象，调用方不可原地修改）
         """
         if not self.file_path.exists():
             raise FileNotFoundError(f"文件未找到: {self.file_path}")
 
+        if self.prefetch:
+            self._advise_sequential_read(self.file_path)
+
         # csv, parquet 等格式的自动识别和加载
-        if self.file_path.suffix == ".csv":
-            df = pd.read_csv(self.file_path, parse_dates=['date'])
-        elif self.file_path.suffix == ".parquet":
-            df = pd.read_parquet(self.file_path)
-        else:
+        if self.file_path.suffix not in (".csv", ".parquet"):
             raise ValueError(f"不支持的文件格式: {self.file_path.suffix}")
         
+        columns = None
+        if fields is not None:
+            columns = tuple(sorted(set(fields) - {'date', 'code'}))
+        return _read_file_cached(*_file_key(self.file_path), columns)
+
+    @staticmethod
+    def _date_slice(index: pd.MultiIndex, start=None, end=None) -> slice:
+        """在已排序的 MultiIndex(date, code) 上二分查找日期区间对应的行范围
+        Args:
+            index (pd.MultiIndex): 按 (date, code) 排序的索引
+            start (Optional[pd.Timestamp], optional): 开始时间（含）. Defaults to None.
+            end (Optional[pd.Timestamp], optional): 结束时间（含）. Defaults to None.
+        Returns:
+            slice: 行位置切片
+        """
+        level = index.names.index('date')
+        # 排序后 date 层级的整数编码单调不减，先在层级值上定位，再在编码上定位
+        date_codes = index.codes[level]
+        dates = index.levels[level]
+        lo = 0 if start is None else date_codes.searchsorted(dates.searchsorted(start, side='left'), side='left')
+        hi = len(index) if end is None else date_codes.searchsorted(dates.searchsorted(end, side='right'), side='left')
+        return slice(lo, hi)
+
+    @staticmethod
+    def _code_mask(index: pd.MultiIndex, codes) -> np.ndarray:
+        """按标的过滤的行掩码：在 code 层级的整数编码上比较，避免逐行字符串哈希
+        Args:
+            index (pd.MultiIndex): MultiIndex(date, code)
+            codes (list[str]): 需要保留的标的列表
+        Returns:
+            np.ndarray: bool 掩码
+        """
+        level = index.names.index('code')
+        wanted = index.levels[level].get_indexer(pd.Index(codes).unique())
+        return np.isin(index.codes[level], wanted[wanted >= 0])
+
+    def _load_arrow(self, start=None, end=None, fields=None, codes=None) -> pd.DataFrame:
+        """通过 pyarrow.dataset 读取数据，字段投影和日期/标的过滤在扫描时完成，
+        parquet 统计信息不满足条件的 row group 直接跳过
+        Args:
+            start (Optional[pd.Timestamp], optional): 开始时间. Defaults to None.
+            end (Optional[pd.Timestamp], optional): 结束时间. Defaults to None.
+            fields (Optional[list[str]], optional): 需要加载的字段列表. Defaults to None.
+            codes (Optional[list[str]], optional): 需要加载的标的列表. Defaults to None.
+        Returns:
+            pd.DataFrame: MultiIndex(date, code) 的基础数据
+        """
+        dataset = self._open_dataset()
+
+        columns = None
+        if fields is not None:
+            missing_fields = set(fields) - set(dataset.schema.names)
+            if missing_fields:
+                raise ValueError(f"请求的字段不存在: {missing_fields}")
+            columns = ['date', 'code'] + [f for f in fields if f not in ('date', 'code')]
+
+        conditions = []
+        if start is not None:
+            conditions.append(pc.field('date') >= pa.scalar(start))
+        if end is not None:
+            conditions.append(pc.field('date') <= pa.scalar(end))
+        if codes is not None:
+            conditions.append(pc.field('code').isin(pa.array(list(codes))))
+        expr = None
+        for cond in conditions:
+            expr = cond if expr is None else expr & cond
+
+        table = dataset.to_table(columns=columns, filter=expr)
+
+        # arrow 中排序并对 code 做字典编码，转为 pandas 后无需再排序
+        df = self._sorted_encoded(table).to_pandas(self_destruct=True)
         df.set_index(['date', 'code'], inplace=True)
-        df.sort_index(inplace=True)
-        return df
\ No newline at end of file
+        # code 层级换回普通字符串层级（与未安装 pyarrow 时一致），只转换字典中的取值，
+        # 避免 groupby(level="code") 按 Categorical 处理未出现的类别
+        code_level = df.index.levels[1]
+        df.index = df.index.set_levels(code_level.astype(code_level.categories.dtype), level='code')
+        if fields is not None:
+            df = df[fields]
+        return df
+
+    def _open_dataset(self) -> "ds.Dataset":
+        """打开 parquet 数据集；csv 读入内存后包装为数据集
+        Returns:
+            ds.Dataset: 可下推过滤条件的数据集
+        """
+        if not self.file_path.exists():
+            raise FileNotFoundError(f"文件未找到: {self.file_path}")
+
+        if self.file_path.suffix == ".csv":
+            # csv 只在内存中解析一次（按路径、修改时间和文件大小缓存），不在数据目录下写缓存文件
+            return _csv_dataset_cached(*_file_key(self.file_path))
+        if self.file_path.suffix != ".parquet":
+            raise ValueError(f"不支持的文件格式: {self.file_path.suffix}")
+
+        if self.prefetch:
+            self._advise_sequential_read(self.file_path)
+        return _parquet_dataset_cached(*_file_key(self.file_path))
+
+    @staticmethod
+    def _sorted_encoded(table: "pa.Table") -> "pa.Table":
+        """按 (date, code) 排序，并将 code 编码为字典有序的 dictionary 列
+        Args:
+            table (pa.Table): 包含 date, code 列的原始数据
+        Returns:
+            pa.Table: 排序、编码后的数据
+        """
+        code = table.column('code')
+        if pa.types.is_dictionary(code.type):
+            # parquet 按字典读取的 code：统一各分块的字典后，只保留实际出现的取值并按取值排序
+            code = table.unify_dictionaries().column('code').combine_chunks()
+            raw_indices = code.indices.to_numpy(zero_copy_only=False)
+            used = np.zeros(len(code.dictionary), dtype=bool)
+            used[raw_indices] = True
+            values = code.dictionary.filter(pa.array(used))
+            order = pc.sort_indices(values).to_numpy()
+            dictionary = values.take(pa.array(order))
+            remap = np.full(len(code.dictionary), -1, dtype=np.int32)
+            remap[np.flatnonzero(used)[order]] = np.arange(len(order), dtype=np.int32)
+            indices = pa.array(remap[raw_indices])
+        else:
+            # 字典按取值排序，保证编码顺序与字符串顺序一致
+            dictionary = pc.unique(code).sort()
+            indices = pc.index_in(code, value_set=dictionary).cast(pa.int32()).combine_chunks()
+
+        # 字典有序，按编码排序即按字符串排序，避免逐行比较字符串
+        code_idx = table.schema.get_field_index('code')
+        table = table.set_column(code_idx, 'code', indices)
+        table = table.take(pc.sort_indices(table, sort_keys=[('date', 'ascending'), ('code', 'ascending')]))
+        table = table.combine_chunks()
+        encoded = pa.DictionaryArray.from_arrays(table.column('code').combine_chunks(), dictionary)
+        return table.set_column(code_idx, 'code', encoded)
+
+    @staticmethod
+    def _advise_sequential_read(path: Path) -> None:
+        """通过 posix_fadvise 提示内核按顺序预读文件；平台不支持时静默跳过"""
+        if not hasattr(os, "posix_fadvise"):
+            return
+        try:
+            fd = os.open(path, os.O_RDONLY)
+        except OSError:
+            return
+        try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_SEQUENTIAL)
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
@@ -11,12 +11,14 @@ from .registry import (
     add_evaluator,
     get_evaluator,
     list_evaluators,
+    evaluators_view,
 )
 from .engine import EvaluatorEngine
 
 from .forward_return import build_forward_returns
 
 from . import builtins  # noqa: F401
+from .batch_engine import evaluate_batch
 
 __all__ = [
     "EvalResult",
@@ -28,6 +30,8 @@ __all__ = [
     "add_evaluator",
     "get_evaluator",
     "list_evaluators",
+    "evaluators_view",
     "EvaluatorEngine",
     "build_forward_returns",
+    "evaluate_batch",
 ]
@@ -0,0 +1,160 @@
+# evaluation/batch_engine.py
+"""
+多因子批量评价：对同一份基础数据上的多个因子、多个 horizon 一次性计算入库规则所需的指标
+
+指标口径与 CommonFactorEvaluator 一致（IC / Rank IC / top 换手 / 收益单调性 / 多空收益），
+但不生成 artifacts。因子与收益先整理为 (因子, 日期, 标的) 面板，安装 numba 时由一个并行内核
+同时处理所有 (因子, horizon) 组合；否则逐个调用 CommonFactorEvaluator。
+面板内存约为 (因子数 + horizon 数) × 日期数 × 标的数 × 8 字节，因子很多时可分批调用。
+"""
+from __future__ import annotations
+
+from typing import Dict, List, Literal
+import numpy as np
+import pandas as pd
+
+from .engine import EvaluatorEngine
+from .forward_return import build_forward_returns
+from .builtins import CommonFactorEvaluator
+
+# 尝试导入 numba 优化函数，如果失败则逐个因子评价
+try:
+    from .numba_accelerator import compute_batch_cross_section_stats
+    USE_NUMBA = True
+except ImportError:
+    USE_NUMBA = False
+
+
+_METRIC_NAMES = [
+    "ic_mean", "ic_std", "ic_ir", "ic_t",
+    "rank_ic_mean", "rank_ic_std", "rank_ic_ir", "rank_ic_t",
+    "top_turnover_20_mean", "monotonic_mean",
+    "group_ls_mean", "group_ls_t",
+]
+
+
+def _level_positions(index: pd.MultiIndex, level: int) -> tuple[np.ndarray, int]:
+    """每行在该层排序后取值中的位置（与 unstack 的行/列顺序一致），缺失为 -1"""
+    codes = np.asarray(index.codes[level])
+    level_values = index.levels[level]
+    rank = np.empty(len(level_values), dtype=np.int64)
+    rank[level_values.argsort()] = np.arange(len(level_values))
+    return np.where(codes >= 0, rank[codes], -1), len(level_values)
+
+
+def _to_panel(values: np.ndarray, rows: np.ndarray, cols: np.ndarray, n_rows: int, n_cols: int) -> np.ndarray:
+    """将 (行数, K) 的长表数值填入 (K, 日期, 标的) 面板"""
+    panel = np.full((values.shape[1], n_rows, n_cols), np.nan)
+    panel[:, rows, cols] = values.T
+    return panel
+
+
+def _series_stats(arr: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """沿最后一维忽略 NaN 计算 (均值, 标准差, IR, t 值)，与单因子评价的 calc_stats 一致"""
+    valid = ~np.isnan(arr)
+    count = valid.sum(axis=-1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean = np.where(valid, arr, 0.0).sum(axis=-1) / count
+        dev = np.where(valid, arr - mean[..., None], 0.0)
+        std = np.sqrt((dev * dev).sum(axis=-1) / (count - 1))
+        ir = mean / std
+        t_val = mean / (std / np.sqrt(count))
+    few = count < 2
+    flat = std <= 1e-8
+    mean = np.where(few, np.nan, mean)
+    std = np.where(few, np.nan, std)
+    ir = np.where(few | flat, np.nan, ir)
+    t_val = np.where(few | flat, np.nan, t_val)
+    return mean, std, ir, t_val
+
+
+def _nan_mean(arr: np.ndarray) -> np.ndarray:
+    """沿最后一维忽略 NaN 求均值，全为 NaN 时为 NaN（不产生警告）"""
+    valid = ~np.isnan(arr)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(valid, arr, 0.0).sum(axis=-1) / valid.sum(axis=-1)
+
+
+def evaluate_batch(
+    df: pd.DataFrame,
+    factors: pd.DataFrame,
+    horizons: List[int],
+    q: int = 10,
+    top_pct: float = 0.2,
+    long_high: bool = True,
+    price_col: str = "close",
+    kind: Literal["simple", "log"] = "simple",
+    ret_df: pd.DataFrame | None = None,
+) -> Dict[int, pd.DataFrame]:
+    """
+    批量评价多个因子，返回各 horizon 的指标表，可直接交给 AdmissionRule.batch_is_pass 筛选
+
+    Args:
+        df: 基础数据表，MultiIndex(date, code)，需包含价格列
+        factors: 因子值表（如 FactorEngine.compute_all 的结果），每列一个因子
+        horizons: 评价的收益率 horizon 列表
+        q: 分组数量
+        top_pct: top 组占比（换手率口径）
+        long_high: 是否因子值越大越好
+        price_col: 用于计算收益率的价格列名
+        kind: 收益率计算方式，simple 或 log
+        ret_df: 预先计算的 build_forward_returns 结果，None 时由 df 现算
+    Returns:
+        Dict[int, pd.DataFrame]: {horizon: 指标表}，指标表每行一个因子，列为指标名
+    """
+    horizons = list(horizons)
+    if ret_df is None:
+        ret_df = build_forward_returns(df, horizons, price_col=price_col, kind=kind)
+    names = list(factors.columns)
+
+    if not USE_NUMBA:
+        engine = EvaluatorEngine()
+        evaluator = CommonFactorEvaluator(q=q, top_pct=top_pct, long_high=long_high)
+        rows: Dict[int, list] = {h: [] for h in horizons}
+        for name in names:
+            reports = engine.evaluate_multi_horizons(
+                df, factors[name], horizons, evaluator,
+                price_col=price_col, kind=kind, ret_df=ret_df,
+                q=q, top_pct=top_pct, long_high=long_high,
+            )
+            for h in horizons:
+                rows[h].append(reports[h].metrics)
+        return {
+            h: pd.DataFrame(rows[h], index=names, columns=_METRIC_NAMES) for h in horizons
+        }
+
+    if not factors.index.equals(ret_df.index):
+        factors = factors.reindex(ret_df.index)
+    index = ret_df.index
+    date_pos, n_dates = _level_positions(index, index.names.index("date"))
+    code_pos, n_codes = _level_positions(index, index.names.index("code"))
+    keep = (date_pos >= 0) & (code_pos >= 0)
+    date_pos, code_pos = date_pos[keep], code_pos[keep]
+
+    factor_values = factors.to_numpy(dtype=np.float64)[keep]
+    # 与单因子评价一致：horizon 期收益摊销为日均收益
+    ret_values = ret_df[[f"ret_fwd_{h}d" for h in horizons]].to_numpy(dtype=np.float64)[keep]
+    ret_values = ret_values / np.asarray(horizons, dtype=np.float64)
+
+    ic, rank_ic, turnover, ls, monotonic = compute_batch_cross_section_stats(
+        _to_panel(factor_values, date_pos, code_pos, n_dates, n_codes),
+        _to_panel(ret_values, date_pos, code_pos, n_dates, n_codes),
+        q, float(top_pct), long_high,
+    )
+
+    ic_mean, ic_std, ic_ir, ic_t = _series_stats(ic)
+    rank_ic_mean, rank_ic_std, rank_ic_ir, rank_ic_t = _series_stats(rank_ic)
+    ls_mean, _, _, ls_t = _series_stats(ls)
+    columns = [
+        ic_mean, ic_std, ic_ir, ic_t,
+        rank_ic_mean, rank_ic_std, rank_ic_ir, rank_ic_t,
+        _nan_mean(turnover), _nan_mean(monotonic),
+        ls_mean, ls_t,
+    ]
+
+    out: Dict[int, pd.DataFrame] = {}
+    for k, h in enumerate(horizons):
+        out[h] = pd.DataFrame(
+            {name: col[:, k] for name, col in zip(_METRIC_NAMES, columns)}, index=names
+        )
+    return out
@@ -2,10 +2,12 @@
 from __future__ import annotations
 
 import os
+from concurrent.futures import ThreadPoolExecutor
 import pandas as pd
 import numpy as np
-import scipy.stats as st
 import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
 from typing import Dict, Any
 from dataclasses import dataclass, field
 
@@ -14,17 +16,185 @@ from .registry import add_evaluator
 
 # 尝试导入 numba 优化函数，如果失败则使用普通版本
 try:
-    from .numba_accelerator import (
-        compute_rank_ic_by_date,
-        compute_group_return_by_date,
-        compute_spearman_correlation
-    )
+    from .numba_accelerator import compute_cross_section_stats
     USE_NUMBA = True
 except ImportError:
     USE_NUMBA = False
     # 如果 numba 不可用，将在运行时使用 pandas 原生方法
 
 
+def _new_figure(figsize: tuple, show_fig: bool):
+    """
+    创建图表；show_fig=False 时直接创建挂在 Agg 画布上的 Figure，
+    不经过 pyplot，也不初始化交互式 GUI 后端
+    """
+    if show_fig:
+        return plt.subplots(figsize=figsize)
+    fig = Figure(figsize=figsize)
+    FigureCanvasAgg(fig)
+    return fig, fig.subplots()
+
+
+def _save_figures(tasks: list, dpi: int) -> None:
+    """
+    并发保存图表：PNG 压缩与写文件在 C 层释放 GIL，每个 Figure 只由一个线程使用
+    
+    Args:
+        tasks: [(Figure, 保存路径), ...]
+        dpi: 保存分辨率
+    """
+    def _save(task):
+        fig, path = task
+        fig.savefig(path, dpi=dpi, bbox_inches='tight')
+
+    with ThreadPoolExecutor(max_workers=min(len(tasks), os.cpu_count() or 1)) as executor:
+        list(executor.map(_save, tasks))
+
+
+def _cross_sectional_corr(wide_x: pd.DataFrame, wide_y: pd.DataFrame) -> pd.Series:
+    """
+    按行（日期）计算两张宽表 (date x code) 的截面 Pearson 相关系数
+    
+    两张表的缺失位置需一致；有效样本少于 2 个或任一方差为 0 的日期返回 NaN
+    """
+    x = wide_x.to_numpy(dtype=np.float64)
+    y = wide_y.to_numpy(dtype=np.float64)
+    valid = ~(np.isnan(x) | np.isnan(y))
+    count = valid.sum(axis=1)
+
+    if x.shape[1] > 0 and valid.all():
+        # 无缺失的稠密宽表：直接按行去均值，省去掩码处理
+        x_c = x - x.sum(axis=1, keepdims=True) / x.shape[1]
+        y_c = y - y.sum(axis=1, keepdims=True) / y.shape[1]
+    else:
+        x = np.where(valid, x, 0.0)
+        y = np.where(valid, y, 0.0)
+        n = np.maximum(count, 1)[:, None]
+        x_c = np.where(valid, x - x.sum(axis=1, keepdims=True) / n, 0.0)
+        y_c = np.where(valid, y - y.sum(axis=1, keepdims=True) / n, 0.0)
+
+    cov = (x_c * y_c).sum(axis=1)
+    var_x = (x_c * x_c).sum(axis=1)
+    var_y = (y_c * y_c).sum(axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        corr = cov / np.sqrt(var_x * var_y)
+    corr[(count < 2) | (var_x <= 0) | (var_y <= 0)] = np.nan
+
+    return pd.Series(corr, index=wide_x.index)
+
+
+def _row_ranks(wide: pd.DataFrame) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    一次稳定排序得到宽表每行的三种排名（从 1 开始，缺失值为 NaN）
+    
+    Returns:
+        tuple: (average, first, first_desc)，分别与 rank(axis=1)、rank(axis=1, method="first")、
+        rank(axis=1, method="first", ascending=False) 一致
+    """
+    values = wide.to_numpy(dtype=np.float64)
+    n_rows, n_cols = values.shape
+    order = np.argsort(values, axis=1, kind="stable")  # NaN 排在每行末尾
+    sorted_vals = np.take_along_axis(values, order, axis=1)
+    count = np.sum(~np.isnan(values), axis=1, keepdims=True)
+    pos = np.broadcast_to(np.arange(1, n_cols + 1, dtype=np.float64), (n_rows, n_cols))
+
+    # 排序后相等值连续，a / b 为所在并列段的最小 / 最大排名
+    new_run = np.ones((n_rows, n_cols), dtype=bool)
+    new_run[:, 1:] = sorted_vals[:, 1:] != sorted_vals[:, :-1]
+    run_end = np.ones((n_rows, n_cols), dtype=bool)
+    run_end[:, :-1] = new_run[:, 1:]
+    a = np.maximum.accumulate(np.where(new_run, pos, 0.0), axis=1)
+    b = np.minimum.accumulate(np.where(run_end, pos, n_cols + 1.0)[:, ::-1], axis=1)[:, ::-1]
+
+    valid_sorted = pos <= count
+    rows = np.arange(n_rows)[:, None]
+    first = np.full((n_rows, n_cols), np.nan)
+    average = np.full((n_rows, n_cols), np.nan)
+    first[rows, order] = np.where(valid_sorted, pos, np.nan)
+    average[rows, order] = np.where(valid_sorted, (a + b) / 2.0, np.nan)
+    # 降序的 first 排名：并列段整体翻转到 n+1-b .. n+1-a，段内仍按出现顺序
+    first_desc = first + (count + 1) - 2.0 * average
+    return average, first, first_desc
+
+
+def _quantile_group_mean(wide_factor: pd.DataFrame, wide_ret: pd.DataFrame, q: int) -> pd.DataFrame:
+    """
+    按日期将截面因子值分为 q 组，计算每组收益均值
+    
+    分组规则与逐日 pd.qcut(labels=False, duplicates="drop") 一致：边界为排序后第
+    k * (n - 1) / q 位的线性插值，相同的边界只保留一个，相等的因子值落在同一组；
+    边界合并后组数少于 q 时高位组为 NaN，全部值相同的日期不分组；
+    有效样本少于 q 的日期不参与分组。边界位置按整数运算精确求得，不复现 qcut
+    内部分位数插值的末位舍入（qcut 偶尔因此多出一个只差 1 ulp 的空组）
+    
+    Returns:
+        pd.DataFrame: (date x group) 的分组收益，列为 0..q-1
+    """
+    values = wide_factor.to_numpy(dtype=np.float64)
+    ret = wide_ret.to_numpy(dtype=np.float64)
+    count = np.sum(~np.isnan(values), axis=1)
+
+    keep = count >= q
+    values, ret, count = values[keep], ret[keep], count[keep]
+
+    # 各行 q + 1 个分位边界：位置 k * (n - 1) / q 用整数运算拆成下标与小数部分，
+    # 相邻值相等时边界严格等于该值，保证并列值不会被边界切开
+    sorted_vals = np.sort(values, axis=1)  # NaN 排在每行末尾
+    pos = np.arange(q + 1, dtype=np.int64)[None, :] * (count[:, None] - 1)
+    lower = pos // q
+    frac = (pos % q) / q
+    upper = np.minimum(lower + 1, count[:, None] - 1)
+    a = np.take_along_axis(sorted_vals, lower, axis=1)
+    b = np.take_along_axis(sorted_vals, upper, axis=1)
+    edges = np.where(frac > 0, a + (b - a) * frac, a)
+
+    # 重复边界只在首次出现时计数（duplicates="drop"）；组号 = 严格小于该值的去重上边界个数
+    new_edge = np.ones(edges.shape, dtype=bool)
+    new_edge[:, 1:] = edges[:, 1:] != edges[:, :-1]
+    # 组号是小整数，用窄整型保存，减少中间数组的内存占用
+    labels = np.zeros(values.shape, dtype=np.int8 if q <= 127 else np.int16)
+    for j in range(1, q + 1):
+        labels += (values > edges[:, j:j + 1]) & new_edge[:, j:j + 1]
+
+    has_bins = new_edge[:, 1:].any(axis=1)
+    row, col = np.nonzero(~np.isnan(values) & has_bins[:, None])
+    key = row * q + labels[row, col]
+    size = len(count) * q
+    sums = np.bincount(key, weights=ret[row, col], minlength=size)
+    cnts = np.bincount(key, minlength=size)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        means = sums / cnts
+
+    return pd.DataFrame(
+        means.reshape(-1, q),
+        index=wide_factor.index[keep],
+        columns=list(range(q)),
+    )
+
+
+def _top_turnover(wide_factor: pd.DataFrame, top_pct: float, ranks: np.ndarray | None = None) -> pd.Series:
+    """
+    计算每日 top 组（因子值最大的 ceil(n * top_pct) 个标的）相对前一日的换手率
+    
+    宽表上按行排名得到 (date x code) 的成分掩码，换手率 = 1 - 当日与前一日成分交集 / 当日成分数；
+    并列时与 nlargest(keep="first") 一样按标的顺序取前者，首日为 NaN
+    
+    Args:
+        ranks: 预先计算的 rank(axis=1, method="first", ascending=False) 结果，None 时现算
+    """
+    count = wide_factor.notna().sum(axis=1).to_numpy()
+    n_top = np.maximum(1, np.ceil(count * top_pct)).astype(np.int64)
+    if ranks is None:
+        ranks = wide_factor.rank(axis=1, method="first", ascending=False).to_numpy()
+    member = ranks <= n_top[:, None]
+
+    turnover = np.full(len(member), np.nan)
+    overlap = (member[1:] & member[:-1]).sum(axis=1)
+    turnover[1:] = 1.0 - overlap / n_top[1:]
+
+    return pd.Series(turnover, index=wide_factor.index, name="top_turnover")
+
+
 @dataclass
 class CommonFactorEvalResult(EvalResult):
     """
@@ -96,17 +266,19 @@ class CommonFactorEvalResult(EvalResult):
             return figures
         
         rank_ic_series = artifacts["rank_ic_series"]
+        rank_ic_mean = float(rank_ic_series.mean())  # 三张 IC 图共用
         
-        # 创建保存目录
+        # 创建保存目录；各图在全部绘制完成后统一并发保存
+        save_tasks = []
         if save_path:
             os.makedirs(save_path, exist_ok=True)
         
         # 1. Rank IC 序列图
-        fig1, ax1 = plt.subplots(figsize=figsize_rank_ic)
-        rank_ic_series.plot(ax=ax1, label='Rank IC', alpha=0.7)
+        fig1, ax1 = _new_figure(figsize_rank_ic, show_fig)
+        rank_ic_series.plot(ax=ax1, label='Rank IC', alpha=0.7, rasterized=not show_fig)
         ax1.axhline(0, color='black', linestyle='--', linewidth=0.8)
-        ax1.axhline(rank_ic_series.mean(), color='red', linestyle='--', 
-                    linewidth=0.8, label=f'均值: {rank_ic_series.mean():.4f}')
+        ax1.axhline(rank_ic_mean, color='red', linestyle='--', 
+                    linewidth=0.8, label=f'均值: {rank_ic_mean:.4f}')
         ax1.set_title(f'{factor_name} - Rank IC 序列图 (Horizon={horizon}d)', 
                       fontsize=14, fontweight='bold')
         ax1.set_xlabel('日期', fontsize=12)
@@ -116,7 +288,7 @@ class CommonFactorEvalResult(EvalResult):
         fig1.tight_layout()
         
         if save_path:
-            fig1.savefig(os.path.join(save_path, f'{factor_name}_rank_ic_series.png'), dpi=dpi, bbox_inches='tight')
+            save_tasks.append((fig1, os.path.join(save_path, f'{factor_name}_rank_ic_series.png')))
         
         if not show_fig:
             plt.close(fig1)
@@ -124,10 +296,10 @@ class CommonFactorEvalResult(EvalResult):
         figures['rank_ic_series'] = fig1
         
         # 2. Rank IC 分布图
-        fig2, ax2 = plt.subplots(figsize=figsize_rank_ic_dist)
-        rank_ic_series.hist(bins=50, ax=ax2, alpha=0.7, edgecolor='black')
-        ax2.axvline(rank_ic_series.mean(), color='red', linestyle='--', 
-                    linewidth=2, label=f'均值: {rank_ic_series.mean():.4f}')
+        fig2, ax2 = _new_figure(figsize_rank_ic_dist, show_fig)
+        rank_ic_series.hist(bins=50, ax=ax2, figure=fig2, alpha=0.7, edgecolor='black')
+        ax2.axvline(rank_ic_mean, color='red', linestyle='--', 
+                    linewidth=2, label=f'均值: {rank_ic_mean:.4f}')
         ax2.axvline(0, color='black', linestyle='--', linewidth=1)
         ax2.set_title(f'{factor_name} - Rank IC 分布图 (Horizon={horizon}d)', 
                       fontsize=14, fontweight='bold')
@@ -138,7 +310,7 @@ class CommonFactorEvalResult(EvalResult):
         fig2.tight_layout()
         
         if save_path:
-            fig2.savefig(os.path.join(save_path, f'{factor_name}_rank_ic_dist.png'), dpi=dpi, bbox_inches='tight')
+            save_tasks.append((fig2, os.path.join(save_path, f'{factor_name}_rank_ic_dist.png')))
         
         if not show_fig:
             plt.close(fig2)
@@ -146,7 +318,7 @@ class CommonFactorEvalResult(EvalResult):
         figures['rank_ic_dist'] = fig2
         
         # 3. 月频 Rank IC 柱状图
-        fig3, ax3 = plt.subplots(figsize=figsize_rank_ic_monthly)
+        fig3, ax3 = _new_figure(figsize_rank_ic_monthly, show_fig)
         monthly_ic = rank_ic_series.resample('ME').mean()  # 使用 'ME' 替代已弃用的 'M'
         x_pos = range(len(monthly_ic))
         colors = ['red' if v < 0 else 'green' for v in monthly_ic]
@@ -157,8 +329,8 @@ class CommonFactorEvalResult(EvalResult):
         ax3.set_xticklabels([d.strftime('%Y-%m') for d in monthly_ic.index], 
                             rotation=45, ha='right')
         ax3.axhline(0, color='black', linestyle='-', linewidth=0.8)
-        ax3.axhline(rank_ic_series.mean(), color='blue', linestyle='--', 
-                    linewidth=1.5, label=f'整体均值: {rank_ic_series.mean():.4f}')
+        ax3.axhline(rank_ic_mean, color='blue', linestyle='--', 
+                    linewidth=1.5, label=f'整体均值: {rank_ic_mean:.4f}')
         ax3.set_title(f'{factor_name} - 月频 Rank IC (Horizon={horizon}d)', 
                       fontsize=14, fontweight='bold')
         ax3.set_xlabel('月份', fontsize=12)
@@ -168,7 +340,7 @@ class CommonFactorEvalResult(EvalResult):
         
         # 是否显示数值标签
         if show_monthly_ic_labels is None:
-            show_monthly_ic_labels = len(monthly_ic) <= 24
+            show_monthly_ic_labels = len(x_pos) <= 24
         
         if show_monthly_ic_labels:
             for bar, val in zip(bars, monthly_ic):
@@ -181,7 +353,7 @@ class CommonFactorEvalResult(EvalResult):
         fig3.tight_layout()
         
         if save_path:
-            fig3.savefig(os.path.join(save_path, f'{factor_name}_rank_ic_monthly.png'), dpi=dpi, bbox_inches='tight')
+            save_tasks.append((fig3, os.path.join(save_path, f'{factor_name}_rank_ic_monthly.png')))
         
         if not show_fig:
             plt.close(fig3)
@@ -190,20 +362,20 @@ class CommonFactorEvalResult(EvalResult):
         
         # 4. 10组累计收益图
         if "group_cumret" in artifacts and not artifacts["group_cumret"].empty:
-            fig4, ax4 = plt.subplots(figsize=figsize_group_cumret)
+            fig4, ax4 = _new_figure(figsize_group_cumret, show_fig)
             group_cumret = artifacts["group_cumret"]
-            for col in group_cumret.columns:
-                group_cumret[col].plot(ax=ax4, label=f'第{col+1}组', alpha=0.7)
+            # 一次绘制所有分组，图例标签统一设置
+            group_cumret.plot(ax=ax4, alpha=0.7, legend=False, rasterized=not show_fig)
             ax4.set_title(f'{factor_name} - 10组累计收益 (Horizon={horizon}d)', 
                           fontsize=14, fontweight='bold')
             ax4.set_xlabel('日期', fontsize=12)
             ax4.set_ylabel('累计收益', fontsize=12)
-            ax4.legend(loc='best', ncol=2)
+            ax4.legend([f'第{col+1}组' for col in group_cumret.columns], loc='best', ncol=2)
             ax4.grid(alpha=0.3)
             fig4.tight_layout()
             
             if save_path:
-                fig4.savefig(os.path.join(save_path, f'{factor_name}_group_cumret.png'), dpi=dpi, bbox_inches='tight')
+                save_tasks.append((fig4, os.path.join(save_path, f'{factor_name}_group_cumret.png')))
             
             if not show_fig:
                 plt.close(fig4)
@@ -212,10 +384,10 @@ class CommonFactorEvalResult(EvalResult):
         
         # 5. Top-Bottom 累计收益图
         if "ls_cumret" in artifacts and not artifacts["ls_cumret"].empty:
-            fig5, ax5 = plt.subplots(figsize=figsize_ls_cumret)
+            fig5, ax5 = _new_figure(figsize_ls_cumret, show_fig)
             ls_cumret = artifacts["ls_cumret"]
             ls_cumret.plot(ax=ax5, label='Top-Bottom 多空组合', 
-                          color='purple', linewidth=2, alpha=0.8)
+                          color='purple', linewidth=2, alpha=0.8, rasterized=not show_fig)
             ax5.axhline(1, color='black', linestyle='--', linewidth=0.8)
             ax5.set_title(f'{factor_name} - Top-Bottom 累计收益 (Horizon={horizon}d)', 
                           fontsize=14, fontweight='bold')
@@ -226,7 +398,7 @@ class CommonFactorEvalResult(EvalResult):
             fig5.tight_layout()
             
             if save_path:
-                fig5.savefig(os.path.join(save_path, f'{factor_name}_ls_cumret.png'), dpi=dpi, bbox_inches='tight')
+                save_tasks.append((fig5, os.path.join(save_path, f'{factor_name}_ls_cumret.png')))
             
             if not show_fig:
                 plt.close(fig5)
@@ -235,7 +407,7 @@ class CommonFactorEvalResult(EvalResult):
         
         # 6. 平均10组未来收益柱状图
         if "mean_group_ret" in artifacts and not artifacts["mean_group_ret"].empty:
-            fig6, ax6 = plt.subplots(figsize=figsize_mean_group_ret)
+            fig6, ax6 = _new_figure(figsize_mean_group_ret, show_fig)
             mean_group_ret = artifacts["mean_group_ret"]
             x_pos = range(len(mean_group_ret))
             colors = ['red' if v < 0 else 'green' for v in mean_group_ret]
@@ -246,7 +418,7 @@ class CommonFactorEvalResult(EvalResult):
             ax6.set_xlabel('分组 (0=最低, 9=最高)', fontsize=12)
             ax6.set_ylabel('平均收益率', fontsize=12)
             ax6.set_xticks(x_pos)
-            ax6.set_xticklabels([f'G{i}' for i in range(len(mean_group_ret))])
+            ax6.set_xticklabels([f'G{i}' for i in x_pos])
             ax6.axhline(0, color='black', linestyle='-', linewidth=0.8)
             ax6.grid(alpha=0.3, axis='y')
             
@@ -260,13 +432,16 @@ class CommonFactorEvalResult(EvalResult):
             fig6.tight_layout()
             
             if save_path:
-                fig6.savefig(os.path.join(save_path, f'{factor_name}_mean_group_ret.png'), dpi=dpi, bbox_inches='tight')
+                save_tasks.append((fig6, os.path.join(save_path, f'{factor_name}_mean_group_ret.png')))
             
             if not show_fig:
                 plt.close(fig6)
             
             figures['mean_group_ret'] = fig6
         
+        if save_tasks:
+            _save_figures(save_tasks, dpi)
+        
         # 恢复默认样式
         if style != "default":
             plt.style.use('default')
@@ -290,10 +465,24 @@ class CommonFactorEvaluator(IEvaluator):
       - mean_group_ret（平均10组未来收益）
     """
 
-    def __init__(self, q: int = 10, top_pct: float = 0.2, long_high: bool = True):
+    def __init__(
+        self,
+        q: int = 10,
+        top_pct: float = 0.2,
+        long_high: bool = True,
+        analytics_dtype=np.float64,
+        artifacts_dtype=np.float32,
+    ):
         self._q = q
         self._top_pct = top_pct
         self._long_high = long_high
+        # 截面统计（IC / 分组 / 换手）使用的浮点类型，可设为 np.float32 减少内存带宽；
+        # 注意量级很大的因子在 float32 下会出现并列值，影响 Rank IC 与分组。
+        # 最终的均值/标准差汇总始终以 float64 计算
+        self._analytics_dtype = analytics_dtype
+        # artifacts 仅用于绘图和后处理，默认以 float32 保存，减半内存和序列化体积；
+        # 设为 None 时保留计算时的精度
+        self._artifacts_dtype = artifacts_dtype
 
     @property
     def name(self) -> str:
@@ -311,143 +500,99 @@ class CommonFactorEvaluator(IEvaluator):
         top_pct=0.2,
         long_high=True,
         horizon=1,
+        analytics_dtype=None,
         **_,
     ) -> EvalResult:
         # ---------- 0) 对齐与清洗 ----------
-        common_idx = factor.index.intersection(ret.index)
-        if common_idx.empty:
+        # 一次 inner join 完成对齐；analytics_dtype 可按次覆盖构造时设置的精度
+        dtype = self._analytics_dtype if analytics_dtype is None else analytics_dtype
+        tmp = pd.concat(
+            {
+                "factor": factor.astype(dtype, copy=False),
+                "ret": ret.astype(dtype, copy=False),
+            },
+            axis=1,
+            join="inner",
+        )
+        if tmp.empty:
             return self._empty_result(factor.name, "empty intersection")
 
-        factor = factor.loc[common_idx]
-        ret = ret.loc[common_idx]
-        
         # ✅ 收益摊销：将 horizon 期收益转换为日均收益
         if horizon > 1:
-            ret = ret / horizon
-
-        valid_mask = factor.notna() & ret.notna()
-        if not valid_mask.all():
-            factor = factor[valid_mask]
-            ret = ret[valid_mask]
+            tmp["ret"] = tmp["ret"] / horizon
 
-        if factor.empty:
+        tmp = tmp.dropna()
+        if tmp.empty:
             return self._empty_result(factor.name, "empty after dropna")
 
-        tmp = pd.DataFrame(
-            {"factor": factor.astype(float), "ret": ret.astype(float)}
-        ).sort_index()
+        tmp = tmp.sort_index()
 
         # ---------- 1) IC / Rank IC ----------
+        # 转为 (date x code) 宽表（一次 unstack 得到两张表），按行向量化计算截面相关系数
+        wide = tmp.unstack(level=-1)
+        wide_factor = wide["factor"]
+        wide_ret = wide["ret"]
+        # 分组和换手按 long_high 方向使用的因子宽表
+        wide_group = wide_factor if long_high else -wide_factor
+        # 因子截面排名只排序一次：Rank IC 用平均排名，换手用 first 排名；
+        # 方向相反时 top 组取升序的 first 排名
+        factor_rank, first_rank, first_rank_desc = _row_ranks(wide_factor)
+        if not long_high:
+            first_rank_desc = first_rank
+        
         if USE_NUMBA:
-            # 使用 numba 优化版本
-            dates = tmp.index.get_level_values(0)
-            date_categories = pd.Categorical(dates)
-            date_indices = date_categories.codes
-            n_dates = len(date_categories.categories)
-            
-            factor_values = tmp["factor"].values
-            return_values = tmp["ret"].values
+            # 使用 numba 优化版本：tmp 已按日期排序，每个日期的数据是一段连续区间，
+            # 一次遍历同时得到 IC、Rank IC 和分组收益
+            date_counts = wide_factor.notna().sum(axis=1).to_numpy()
+            offsets = np.zeros(len(date_counts) + 1, dtype=np.int64)
+            np.cumsum(date_counts, out=offsets[1:])
             
-            rank_ic_array = compute_rank_ic_by_date(
-                factor_values=factor_values,
-                returns=return_values,
-                date_indices=date_indices,
-                n_dates=n_dates
+            # 内核只针对 C 连续的 float64 数组编译一次，避免不同内存布局触发重复编译
+            ic_array, rank_ic_array, group_returns = compute_cross_section_stats(
+                factor_values=np.ascontiguousarray(tmp["factor"].to_numpy(dtype=np.float64)),
+                returns=np.ascontiguousarray(tmp["ret"].to_numpy(dtype=np.float64)),
+                offsets=offsets,
+                n_quantiles=q,
+                long_high=long_high,
             )
             
-            rank_ic_series = pd.Series(
-                rank_ic_array,
-                index=date_categories.categories,
-                name='rank_ic'
-            ).dropna()
-            
-            # IC (Pearson) 仍使用 pandas（速度已经够快）
-            def calc_ic(g):
-                if len(g) < 2 or g["factor"].std() == 0 or g["ret"].std() == 0:
-                    return np.nan
-                return g["factor"].corr(g["ret"])
-            
-            ic_series = tmp.groupby(level="date").apply(calc_ic).dropna()
+            ic_series = pd.Series(ic_array, index=wide_factor.index, name="ic").dropna()
+            rank_ic_series = pd.Series(rank_ic_array, index=wide_factor.index, name="rank_ic").dropna()
         else:
-            # 使用原始 pandas 版本
-            def calc_ics(g):
-                if len(g) < 2 or g["factor"].std() == 0 or g["ret"].std() == 0:
-                    return pd.Series({"ic": np.nan, "rank_ic": np.nan})
-                ic = g["factor"].corr(g["ret"])
-                rank_ic = g["factor"].corr(g["ret"], method="spearman")
-                return pd.Series({"ic": ic, "rank_ic": rank_ic})
-
-            ic_df = tmp.groupby(level="date").apply(calc_ics)
-            ic_series = ic_df["ic"].dropna()
-            rank_ic_series = ic_df["rank_ic"].dropna()
+            ic_series = _cross_sectional_corr(wide_factor, wide_ret).rename("ic").dropna()
+            # 截面排名后复用 Pearson 公式（平均排名，与 spearman 一致）
+            rank_ic_series = _cross_sectional_corr(
+                pd.DataFrame(factor_rank, index=wide_factor.index), wide_ret.rank(axis=1)
+            ).rename("rank_ic").dropna()
 
         def calc_stats(series: pd.Series):
-            if len(series) < 2:
+            # 输入已去除缺失值，直接在 ndarray 上计算，跳过 pandas 的缺失值处理
+            values = series.to_numpy(dtype=np.float64)
+            if len(values) < 2:
                 return np.nan, np.nan, np.nan, np.nan
-            mean = series.mean()
-            std = series.std(ddof=1)
+            mean = values.mean()
+            std = values.std(ddof=1)
             if std <= 1e-8:
                 return mean, std, np.nan, np.nan
             ir = mean / std
-            t_val = mean / (std / np.sqrt(len(series)))
+            t_val = mean / (std / np.sqrt(len(values)))
             return mean, std, ir, t_val
 
         ic_mean, ic_std, ic_ir, ic_t = calc_stats(ic_series)
         rank_ic_mean, rank_ic_std, rank_ic_ir, rank_ic_t = calc_stats(rank_ic_series)
 
         # ---------- 2) 分组收益（q组） ----------
-        fac_for_group = factor if long_high else -factor
-        tmp_group = pd.DataFrame({"factor": fac_for_group, "ret": ret}).sort_index()
-
-        if USE_NUMBA and len(tmp_group) > 1000:  # 只有数据量大时才用 numba
-            # 使用 numba 优化版本
-            dates = tmp_group.index.get_level_values(0)
-            date_categories = pd.Categorical(dates)
-            date_indices = date_categories.codes
-            n_dates = len(date_categories.categories)
-            
-            factor_values = tmp_group["factor"].values.astype(np.float64)
-            return_values = tmp_group["ret"].values.astype(np.float64)
-            
-            group_returns = compute_group_return_by_date(
-                factor_values=factor_values,
-                returns=return_values,
-                date_indices=date_indices,
-                n_dates=n_dates,
-                n_quantiles=q
-            )
-            
+        if USE_NUMBA:
+            # 有效样本少于 q 的日期不参与分组
+            enough = date_counts >= q
             group_ret_by_day = pd.DataFrame(
-                group_returns,
-                index=date_categories.categories,
+                group_returns[enough],
+                index=wide_factor.index[enough],
                 columns=list(range(q))
             )
         else:
-            # 使用原始 pandas 版本
-            def get_group_ret(g, q_bins):
-                if len(g) < q_bins:
-                    return pd.Series(dtype=float)
-                try:
-                    labels = pd.qcut(g["factor"], q_bins, labels=False, duplicates="drop")
-                except ValueError:
-                    return pd.Series(dtype=float)
-                return g["ret"].groupby(labels).mean()
-
-            # 结果：可能是 DataFrame(date x group)，也可能是 Series(date, group)
-            group_ret_stack = tmp_group.groupby(level="date").apply(lambda g: get_group_ret(g, q))
-
-            # ✅ 如果 apply 得到的是 Series（少见），才需要 unstack
-            if isinstance(group_ret_stack, pd.Series):
-                group_ret_by_day = group_ret_stack.unstack(level=-1).sort_index()
-            else:
-                # ✅ 常见情况：已经是 DataFrame
-                group_ret_by_day = group_ret_stack.sort_index()
-            
-            if not group_ret_by_day.empty:
-                # 补全列为 0..q-1，缺失用 NaN（利于统一绘图/比较）
-                group_ret_by_day.columns = group_ret_by_day.columns.astype(int)
-                all_cols = list(range(q))
-                group_ret_by_day = group_ret_by_day.reindex(columns=all_cols)
+            # 向量化版本：宽表上一次性按分位边界分组，再按 (date, group) 聚合
+            group_ret_by_day = _quantile_group_mean(wide_group, wide_ret, q)
 
         if group_ret_by_day.empty:
             mean_group_ret = pd.Series(dtype=float)
@@ -457,69 +602,48 @@ class CommonFactorEvaluator(IEvaluator):
             monotonic_series = pd.Series(dtype=float)
             monotonic_mean = np.nan
         else:
-            mean_group_ret = group_ret_by_day.mean()
+            # 分组收益只取一次 ndarray，均值、累计收益、多空和单调性共用
+            group_arr = group_ret_by_day.to_numpy(dtype=np.float64, na_value=np.nan)
+            valid_groups = ~np.isnan(group_arr)
+            group_filled = np.where(valid_groups, group_arr, 0.0)
+            group_count = valid_groups.sum(axis=0)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                group_mean = group_filled.sum(axis=0) / group_count
+            mean_group_ret = pd.Series(
+                np.where(group_count > 0, group_mean, np.nan), index=group_ret_by_day.columns
+            )
 
             # 多空收益 top-bottom
-            max_grp = group_ret_by_day.columns.max()
-            min_grp = group_ret_by_day.columns.min()
-            ls_series = group_ret_by_day[max_grp] - group_ret_by_day[min_grp]
-
-            # 累计收益
-            group_cumret = (1.0 + group_ret_by_day.fillna(0.0)).cumprod()
-            ls_cumret = (1.0 + ls_series.fillna(0.0)).cumprod()
+            columns = group_ret_by_day.columns
+            ls_values = group_arr[:, columns.argmax()] - group_arr[:, columns.argmin()]
+            ls_series = pd.Series(ls_values, index=group_ret_by_day.index)
+
+            # 累计收益（缺失收益按 0 处理）：在已填充的数组上原地加 1 并累乘，不再分配中间数组
+            np.add(group_filled, 1.0, out=group_filled)
+            np.cumprod(group_filled, axis=0, out=group_filled)
+            group_cumret = pd.DataFrame(
+                group_filled, index=group_ret_by_day.index, columns=columns, copy=False
+            )
+            ls_growth = np.nan_to_num(ls_values, nan=0.0)
+            np.add(ls_growth, 1.0, out=ls_growth)
+            np.cumprod(ls_growth, out=ls_growth)
+            ls_cumret = pd.Series(ls_growth, index=ls_series.index, copy=False)
 
             # ---------- 3) 收益单调性 ----------
-            if USE_NUMBA:
-                # 使用 numba 优化版本
-                def _mono_one_day(row: pd.Series):
-                    x = row.dropna()
-                    if len(x) < 2:
-                        return np.nan
-                    idx = x.index.astype(float).values  # 组号
-                    return compute_spearman_correlation(idx, x.values)
-                
-                monotonic_series = group_ret_by_day.apply(_mono_one_day, axis=1).dropna()
-            else:
-                # 使用原始 scipy 版本
-                def _mono_one_day(row: pd.Series):
-                    x = row.dropna()
-                    if len(x) < 2:
-                        return np.nan
-                    idx = x.index.astype(float)  # 组号
-                    corr_result = st.spearmanr(idx, x.values)
-                    return corr_result.correlation if hasattr(corr_result, 'correlation') else corr_result[0]
-                
-                monotonic_series = group_ret_by_day.apply(_mono_one_day, axis=1).dropna()
+            # 每日组号与组收益的 Spearman 相关：组号在有效组内的排名即有效组的累计计数，
+            # 与组收益的截面排名做 Pearson 相关，所有日期一次完成
+            group_rank = pd.DataFrame(
+                np.where(valid_groups, valid_groups.cumsum(axis=1), np.nan),
+                index=group_ret_by_day.index,
+            )
+            monotonic_series = _cross_sectional_corr(
+                group_rank, group_ret_by_day.rank(axis=1)
+            ).dropna()
             
             monotonic_mean = monotonic_series.mean()
 
         # ---------- 4) top 20% 换手 ----------
-        tmp_turnover = pd.DataFrame({"factor": fac_for_group}).sort_index()
-
-        def _get_top_codes_safe(g):
-            if len(g) == 0:
-                return set()
-            n = max(1, int(np.ceil(len(g) * top_pct)))
-            largest = g.nlargest(n, "factor")
-            if isinstance(largest.index, pd.MultiIndex):
-                return set(largest.index.get_level_values(-1))  # 最后一个 level 当 asset id
-            return set(largest.index)
-
-        top_sets = tmp_turnover.groupby(level="date").apply(_get_top_codes_safe).sort_index()
-
-        turnover_vals = []
-        dates = top_sets.index
-        prev_set = None
-        for d in dates:
-            cur_set = top_sets.loc[d]
-            if prev_set is None or len(cur_set) == 0:
-                turnover_vals.append(np.nan)
-            else:
-                overlap = len(cur_set & prev_set)
-                turnover_vals.append(1.0 - overlap / len(cur_set))
-            prev_set = cur_set
-
-        turnover_series = pd.Series(turnover_vals, index=dates, name="top_turnover")
+        turnover_series = _top_turnover(wide_group, top_pct, ranks=first_rank_desc)
         top_turnover_mean = turnover_series.mean(skipna=True)
 
         # ---------- 5) 汇总输出 ----------
@@ -562,6 +686,10 @@ class CommonFactorEvaluator(IEvaluator):
             "top_turnover_series": turnover_series,
             "monotonic_series": monotonic_series,
         }
+        if self._artifacts_dtype is not None:
+            artifacts = {
+                k: v.astype(self._artifacts_dtype, copy=False) for k, v in artifacts.items()
+            }
 
         f_name = str(factor.name) if factor.name is not None else "factor"
 
@@ -571,6 +699,7 @@ class CommonFactorEvaluator(IEvaluator):
             metrics=metrics,
             artifacts=artifacts,
             horizon=horizon,  # 传递 horizon 用于绘图
+            precision=np.dtype(dtype).name,
         )
 
     def _empty_result(self, factor_name, msg):
@@ -13,10 +13,17 @@ from .forward_return import build_forward_returns
 
 
 class EvaluatorEngine:
-    def align(self, factor: pd.Series, ret: pd.Series) -> pd.DataFrame:
-        """对齐因子和收益率，去除缺失值"""
-        tmp = pd.DataFrame({"factor": factor, "ret": ret})
-        return tmp.dropna()
+    def align(self, factor: pd.Series, ret: pd.Series) -> tuple[pd.Series, pd.Series]:
+        """对齐因子和收益率，去除缺失值（不构造中间 DataFrame）
+        Returns:
+            tuple[pd.Series, pd.Series]: 对齐后的 (factor, ret)，名称分别为 "factor", "ret"
+        """
+        if not factor.index.equals(ret.index):
+            common_idx = factor.index.intersection(ret.index)
+            factor = factor.reindex(common_idx)
+            ret = ret.reindex(common_idx)
+        mask = factor.notna().to_numpy() & ret.notna().to_numpy()
+        return factor[mask].rename("factor"), ret[mask].rename("ret")
 
     def _evaluate_one_horizon(
         self,
@@ -37,8 +44,8 @@ class EvaluatorEngine:
         if isinstance(evaluator, str):
             evaluator = get_evaluator(evaluator)
 
-        tmp = self.align(factor, ret)
-        res = evaluator.evaluate(tmp["factor"], tmp["ret"], **override_params)
+        aligned_factor, aligned_ret = self.align(factor, ret)
+        res = evaluator.evaluate(aligned_factor, aligned_ret, **override_params)
 
         # 自动补 factor_name（不改 evaluator 逻辑）
         if res.factor_name is None:
@@ -54,6 +61,7 @@ class EvaluatorEngine:
         evaluator: EvaluatorLike,
         price_col: str = "close",
         kind: Literal["simple", "log"] = "simple",
+        ret_df: pd.DataFrame | None = None,
         **override_params: Any,
     ) -> EvalResult:
         """
@@ -65,6 +73,8 @@ class EvaluatorEngine:
             price_col: 用于计算收益率的价格列名
             kind: 收益率计算方式，simple 或 log
             evaluator: 评价器实例或名称, 目前可选字符串有：'common_eval'
+            ret_df: 预先计算的 build_forward_returns 结果（需包含 ret_fwd_{horizon}d 列），
+                同一份数据重复评价时传入以跳过收益率计算；None 时由 df 现算
             override_params: 覆盖评价器默认参数的参数
         Returns:
             EvalResult: 评价结果
@@ -73,8 +83,9 @@ class EvaluatorEngine:
         if isinstance(df, pd.Series):
             df = df.to_frame(name=df.name or price_col)
         
-        # 1) 生成 forward returns
-        ret_df = build_forward_returns(df, [horizon], price_col=price_col, kind=kind)
+        # 1) 生成 forward returns（调用方已提供时直接使用）
+        if ret_df is None:
+            ret_df = build_forward_returns(df, [horizon], price_col=price_col, kind=kind)
         ret = ret_df[f"ret_fwd_{horizon}d"]
         
         return self._evaluate_one_horizon(
@@ -92,6 +103,7 @@ class EvaluatorEngine:
         evaluator: EvaluatorLike,
         price_col: str = "close",
         kind: Literal["simple", "log"] = "simple",
+        ret_df: pd.DataFrame | None = None,
         **override_params: Any,
     ) -> Dict[int, EvalResult]:
         """
@@ -103,6 +115,8 @@ class EvaluatorEngine:
             evaluator: 评价器实例或名称, 目前可选字符串有：'common_eval'
             price_col: 用于计算收益率的价格列名
             kind: 收益率计算方式，simple 或 log
+            ret_df: 预先计算的 build_forward_returns 结果（需包含各 horizon 的 ret_fwd_{h}d 列），
+                同一份数据重复评价时传入以跳过收益率计算；None 时由 df 现算
             override_params: 覆盖评价器默认参数的参数
         Returns:
             Dict[int, EvalResult]: {horizon: EvalResult}
@@ -111,19 +125,28 @@ class EvaluatorEngine:
         if isinstance(df, pd.Series):
             df = df.to_frame(name=df.name or price_col)
         
-        # 1) 生成所有 horizon 的 forward returns
-        ret_df = build_forward_returns(df, horizons, price_col=price_col, kind=kind)
+        if isinstance(evaluator, str):
+            evaluator = get_evaluator(evaluator)
+        
+        # 1) 生成所有 horizon 的 forward returns（调用方已提供时直接使用）
+        if ret_df is None:
+            ret_df = build_forward_returns(df, horizons, price_col=price_col, kind=kind)
+        ret_cols = [f"ret_fwd_{h}d" for h in horizons]
+
+        # 2) 因子与所有 horizon 收益一次性对齐、排序，各 horizon 只需按列去除缺失值
+        panel = pd.concat([factor.rename("factor"), ret_df[ret_cols]], axis=1).sort_index()
 
         out: Dict[int, EvalResult] = {}
         for horizon in horizons:
-            ret = ret_df[f"ret_fwd_{horizon}d"]
-            result = self._evaluate_one_horizon(
-                factor, ret,
-                evaluator=evaluator,
+            tmp = panel[["factor", f"ret_fwd_{horizon}d"]].dropna()
+            res = evaluator.evaluate(
+                tmp["factor"], tmp[f"ret_fwd_{horizon}d"].rename("ret"),
                 horizon=horizon,
                 **override_params,
             )
-            out[horizon] = result
+            if res.factor_name is None:
+                res.factor_name = factor.name # type: ignore
+            out[horizon] = res
         
         return out
     
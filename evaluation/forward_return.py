@@ -1,6 +1,6 @@
 # evaluation/forward_return.py
 from __future__ import annotations
-from typing import List, Dict, Optional
+from typing import List, Optional
 import pandas as pd
 import numpy as np
 
@@ -29,20 +29,25 @@ def build_forward_returns(
     if price_col not in df.columns:
         raise ValueError(f"price_col '{price_col}' not in df.columns")
 
-    px = df[price_col]
-    # 按 code 做时间序列 shift，取未来价格
-    g = px.groupby(level="code")
+    if kind not in ("simple", "log"):
+        raise ValueError("kind must be 'simple' or 'log'")
 
-    out: Dict[str, pd.Series] = {}
-    for h in horizons:
-        future_px = g.shift(-h)
-        if kind == "simple":
-            ret = future_px / px - 1.0
-        elif kind == "log":
-            ret = np.log(future_px / px)
-        else:
-            raise ValueError("kind must be 'simple' or 'log'")
+    px = df[price_col].to_numpy(dtype=np.float64)
+    # 按 code 层的整数编码分组（无需对字符串做哈希），分组器只构建一次，各 horizon 复用
+    index = df.index
+    codes = np.asarray(index.codes[index.names.index("code")])
+    g = pd.Series(px).groupby(codes, sort=False)
 
-        out[f"ret_fwd_{h}d"] = ret
+    # 所有 horizon 的未来价格写入同一个二维数组，收益一次性向量化计算
+    future_px = np.empty((len(px), len(horizons)), dtype=np.float64)
+    for k, h in enumerate(horizons):
+        future_px[:, k] = g.shift(-h).to_numpy()
 
-    return pd.DataFrame(out)
+    if kind == "simple":
+        ret = future_px / px[:, None] - 1.0
+    else:
+        ret = np.log(future_px / px[:, None])
+
+    return pd.DataFrame(
+        ret, index=index, columns=[f"ret_fwd_{h}d" for h in horizons], copy=False
+    )
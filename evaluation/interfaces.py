@@ -20,6 +20,7 @@ class EvalResult:
     metrics: 数值指标
     artifacts: 绘图/后处理用的结构化数据（Series/DataFrame/ndarray）
     notes: 其他备注信息
+    precision: 截面统计使用的浮点精度（如 "float64" / "float32"）
     
     Note:
         子类应该继承此类并实现 plot_artifacts 方法来提供特定的绘图功能
@@ -34,6 +35,8 @@ class EvalResult:
     # 添加 horizon 字段
     horizon: int = 1
 
+    precision: str = "float64"
+
     def plot_artifacts(
         self,
         show_fig: bool = False,
@@ -8,7 +8,7 @@ import numpy as np
 from numba import jit, prange
 
 
-@jit(nopython=True, parallel=True)
+@jit(nopython=True, parallel=True, cache=True)
 def compute_rank_ic_by_date(
     factor_values: np.ndarray,
     returns: np.ndarray,
@@ -55,9 +55,9 @@ def compute_rank_ic_by_date(
         if np.std(valid_factors) == 0 or np.std(valid_returns) == 0:
             continue
         
-        # 计算排名 (argsort 两次得到排名)
-        factor_rank = np.argsort(np.argsort(valid_factors)).astype(np.float64)
-        return_rank = np.argsort(np.argsort(valid_returns)).astype(np.float64)
+        # 计算排名（一次排序后按顺序回填，并列取平均）
+        factor_rank = _average_rank(valid_factors)
+        return_rank = _average_rank(valid_returns)
         
         # 计算 Pearson 相关系数 (对排名)
         factor_mean = np.mean(factor_rank)
@@ -75,7 +75,7 @@ def compute_rank_ic_by_date(
     return ic_array
 
 
-@jit(nopython=True)
+@jit(nopython=True, cache=True)
 def compute_quantile_labels(values: np.ndarray, n_quantiles: int) -> np.ndarray:
     """
     计算分位数标签
@@ -110,7 +110,7 @@ def compute_quantile_labels(values: np.ndarray, n_quantiles: int) -> np.ndarray:
     return labels
 
 
-@jit(nopython=True, parallel=True)
+@jit(nopython=True, parallel=True, cache=True)
 def compute_group_return_by_date(
     factor_values: np.ndarray,
     returns: np.ndarray,
@@ -167,7 +167,7 @@ def compute_group_return_by_date(
     return group_returns
 
 
-@jit(nopython=True)
+@jit(nopython=True, cache=True)
 def compute_spearman_correlation(x: np.ndarray, y: np.ndarray) -> float:
     """
     计算 Spearman 相关系数
@@ -182,9 +182,9 @@ def compute_spearman_correlation(x: np.ndarray, y: np.ndarray) -> float:
     if len(x) != len(y) or len(x) < 2:
         return np.nan
     
-    # 计算排名
-    x_rank = np.argsort(np.argsort(x)).astype(np.float64)
-    y_rank = np.argsort(np.argsort(y)).astype(np.float64)
+    # 计算排名（一次排序后按顺序回填，并列取平均）
+    x_rank = _average_rank(x)
+    y_rank = _average_rank(y)
     
     # 计算 Pearson 相关系数 (对排名)
     x_mean = np.mean(x_rank)
@@ -200,3 +200,280 @@ def compute_spearman_correlation(x: np.ndarray, y: np.ndarray) -> float:
         return numerator / denominator
     
     return np.nan
+
+
+@jit(nopython=True, cache=True)
+def _average_rank(values: np.ndarray) -> np.ndarray:
+    """
+    计算平均排名（并列取平均，从 1 开始），与 pandas rank(method="average") 一致
+    
+    Args:
+        values: 值数组（不含 NaN）
+        
+    Returns:
+        排名数组
+    """
+    n = len(values)
+    order = np.argsort(values, kind='mergesort')
+    ranks = np.empty(n, dtype=np.float64)
+    
+    i = 0
+    while i < n:
+        j = i
+        while j + 1 < n and values[order[j + 1]] == values[order[i]]:
+            j += 1
+        avg = (i + j) / 2.0 + 1.0
+        for k in range(i, j + 1):
+            ranks[order[k]] = avg
+        i = j + 1
+    
+    return ranks
+
+
+@jit(nopython=True, cache=True)
+def _pearson(x: np.ndarray, y: np.ndarray) -> float:
+    """
+    计算 Pearson 相关系数，任一方差为 0 时返回 NaN
+    """
+    x_mean = np.mean(x)
+    y_mean = np.mean(y)
+    
+    sxy = 0.0
+    sxx = 0.0
+    syy = 0.0
+    for i in range(len(x)):
+        dx = x[i] - x_mean
+        dy = y[i] - y_mean
+        sxy += dx * dy
+        sxx += dx * dx
+        syy += dy * dy
+    
+    if sxx <= 0 or syy <= 0:
+        return np.nan
+    return sxy / np.sqrt(sxx * syy)
+
+
+@jit(nopython=True, cache=True)
+def _qcut_sorted_labels(sorted_vals: np.ndarray, n_quantiles: int) -> np.ndarray:
+    """
+    对升序排列的值计算 pd.qcut(labels=False, duplicates="drop") 的组号
+    
+    边界为第 k * (n - 1) / q 位的线性插值（位置用整数运算精确求得），相同的边界只保留一个，
+    相等的值落在同一组；全部值相同时没有分组，返回全 -1
+    
+    Args:
+        sorted_vals: 升序排列、不含 NaN 的值数组
+        n_quantiles: 分组数量
+        
+    Returns:
+        与 sorted_vals 一一对应的组号数组
+    """
+    n = len(sorted_vals)
+    labels = np.full(n, -1, dtype=np.int64)
+    edges = np.empty(n_quantiles + 1, dtype=np.float64)
+    m = 0
+    for k in range(n_quantiles + 1):
+        pos = k * (n - 1)
+        i = pos // n_quantiles
+        r = pos % n_quantiles
+        if r == 0:
+            e = sorted_vals[i]
+        else:
+            a = sorted_vals[i]
+            e = a + (sorted_vals[i + 1] - a) * (r / n_quantiles)
+        if m == 0 or e != edges[m - 1]:
+            edges[m] = e
+            m += 1
+    if m < 2:
+        return labels
+    
+    # 值已排序，组号单调不减：落在 (edges[j-1], edges[j]] 的值为第 j - 1 组，最小值归第 0 组
+    j = 1
+    for k in range(n):
+        while sorted_vals[k] > edges[j]:
+            j += 1
+        labels[k] = j - 1
+    return labels
+
+
+@jit(nopython=True, parallel=True, cache=True)
+def compute_cross_section_stats(
+    factor_values: np.ndarray,
+    returns: np.ndarray,
+    offsets: np.ndarray,
+    n_quantiles: int,
+    long_high: bool = True
+):
+    """
+    一次遍历计算每个日期截面的 IC、Rank IC 和分组收益
+    
+    数据需按日期排序且不含 NaN，第 d 个日期的数据位于 [offsets[d], offsets[d+1])；
+    分组与 pd.qcut(labels=False, duplicates="drop") 一致，见 _qcut_sorted_labels
+    
+    Args:
+        factor_values: 因子值数组
+        returns: 收益率数组
+        offsets: 各日期数据的起始位置，长度为日期数 + 1
+        n_quantiles: 分组数量
+        long_high: 分组时是否按因子值从低到高排序（False 时取反）
+        
+    Returns:
+        (每日 IC 数组, 每日 Rank IC 数组, 分组收益率数组 (n_dates, n_quantiles))
+    """
+    n_dates = len(offsets) - 1
+    ic_array = np.full(n_dates, np.nan, dtype=np.float64)
+    rank_ic_array = np.full(n_dates, np.nan, dtype=np.float64)
+    group_returns = np.full((n_dates, n_quantiles), np.nan, dtype=np.float64)
+    
+    for d in prange(n_dates):
+        lo = offsets[d]
+        hi = offsets[d + 1]
+        n = hi - lo
+        if n < 2:
+            continue
+        
+        date_factors = factor_values[lo:hi]
+        date_returns = returns[lo:hi]
+        
+        ic_array[d] = _pearson(date_factors, date_returns)
+        rank_ic_array[d] = _pearson(_average_rank(date_factors), _average_rank(date_returns))
+        
+        if n < n_quantiles:
+            continue
+        
+        # 按方向调整后的因子值排序分组，相等的值落在同一组
+        x = date_factors if long_high else -date_factors
+        order = np.argsort(x)
+        labels = _qcut_sorted_labels(x[order], n_quantiles)
+        
+        sums = np.zeros(n_quantiles, dtype=np.float64)
+        counts = np.zeros(n_quantiles, dtype=np.int64)
+        for k in range(n):
+            g = labels[k]
+            if g < 0:
+                break
+            sums[g] += date_returns[order[k]]
+            counts[g] += 1
+        
+        for g in range(n_quantiles):
+            if counts[g] > 0:
+                group_returns[d, g] = sums[g] / counts[g]
+    
+    return ic_array, rank_ic_array, group_returns
+
+
+@jit(nopython=True, parallel=True, cache=True)
+def compute_batch_cross_section_stats(
+    factors: np.ndarray,
+    returns: np.ndarray,
+    n_quantiles: int,
+    top_pct: float,
+    long_high: bool = True
+):
+    """
+    多因子 × 多 horizon 一次计算每日的 IC、Rank IC、top 换手、多空收益和收益单调性
+    
+    每个 (因子, horizon) 组合与 CommonFactorEvaluator 一致：只使用因子与收益同时有效的标的，
+    没有有效标的的日期视为不存在（换手与前一个存在的日期比较）；
+    有效标的少于 n_quantiles 的日期不分组
+    
+    Args:
+        factors: 因子面板 (F, T, N)，缺失为 NaN
+        returns: 收益面板 (H, T, N)，缺失为 NaN
+        n_quantiles: 分组数量
+        top_pct: top 组占比
+        long_high: 是否因子值越大越好（False 时分组与 top 组方向取反）
+        
+    Returns:
+        (IC, Rank IC, top 换手, 多空收益, 收益单调性)，均为 (F, H, T) 数组，无值为 NaN
+    """
+    n_factors, n_dates, n_codes = factors.shape
+    n_horizons = returns.shape[0]
+    ic = np.full((n_factors, n_horizons, n_dates), np.nan, dtype=np.float64)
+    rank_ic = np.full((n_factors, n_horizons, n_dates), np.nan, dtype=np.float64)
+    turnover = np.full((n_factors, n_horizons, n_dates), np.nan, dtype=np.float64)
+    ls = np.full((n_factors, n_horizons, n_dates), np.nan, dtype=np.float64)
+    monotonic = np.full((n_factors, n_horizons, n_dates), np.nan, dtype=np.float64)
+    
+    for p in prange(n_factors * n_horizons):
+        f = p // n_horizons
+        h = p % n_horizons
+        member = np.zeros(n_codes, dtype=np.bool_)
+        prev_member = np.zeros(n_codes, dtype=np.bool_)
+        has_prev = False
+        cols = np.empty(n_codes, dtype=np.int64)
+        
+        for t in range(n_dates):
+            # 因子与收益同时有效的标的（按标的顺序）
+            n = 0
+            for j in range(n_codes):
+                if not (np.isnan(factors[f, t, j]) or np.isnan(returns[h, t, j])):
+                    cols[n] = j
+                    n += 1
+            if n == 0:
+                continue
+            valid_cols = cols[:n]
+            x = np.empty(n, dtype=np.float64)
+            y = np.empty(n, dtype=np.float64)
+            for k in range(n):
+                x[k] = factors[f, t, valid_cols[k]]
+                y[k] = returns[h, t, valid_cols[k]]
+            
+            if n >= 2:
+                ic[f, h, t] = _pearson(x, y)
+                rank_ic[f, h, t] = _pearson(_average_rank(x), _average_rank(y))
+            
+            # top 组：方向上最优的 ceil(n * top_pct) 个标的，并列按标的顺序取前者
+            n_top = max(1, int(np.ceil(n * top_pct)))
+            if long_high:
+                top_order = np.argsort(-x, kind='mergesort')
+            else:
+                top_order = np.argsort(x, kind='mergesort')
+            member[:] = False
+            for k in range(n_top):
+                member[valid_cols[top_order[k]]] = True
+            if has_prev:
+                overlap = 0
+                for j in range(n_codes):
+                    if member[j] and prev_member[j]:
+                        overlap += 1
+                turnover[f, h, t] = 1.0 - overlap / n_top
+            prev_member[:] = member
+            has_prev = True
+            
+            if n < n_quantiles:
+                continue
+            
+            # 分组收益：与 compute_cross_section_stats 相同的分组规则，相等的值落在同一组
+            xg = x if long_high else -x
+            order = np.argsort(xg)
+            labels = _qcut_sorted_labels(xg[order], n_quantiles)
+            sums = np.zeros(n_quantiles, dtype=np.float64)
+            counts = np.zeros(n_quantiles, dtype=np.int64)
+            for k in range(n):
+                g = labels[k]
+                if g < 0:
+                    break
+                sums[g] += y[order[k]]
+                counts[g] += 1
+            means = np.full(n_quantiles, np.nan, dtype=np.float64)
+            m = 0
+            for g in range(n_quantiles):
+                if counts[g] > 0:
+                    means[g] = sums[g] / counts[g]
+                    m += 1
+            ls[f, h, t] = means[n_quantiles - 1] - means[0]
+            
+            # 收益单调性：有效组的组号排名与组收益排名的相关系数
+            if m >= 2:
+                group_rank = np.empty(m, dtype=np.float64)
+                group_ret = np.empty(m, dtype=np.float64)
+                k = 0
+                for g in range(n_quantiles):
+                    if counts[g] > 0:
+                        group_rank[k] = k + 1.0
+                        group_ret[k] = means[g]
+                        k += 1
+                monotonic[f, h, t] = _pearson(group_rank, _average_rank(group_ret))
+    
+    return ic, rank_ic, turnover, ls, monotonic
@@ -1,13 +1,17 @@
 # evaluation/registry.py
 from __future__ import annotations
 
-from typing import Any, Callable, Dict, Optional, List
+import sys
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Optional, List, Mapping
 import pandas as pd
 
 from .interfaces import IEvaluator, EvalResult
 
 
 _EVAL_REGISTRY: Dict[str, IEvaluator] = {}
+# 已注册 evaluator 的只读视图，供外部查询，无需拷贝
+evaluators_view: Mapping[str, IEvaluator] = MappingProxyType(_EVAL_REGISTRY)
 
 
 class FunctionEvaluator(IEvaluator):
@@ -15,7 +19,7 @@ class FunctionEvaluator(IEvaluator):
     把函数包装成 IEvaluator（非 dataclass）
     """
     def __init__(self, name: str, func: Callable[..., EvalResult], default_params=None):
-        self._name = name
+        self._name = sys.intern(name)
         self._func = func
         self._default_params = default_params or {}
 
@@ -58,13 +62,14 @@ def add_evaluator(evaluator: IEvaluator):
 
 def get_evaluator(name: str) -> IEvaluator:
     """获取已注册的evaluator"""
-    if name not in _EVAL_REGISTRY:
+    try:
+        return _EVAL_REGISTRY[name]
+    except KeyError:
         available = list(_EVAL_REGISTRY.keys())
         raise KeyError(
             f"Evaluator '{name}' not registered. "
             f"Available evaluators: {available}"
-        )
-    return _EVAL_REGISTRY[name]
+        ) from None
 
 
 def list_evaluators() -> List[IEvaluator]:
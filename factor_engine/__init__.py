@@ -1,21 +1,21 @@
 # factor_engine/__init__.py
 
 from .interfaces import (
-    FactorSpec,FactorFunc,FactorLike,FactorList,PerFactorParams,
+    FactorSpec,FactorFunc,FactorLike,FactorList,PerFactorParams,FactorContext,
 )
 
 from .registry import (
-    register_factor,get_factor,list_factors,
+    register_factor,get_factor,list_factors,factors_view,
 )
 
 from .engine import FactorEngine
 
 __all__ = [
     # models / interfaces
-    "FactorSpec","FactorFunc","FactorLike","FactorList","PerFactorParams",
+    "FactorSpec","FactorFunc","FactorLike","FactorList","PerFactorParams","FactorContext",
 
     # registry
-    "register_factor","get_factor","list_factors",
+    "register_factor","get_factor","list_factors","factors_view",
 
     # engine
     "FactorEngine",
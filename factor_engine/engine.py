@@ -1,19 +1,127 @@
 # factor_engine/engine.py
 from __future__ import annotations
 
-from typing import Any, Dict, List
+import os
+import inspect
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+import numpy as np
 import pandas as pd
 
-from .interfaces import FactorSpec, FactorLike, FactorList, PerFactorParams
-from .registry import get_factor, list_factors
+from .interfaces import FactorSpec, FactorLike, FactorList, PerFactorParams, FactorContext
+from .registry import list_factors
+from .registry import _FACTOR_REGISTRY as _REG
+
+
+# 因子输入数值列的计算精度，可通过环境变量 FACTOR_DTYPE=float32 将 float64 输入列降为 float32
+# （内存带宽减半，适合排名 / IC 类用途）；默认 float64，与原始数据精度一致。
+# 只允许 float32 / float64：float16 最大值约 65504，成交量、成交额类字段会溢出为 inf
+FACTOR_DTYPE = np.dtype(os.environ.get("FACTOR_DTYPE", "float64"))
+if FACTOR_DTYPE not in (np.float32, np.float64):
+    raise ValueError(f"FACTOR_DTYPE must be float32 or float64, got {FACTOR_DTYPE}")
+
+
+def _project(df: pd.DataFrame, fields: Tuple[str, ...]) -> pd.DataFrame:
+    """取出因子所需字段；FACTOR_DTYPE 不是 float64 时将 float64 列转换为该精度"""
+    use_df = df[list(fields)] if fields else df
+    if FACTOR_DTYPE != np.float64:
+        cast = {c: FACTOR_DTYPE for c, dt in use_df.dtypes.items() if dt == np.float64}
+        if cast:
+            use_df = use_df.astype(cast)
+    return use_df
+
+
+def _build_context(df: pd.DataFrame) -> FactorContext:
+    """构造 df 对应的 FactorContext；只在一次计算调用内使用，调用结束后随之释放"""
+    from .primitives import sorted_soa
+
+    index = df.index
+    sort_perm, group_starts = sorted_soa(index, level="code")
+    return FactorContext(
+        codes=np.asarray(index.codes[index.names.index("code")]),
+        dates=np.asarray(index.codes[index.names.index("date")]),
+        sort_perm=sort_perm,
+        group_starts=group_starts,
+        columns_soa={c: df[c].to_numpy() for c in df.columns},
+    )
+
+
+@lru_cache(maxsize=None)
+def _accepts_ctx(func) -> bool:
+    """因子函数是否声明了 ctx 参数"""
+    try:
+        return "ctx" in inspect.signature(func).parameters
+    except (TypeError, ValueError):
+        return False
+
+
+def _call_factor(spec: FactorSpec, use_df: pd.DataFrame, params: Dict[str, Any], ctx: Optional[FactorContext]):
+    """调用因子函数；声明了 ctx 参数的因子额外传入共享的 FactorContext"""
+    if _accepts_ctx(spec.func):
+        params = {**params, "ctx": ctx}
+    return spec.func(use_df, **params)
+
+
+def _reindex_take(src: pd.Index, target: pd.Index) -> np.ndarray:
+    """target 每行在 src 中的位置（不存在为 -1），src 有重复值时与 reindex 一样报错"""
+    if not src.is_unique:
+        raise ValueError("cannot reindex on an axis with duplicate labels")
+    return src.get_indexer(target)
+
+
+def _take_reindex(s: pd.Series, take: np.ndarray, target: pd.Index) -> pd.Series:
+    """按位置映射把 s 对齐到 target，结果与 s.reindex(target) 一致"""
+    values = s.to_numpy()
+    missing = take < 0
+    if not missing.any():
+        out = values[take]
+    elif values.dtype.kind == "f" and len(values):
+        out = values[take]
+        out[missing] = np.nan
+    else:
+        # 非浮点类型缺失值的填充规则较复杂，交给 pandas 处理
+        return s.reindex(target)
+    return pd.Series(out, index=target, name=s.name, copy=False)
+
+
+# 并行计算时子进程持有的基础数据，以及该进程内因子共享的 FactorContext（首次需要时构造）；
+# 进程池只存活于一次 compute_all 调用，两者随子进程退出释放
+_WORKER_DF: Optional[pd.DataFrame] = None
+_WORKER_CTX: Optional[FactorContext] = None
+
+
+def _init_worker(df: pd.DataFrame):
+    """进程池初始化：每个子进程只接收一次基础数据"""
+    global _WORKER_DF, _WORKER_CTX
+    _WORKER_DF = df
+    _WORKER_CTX = None
+
+
+def _compute_factor_worker(spec: FactorSpec, params: Dict[str, Any]):
+    """在子进程中计算单个因子（顶层函数，便于 pickle）"""
+    global _WORKER_CTX
+    if _WORKER_CTX is None and _accepts_ctx(spec.func):
+        _WORKER_CTX = _build_context(_WORKER_DF)
+    use_df = _project(_WORKER_DF, spec.required_fields)
+    return _call_factor(spec, use_df, params, _WORKER_CTX)
 
 
 class FactorEngine:
     """
     极简因子引擎：
     输入 df: MultiIndex(date, code)
+
+    因子函数声明 ctx 参数时，引擎会传入 FactorContext（按 code 分组的布局、共享中间结果等）：
+    一次 compute_all / compute_iter 调用内所有因子共用一个，调用结束后释放，
+    不跨调用保留（df 被原地修改后再次计算不会取到旧的中间结果）
     """
 
+    @staticmethod
+    def _prepare_context(df: pd.DataFrame) -> FactorContext:
+        """构造 df 对应的 FactorContext"""
+        return _build_context(df)
+
     def compute_one(
         self,
         df: pd.DataFrame,
@@ -26,35 +134,119 @@ class FactorEngine:
         override_params:
             本次调用对该因子 params 的覆盖（只作用于这个因子）
         """
-        if not isinstance(df.index, pd.MultiIndex):
+        # 输入 / 输出类型检查只在调试模式下执行，python -O 运行时整体跳过
+        if __debug__ and not isinstance(df.index, pd.MultiIndex):
             raise TypeError("df index must be MultiIndex(date, code).")
 
-        spec = get_factor(factor) if isinstance(factor, str) else factor
+        spec = _REG[factor] if factor.__class__ is str else factor
 
         missing = [f for f in spec.required_fields if f not in df.columns]
         if missing:
             raise ValueError(f"{spec.name} missing fields: {missing}")
 
-        use_df = df[spec.required_fields] if spec.required_fields else df
+        use_df = _project(df, spec.required_fields)
 
-        params = dict(spec.params)
-        params.update(override_params)
+        params = {**spec.params, **override_params}
 
-        s = spec.func(use_df, **params)
-        if not isinstance(s, pd.Series):
+        ctx = _build_context(df) if _accepts_ctx(spec.func) else None
+        s = _call_factor(spec, use_df, params, ctx)
+        if __debug__ and s.__class__ is not pd.Series and not isinstance(s, pd.Series):
             raise TypeError(f"{spec.name} must return pd.Series.")
 
-        if not s.index.equals(df.index):
+        if not spec.index_safe and s.index is not df.index and not s.index.equals(df.index):
             s = s.reindex(df.index)
 
         s.name = spec.name
         return s
 
+    @staticmethod
+    def _prepare(
+        df: pd.DataFrame,
+        factors: FactorList,
+        per_factor_params: PerFactorParams,
+        override_params: Dict[str, Any],
+    ) -> List[tuple]:
+        """统一解析因子、检查字段、合并参数，返回 [(spec, params), ...]，计算阶段只负责调用因子函数"""
+        specs = list_factors() if factors is None else factors
+
+        cols = set(df.columns)
+        prepared: List[tuple] = []
+        for f in specs:
+            spec = _REG[f] if f.__class__ is str else f
+
+            missing = [c for c in spec.required_fields if c not in cols]
+            if missing:
+                raise ValueError(f"{spec.name} missing fields: {missing}")
+
+            # 参数优先级：全局覆盖 > per-factor 覆盖 > 因子默认参数，一次合并得到最终参数
+            pf = per_factor_params.get(spec.name) if per_factor_params else None
+            params = {**spec.params, **(pf or {}), **override_params}
+
+            prepared.append((spec, params))
+        return prepared
+
+    @staticmethod
+    def _finalize(spec: FactorSpec, s: pd.Series, idx: pd.Index, take_cache: Dict[int, tuple]) -> pd.Series:
+        """检查因子结果类型并对齐到 idx
+        Args:
+            take_cache: {id(结果 index): (结果 index, 位置映射)}，返回相同 index 的因子只做一次哈希查找；
+                同时持有 index 对象，保证其 id 在缓存存活期间不被复用
+        """
+        if __debug__ and s.__class__ is not pd.Series and not isinstance(s, pd.Series):
+            raise TypeError(f"{spec.name} must return pd.Series.")
+
+        if not spec.index_safe and s.index is not idx and not s.index.equals(idx):
+            cached = take_cache.get(id(s.index))
+            if cached is None:
+                cached = take_cache[id(s.index)] = (s.index, _reindex_take(s.index, idx))
+            s = _take_reindex(s, cached[1], idx)
+
+        s.name = spec.name
+        return s
+
+    def _iter_prepared(self, df: pd.DataFrame, prepared: List[tuple]) -> Iterator[Tuple[FactorSpec, pd.Series]]:
+        """串行逐个计算已解析的因子，FactorContext 在首个需要它的因子处构造，迭代结束后释放"""
+        # 字段投影只构造一次，字段相同的因子共用同一个子表
+        proj_cache: Dict[tuple, pd.DataFrame] = {}
+        take_cache: Dict[int, tuple] = {}
+        ctx: Optional[FactorContext] = None
+        for spec, params in prepared:
+            key = spec.required_fields
+            use_df = proj_cache.get(key)
+            if use_df is None:
+                use_df = proj_cache[key] = _project(df, key)
+            if ctx is None and _accepts_ctx(spec.func):
+                ctx = _build_context(df)
+                ctx.pending = frozenset(p.name for p, _ in prepared)
+            s = _call_factor(spec, use_df, params, ctx)
+            yield spec, self._finalize(spec, s, df.index, take_cache)
+
+    def compute_iter(
+        self,
+        df: pd.DataFrame,
+        factors: FactorList = None,
+        per_factor_params: PerFactorParams = None,
+        **override_params: Any,
+    ) -> Iterator[Tuple[FactorSpec, pd.Series]]:
+        """
+        逐个计算因子并立即返回 (spec, 因子值)，调用方可以边算边评价、入库，
+        不必同时持有所有因子的结果
+
+        参数含义与 compute_all 相同；所有因子的解析和字段检查在第一次取值时一次完成
+        """
+        # 输入 / 输出类型检查只在调试模式下执行，python -O 运行时整体跳过
+        if __debug__ and not isinstance(df.index, pd.MultiIndex):
+            raise TypeError("df index must be MultiIndex(date, code).")
+
+        prepared = self._prepare(df, factors, per_factor_params, override_params)
+        yield from self._iter_prepared(df, prepared)
+
     def compute_all(
         self,
         df: pd.DataFrame,
         factors: FactorList = None,
         per_factor_params: PerFactorParams = None,
+        n_jobs: int = 1,
         **override_params: Any,
     ) -> pd.DataFrame:
         """
@@ -67,41 +259,50 @@ class FactorEngine:
         per_factor_params:
             对“某些因子”做独立 params 覆盖（优先级高于全局 override）
 
+        n_jobs:
+            并行计算的进程数，1 表示串行，-1 表示使用全部 CPU 核心；
+            并行时因子函数需可被 pickle（模块顶层函数）
+
         override_params:
             本次批量对所有因子的“全局覆盖参数”（优先级最低）
         """
-        if not isinstance(df.index, pd.MultiIndex):
+        if __debug__ and not isinstance(df.index, pd.MultiIndex):
             raise TypeError("df index must be MultiIndex(date, code).")
 
-        specs = list(list_factors()) if factors is None else list(factors)
-
-        out: List[pd.Series] = []
-        for f in specs:
-            spec = get_factor(f) if isinstance(f, str) else f
-
-            missing = [c for c in spec.required_fields if c not in df.columns]
-            if missing:
-                raise ValueError(f"{spec.name} missing fields: {missing}")
-
-            use_df = df[spec.required_fields] if spec.required_fields else df
-
-            params = dict(spec.params)
-
-            # 1) per-factor 覆盖
-            if per_factor_params and spec.name in per_factor_params:
-                params.update(per_factor_params[spec.name])
-
-            # 2) 全局覆盖
-            params.update(override_params)
-
-            s = spec.func(use_df, **params)
-            if not isinstance(s, pd.Series):
-                raise TypeError(f"{spec.name} must return pd.Series.")
+        idx = df.index
+        prepared = self._prepare(df, factors, per_factor_params, override_params)
 
-            if not s.index.equals(df.index):
-                s = s.reindex(df.index)
+        if n_jobs < 0:
+            n_jobs = os.cpu_count() or 1
+        max_workers = min(n_jobs, len(prepared))
 
-            s.name = spec.name
-            out.append(s)
+        if max_workers > 1:
+            # 每个子进程只接收一次基础数据，按提交顺序取回结果
+            with ProcessPoolExecutor(
+                max_workers=max_workers,
+                initializer=_init_worker,
+                initargs=(df,),
+            ) as executor:
+                results = list(executor.map(
+                    _compute_factor_worker,
+                    [spec for spec, _ in prepared],
+                    [params for _, params in prepared],
+                ))
+            take_cache: Dict[int, tuple] = {}
+            out = [
+                self._finalize(spec, s, idx, take_cache)
+                for (spec, _), s in zip(prepared, results)
+            ]
+        else:
+            out = [s for _, s in self._iter_prepared(df, prepared)]
 
-        return pd.concat(out, axis=1) if out else pd.DataFrame(index=df.index)
+        if not out:
+            return pd.DataFrame(index=df.index)
+        if len(out) == 1:
+            return out[0].to_frame()
+        names = [s.name for s in out]
+        if len(set(names)) < len(names):
+            # 因子名重复时保留重复列
+            return pd.concat(out, axis=1)
+        # 所有结果都已对齐到 df.index，直接按列构造，跳过逐列的索引对齐
+        return pd.DataFrame({s.name: s.to_numpy() for s in out}, index=idx, copy=False)
@@ -2,7 +2,8 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, field
-from typing import Any, Callable, Dict, List, Optional, Sequence, Union, TypeAlias
+from typing import Any, Callable, Dict, FrozenSet, Optional, Sequence, Tuple, Union, TypeAlias
+import numpy as np
 import pandas as pd
 
 
@@ -22,22 +23,66 @@ FactorFunc: TypeAlias = Callable[..., pd.Series]
 # ---------------------------
 # 2) 因子模型（接口）
 # ---------------------------
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class FactorSpec:
     """
     极简因子规格（现在够用的那部分）
 
     name: 因子名（唯一 key）
     func: 因子函数 FactorFunc
-    required_fields: 因子需要的字段（如 close/high/amount）
+    required_fields: 因子需要的字段（如 close/high/amount），构造时转为 tuple，可直接作为缓存键
     params: 因子默认参数（window/lookback 等）
     version: 版本，便于复现与因子库管理
+    index_safe: 因子函数保证返回与输入 df 相同的 index 时设为 True，引擎跳过对齐检查
+
+    使用 __slots__ 存储字段，不为每个实例分配 __dict__（大批量扫参时可节省内存）
     """
     name: str
     func: FactorFunc
-    required_fields: List[str] = field(default_factory=list)
+    required_fields: Tuple[str, ...] = ()
     params: Dict[str, Any] = field(default_factory=dict)
     version: str = "v1"
+    index_safe: bool = False
+
+    def __post_init__(self):
+        if not isinstance(self.required_fields, tuple):
+            object.__setattr__(self, "required_fields", tuple(self.required_fields))
+
+
+@dataclass
+class FactorContext:
+    """
+    一次批量计算中所有因子共享的预处理结果，由引擎在每次 compute_all / compute_iter 调用内构造一次
+
+    因子函数签名中声明 ctx 参数即可接收：func(df, ctx=None, **params)
+
+    codes: 每行 code 的整数编码（MultiIndex 的 code 层编码）
+    dates: 每行 date 的整数编码
+    sort_perm: 按 code 分组的行位置（组内保持原始行顺序）
+    group_starts: 第 k 个 code 对应 sort_perm[group_starts[k]:group_starts[k+1]]
+    columns_soa: 各字段的 ndarray（列式存储）
+    pending: 本次串行计算中排队的全部因子名；单因子计算和并行 worker 中为空
+
+    多个因子共用的中间结果（如日收益率、前收盘价）可通过 cached 按 key 缓存，
+    同一次调用内只计算一次；缓存的结果由多个因子共享，不可原地修改
+    因子族（同一中间量的多个窗口）可根据 pending 判断其它窗口是否也在本次计算中，
+    只在确实排队时才合并为一次多窗口计算
+    """
+    codes: np.ndarray
+    dates: np.ndarray
+    sort_perm: np.ndarray
+    group_starts: np.ndarray
+    columns_soa: Dict[str, np.ndarray] = field(default_factory=dict)
+    pending: FrozenSet[str] = frozenset()
+    _memo: Dict[str, Any] = field(default_factory=dict, repr=False)
+
+    def cached(self, key: str, compute: Callable[[], Any]) -> Any:
+        """返回 key 对应的共享中间结果，首次访问时调用 compute 计算"""
+        try:
+            return self._memo[key]
+        except KeyError:
+            value = self._memo[key] = compute()
+            return value
 
 
 # ---------------------------
@@ -0,0 +1,462 @@
+# factor_engine/primitives.py
+"""
+因子常用的分组计算原语（按 code 的时序差分、滚动统计、滚动标准化、滚动相关，按 date 的截面排名）
+
+输入为 MultiIndex(date, code) 的 Series，输出与输入 index 对齐。
+安装 numba 时在按分组排序后的连续数组上用 JIT 循环计算，否则退回 pandas groupby 实现；
+两种实现结果一致（同组内按原始行顺序计算，与 groupby 语义相同）。
+"""
+from __future__ import annotations
+
+import weakref
+from typing import Dict, Tuple
+import numpy as np
+import pandas as pd
+
+# 尝试导入 numba，如果失败则使用 pandas 实现
+try:
+    from numba import njit, prange
+    USE_NUMBA = True
+except ImportError:
+    USE_NUMBA = False
+
+
+def sorted_soa(index: pd.MultiIndex, level: str = "code") -> Tuple[np.ndarray, np.ndarray]:
+    """
+    按指定层分组后的连续布局：同组的行相邻，组内保持原始行顺序
+
+    Args:
+        index: MultiIndex(date, code)
+        level: 分组所用的层名
+    Returns:
+        (order, offsets): order 为排序后的行位置；第 k 组对应 order[offsets[k]:offsets[k+1]]，
+        该层缺失（编码为 -1）的行不在任何分组中
+    """
+    codes = np.asarray(index.codes[index.names.index(level)])
+    order = np.argsort(codes, kind="stable")
+    sorted_codes = codes[order]
+    start = np.searchsorted(sorted_codes, 0)
+    order = order[start:]
+    sorted_codes = sorted_codes[start:]
+    boundaries = np.flatnonzero(sorted_codes[1:] != sorted_codes[:-1]) + 1
+    offsets = np.concatenate(([0], boundaries, [len(order)])).astype(np.int64)
+    if len(order) == 0:
+        offsets = np.zeros(1, dtype=np.int64)
+    return order.astype(np.int64), offsets
+
+
+# 分组布局缓存：{id(index): {level: (order, offsets)}}，index 被回收时通过 weakref.finalize 自动清除
+# （同一因子内由同一列派生的中间结果共用 index 对象，多次滚动计算只排序一次）
+_LAYOUT_CACHE: Dict[int, Dict[str, Tuple[np.ndarray, np.ndarray]]] = {}
+
+
+def _cached_layout(index: pd.MultiIndex, level: str) -> Tuple[np.ndarray, np.ndarray]:
+    """sorted_soa 的缓存版本，同一个 index 对象的同一层只计算一次"""
+    per_index = _LAYOUT_CACHE.get(id(index))
+    if per_index is not None and level in per_index:
+        return per_index[level]
+
+    layout = sorted_soa(index, level=level)
+    if per_index is None:
+        try:
+            weakref.finalize(index, _LAYOUT_CACHE.pop, id(index), None)
+        except TypeError:
+            return layout
+        per_index = _LAYOUT_CACHE[id(index)] = {}
+    per_index[level] = layout
+    return layout
+
+
+def _code_layout(s: pd.Series, ctx=None) -> Tuple[np.ndarray, np.ndarray]:
+    """按 code 分组的布局：s 的 code 编码与 FactorContext 一致时直接复用，否则按 index 缓存"""
+    if ctx is not None:
+        index = s.index
+        codes = np.asarray(index.codes[index.names.index("code")])
+        if np.array_equal(codes, ctx.codes):
+            return ctx.sort_perm, ctx.group_starts
+    return _cached_layout(s.index, "code")
+
+
+def wrap_series(values: np.ndarray, index: pd.Index, name=None) -> pd.Series:
+    """将计算结果包装为 Series，不复制数据"""
+    return pd.Series(values, index=index, name=name, copy=False)
+
+
+if USE_NUMBA:
+
+    @njit(parallel=True, cache=True)
+    def _group_diff_nb(values, order, offsets, lag):
+        out = np.full(len(values), np.nan)
+        for k in prange(len(offsets) - 1):
+            start, end = offsets[k], offsets[k + 1]
+            for i in range(start + lag, end):
+                out[order[i]] = values[order[i]] - values[order[i - lag]]
+        return out
+
+    @njit(parallel=True, cache=True)
+    def _group_rolling_moments_multi_nb(values, order, offsets, windows, min_periods):
+        # 一次遍历同时计算多个窗口的滚动和、滚动均值与滚动标准差（ddof=1），结果形状为 (窗口数, 行数)；
+        # 每个窗口各自维护滑动累加量，窗口内忽略 NaN，有效值不足 min_periods 时为 NaN；
+        # 累加前减去组内首个有效值，减小平方和相减时的精度损失；
+        # 与 pandas 一致，窗口内有效值全部相等时直接取该值（标准差为 0），不受累加误差影响
+        n_windows = len(windows)
+        total_out = np.full((n_windows, len(values)), np.nan)
+        mean = np.full((n_windows, len(values)), np.nan)
+        std = np.full((n_windows, len(values)), np.nan)
+        for k in prange(len(offsets) - 1):
+            start, end = offsets[k], offsets[k + 1]
+            shift = 0.0
+            for i in range(start, end):
+                if not np.isnan(values[order[i]]):
+                    shift = values[order[i]]
+                    break
+            total = np.zeros(n_windows)
+            total_sq = np.zeros(n_windows)
+            count = np.zeros(n_windows, dtype=np.int64)
+            same = 0
+            prev = np.nan
+            for i in range(start, end):
+                x = values[order[i]]
+                valid = not np.isnan(x)
+                if valid:
+                    same = same + 1 if x == prev else 1
+                    prev = x
+                for w in range(n_windows):
+                    if valid:
+                        total[w] += x - shift
+                        total_sq[w] += (x - shift) * (x - shift)
+                        count[w] += 1
+                    if i - windows[w] >= start:
+                        y = values[order[i - windows[w]]]
+                        if not np.isnan(y):
+                            total[w] -= y - shift
+                            total_sq[w] -= (y - shift) * (y - shift)
+                            count[w] -= 1
+                    c = count[w]
+                    if c >= min_periods[w] and c > 0:
+                        if same >= c:
+                            total_out[w, order[i]] = prev * c
+                            mean[w, order[i]] = prev
+                            if c > 1:
+                                std[w, order[i]] = 0.0
+                        else:
+                            total_out[w, order[i]] = shift * c + total[w]
+                            mean[w, order[i]] = shift + total[w] / c
+                            if c > 1:
+                                var = (total_sq[w] - total[w] * total[w] / c) / (c - 1)
+                                std[w, order[i]] = np.sqrt(var) if var > 0 else 0.0
+        return total_out, mean, std
+
+    def _group_rolling_moments_nb(values, order, offsets, window, min_periods):
+        # 单个窗口的滚动和、均值与标准差
+        total, mean, std = _group_rolling_moments_multi_nb(
+            values, order, offsets,
+            np.array([window], dtype=np.int64), np.array([min_periods], dtype=np.int64),
+        )
+        return total[0], mean[0], std[0]
+
+    @njit(parallel=True, cache=True)
+    def _group_rolling_extreme_nb(values, order, offsets, window, min_periods, is_max):
+        # 滚动最大值 / 最小值，窗口内忽略 NaN，有效值不足 min_periods 时为 NaN
+        out = np.full(len(values), np.nan)
+        for k in prange(len(offsets) - 1):
+            start, end = offsets[k], offsets[k + 1]
+            for i in range(start, end):
+                lo = max(start, i - window + 1)
+                count = 0
+                best = np.nan
+                for j in range(lo, i + 1):
+                    x = values[order[j]]
+                    if np.isnan(x):
+                        continue
+                    if count == 0 or (x > best if is_max else x < best):
+                        best = x
+                    count += 1
+                if count >= min_periods and count > 0:
+                    out[order[i]] = best
+        return out
+
+    @njit(parallel=True, cache=True)
+    def _group_rolling_corr_nb(x, y, order, offsets, window, min_periods):
+        # 滚动 Pearson 相关系数，只用两者都非 NaN 的配对（与 pandas rolling.corr 一致），
+        # 配对数不足 min_periods 或任一方差为 0 时为 NaN；窗口内存在 inf 配对时为 NaN。
+        # 增量维护 (x, y, x², y², xy) 的滑动和，累加前减去组内首个有效配对，减小相减时的精度损失；
+        # 与 pandas 一致，窗口内任一序列的有效值全部相等时为 NaN，不受累加误差残留的微小方差影响
+        out = np.full(len(x), np.nan)
+        for k in prange(len(offsets) - 1):
+            start, end = offsets[k], offsets[k + 1]
+            shift_x = 0.0
+            shift_y = 0.0
+            for i in range(start, end):
+                a = x[order[i]]
+                b = y[order[i]]
+                if np.isfinite(a) and np.isfinite(b):
+                    shift_x = a
+                    shift_y = b
+                    break
+            sx = 0.0
+            sy = 0.0
+            sxx = 0.0
+            syy = 0.0
+            sxy = 0.0
+            count = 0
+            bad = 0
+            same_x = 0
+            same_y = 0
+            prev_x = np.nan
+            prev_y = np.nan
+            for i in range(start, end):
+                a = x[order[i]]
+                b = y[order[i]]
+                if not (np.isnan(a) or np.isnan(b)):
+                    if np.isfinite(a) and np.isfinite(b):
+                        same_x = same_x + 1 if a == prev_x else 1
+                        same_y = same_y + 1 if b == prev_y else 1
+                        prev_x = a
+                        prev_y = b
+                        a -= shift_x
+                        b -= shift_y
+                        sx += a
+                        sy += b
+                        sxx += a * a
+                        syy += b * b
+                        sxy += a * b
+                        count += 1
+                    else:
+                        bad += 1
+                if i - window >= start:
+                    a = x[order[i - window]]
+                    b = y[order[i - window]]
+                    if not (np.isnan(a) or np.isnan(b)):
+                        if np.isfinite(a) and np.isfinite(b):
+                            a -= shift_x
+                            b -= shift_y
+                            sx -= a
+                            sy -= b
+                            sxx -= a * a
+                            syy -= b * b
+                            sxy -= a * b
+                            count -= 1
+                        else:
+                            bad -= 1
+                if bad == 0 and count >= min_periods and count > 1 and same_x < count and same_y < count:
+                    var_x = sxx - sx * sx / count
+                    var_y = syy - sy * sy / count
+                    if var_x > 0 and var_y > 0:
+                        out[order[i]] = (sxy - sx * sy / count) / np.sqrt(var_x * var_y)
+        return out
+
+    @njit(parallel=True, cache=True)
+    def _group_rank_nb(values, order, offsets, pct):
+        # 组内平均排名（并列取平均，从 1 开始），NaN 不参与排名
+        out = np.full(len(values), np.nan)
+        for k in prange(len(offsets) - 1):
+            start, end = offsets[k], offsets[k + 1]
+            rows = order[start:end]
+            vals = values[rows]
+            valid = rows[~np.isnan(vals)]
+            vals = values[valid]
+            n = len(vals)
+            idx = np.argsort(vals, kind="mergesort")
+            i = 0
+            while i < n:
+                j = i
+                while j + 1 < n and vals[idx[j + 1]] == vals[idx[i]]:
+                    j += 1
+                r = (i + j) / 2.0 + 1.0
+                if pct:
+                    r = r / n
+                for t in range(i, j + 1):
+                    out[valid[idx[t]]] = r
+                i = j + 1
+        return out
+
+
+def group_diff(s: pd.Series, lag: int = 1, ctx=None) -> pd.Series:
+    """
+    按 code 做 lag 期差分，等价于 s.groupby(level="code").diff(lag)
+
+    Args:
+        s: MultiIndex(date, code) 的 Series
+        lag: 差分期数（正整数）
+        ctx: 引擎传入的 FactorContext，提供时复用其中按 code 分组的布局
+    Returns:
+        pd.Series: 与 s 对齐的差分结果
+    """
+    if not USE_NUMBA:
+        return s.groupby(level="code").diff(lag)
+    order, offsets = _code_layout(s, ctx)
+    out = _group_diff_nb(s.to_numpy(dtype=np.float64), order, offsets, lag)
+    return wrap_series(out, s.index, s.name)
+
+
+def group_rolling_mean(s: pd.Series, window: int, min_periods: int | None = None, ctx=None) -> pd.Series:
+    """
+    按 code 计算滚动均值，等价于 s.groupby(level="code").rolling(window, min_periods).mean()
+    （结果与 s 对齐）
+
+    Args:
+        s: MultiIndex(date, code) 的 Series
+        window: 窗口长度
+        min_periods: 窗口内最少有效值个数，默认等于 window
+        ctx: 引擎传入的 FactorContext，提供时复用其中按 code 分组的布局
+    Returns:
+        pd.Series: 与 s 对齐的滚动均值
+    """
+    min_periods = window if min_periods is None else min_periods
+    if not USE_NUMBA:
+        return s.groupby(level="code").transform(
+            lambda x: x.rolling(window, min_periods=min_periods).mean()
+        )
+    order, offsets = _code_layout(s, ctx)
+    _, mean, _ = _group_rolling_moments_nb(
+        s.to_numpy(dtype=np.float64), order, offsets, window, min_periods
+    )
+    return wrap_series(mean, s.index, s.name)
+
+
+def group_zscore(s: pd.Series, window: int, min_periods: int | None = None, ctx=None) -> pd.Series:
+    """
+    按 code 计算滚动标准化值 (x - 滚动均值) / 滚动标准差（ddof=1），标准差为 0 时为 NaN
+
+    Args:
+        s: MultiIndex(date, code) 的 Series
+        window: 窗口长度
+        min_periods: 窗口内最少有效值个数，默认等于 window
+        ctx: 引擎传入的 FactorContext，提供时复用其中按 code 分组的布局
+    Returns:
+        pd.Series: 与 s 对齐的滚动 zscore
+    """
+    min_periods = window if min_periods is None else min_periods
+    if not USE_NUMBA:
+        g = s.groupby(level="code")
+        mean = g.transform(lambda x: x.rolling(window, min_periods=min_periods).mean())
+        std = g.transform(lambda x: x.rolling(window, min_periods=min_periods).std())
+        return (s - mean) / std.replace(0, np.nan)
+    values = s.to_numpy(dtype=np.float64)
+    order, offsets = _code_layout(s, ctx)
+    _, mean, std = _group_rolling_moments_nb(values, order, offsets, window, min_periods)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out = np.where(std > 0, (values - mean) / std, np.nan)
+    return wrap_series(out, s.index, s.name)
+
+
+ROLLING_METHODS = ("sum", "mean", "std", "max", "min")
+
+
+def group_rolling(
+    s: pd.Series, window: int, method: str, min_periods: int | None = None, ctx=None
+) -> pd.Series:
+    """
+    按 code 计算滚动统计量，等价于 getattr(s.groupby(level="code").rolling(window, min_periods), method)()
+    （结果与 s 对齐）
+
+    Args:
+        s: MultiIndex(date, code) 的 Series
+        window: 窗口长度
+        method: 统计量，取值见 ROLLING_METHODS（std 为 ddof=1）
+        min_periods: 窗口内最少有效值个数，默认等于 window
+        ctx: 引擎传入的 FactorContext，提供时复用其中按 code 分组的布局
+    Returns:
+        pd.Series: 与 s 对齐的滚动统计量
+    """
+    if method not in ROLLING_METHODS:
+        raise ValueError(f"method must be one of {ROLLING_METHODS}, got {method!r}")
+    min_periods = window if min_periods is None else min_periods
+    if not USE_NUMBA:
+        rolling = s.groupby(level="code", sort=False).rolling(window, min_periods=min_periods)
+        return getattr(rolling, method)().droplevel(0).reindex(s.index)
+    values = s.to_numpy(dtype=np.float64)
+    order, offsets = _code_layout(s, ctx)
+    if method in ("max", "min"):
+        out = _group_rolling_extreme_nb(values, order, offsets, window, min_periods, method == "max")
+    else:
+        total, mean, std = _group_rolling_moments_nb(values, order, offsets, window, min_periods)
+        out = {"sum": total, "mean": mean, "std": std}[method]
+    return wrap_series(out, s.index, s.name)
+
+
+def group_rolling_multi(
+    s: pd.Series, windows, method: str, min_periods=None, ctx=None
+) -> Dict[int, pd.Series]:
+    """
+    按 code 一次计算多个窗口的滚动统计量，等价于对每个窗口调用 group_rolling；
+    sum / mean / std 只遍历数据一次，各窗口同时维护滑动累加量
+
+    Args:
+        s: MultiIndex(date, code) 的 Series
+        windows: 窗口长度列表
+        method: 统计量，取值见 ROLLING_METHODS（std 为 ddof=1）
+        min_periods: 窗口内最少有效值个数，默认等于各自的窗口长度
+        ctx: 引擎传入的 FactorContext，提供时复用其中按 code 分组的布局
+    Returns:
+        Dict[int, pd.Series]: {窗口长度: 与 s 对齐的滚动统计量}
+    """
+    if method not in ROLLING_METHODS:
+        raise ValueError(f"method must be one of {ROLLING_METHODS}, got {method!r}")
+    windows = [int(w) for w in windows]
+    if not USE_NUMBA or method in ("max", "min"):
+        return {
+            w: group_rolling(s, w, method, min_periods=min_periods, ctx=ctx) for w in windows
+        }
+    min_periods_arr = np.array(
+        [w if min_periods is None else min_periods for w in windows], dtype=np.int64
+    )
+    order, offsets = _code_layout(s, ctx)
+    total, mean, std = _group_rolling_moments_multi_nb(
+        s.to_numpy(dtype=np.float64), order, offsets,
+        np.array(windows, dtype=np.int64), min_periods_arr,
+    )
+    out = {"sum": total, "mean": mean, "std": std}[method]
+    return {w: wrap_series(out[k], s.index, s.name) for k, w in enumerate(windows)}
+
+
+def group_rolling_corr(
+    s: pd.Series, other: pd.Series, window: int, min_periods: int | None = None, ctx=None
+) -> pd.Series:
+    """
+    按 code 计算两个序列的滚动相关系数，等价于每个 code 内 s.rolling(window, min_periods).corr(other)
+    （结果与 s 对齐，other 按 s 的 index 对齐）
+
+    Args:
+        s: MultiIndex(date, code) 的 Series
+        other: 与 s 同结构的 Series
+        window: 窗口长度
+        min_periods: 窗口内最少有效配对个数，默认等于 window
+        ctx: 引擎传入的 FactorContext，提供时复用其中按 code 分组的布局
+    Returns:
+        pd.Series: 与 s 对齐的滚动相关系数，方差为 0 的窗口为 NaN
+    """
+    min_periods = window if min_periods is None else min_periods
+    if not other.index.equals(s.index):
+        other = other.reindex(s.index)
+    if not USE_NUMBA:
+        pairs = pd.DataFrame({"x": s.to_numpy(), "y": other.to_numpy()}, index=s.index)
+        out = pairs.groupby(level="code", group_keys=False).apply(
+            lambda g: g["x"].rolling(window, min_periods=min_periods).corr(g["y"])
+        )
+        return out.reindex(s.index).replace([np.inf, -np.inf], np.nan).rename(s.name)
+    order, offsets = _code_layout(s, ctx)
+    out = _group_rolling_corr_nb(
+        s.to_numpy(dtype=np.float64), other.to_numpy(dtype=np.float64),
+        order, offsets, window, min_periods,
+    )
+    return wrap_series(out, s.index, s.name)
+
+
+def group_rank(s: pd.Series, level: str = "date", pct: bool = False) -> pd.Series:
+    """
+    分组内平均排名（默认按 date 做截面排名），等价于 s.groupby(level=level).rank(pct=pct)
+
+    Args:
+        s: MultiIndex(date, code) 的 Series
+        level: 分组所用的层名
+        pct: 是否返回百分比排名
+    Returns:
+        pd.Series: 与 s 对齐的排名
+    """
+    if not USE_NUMBA:
+        return s.groupby(level=level).rank(pct=pct)
+    order, offsets = _cached_layout(s.index, level)
+    out = _group_rank_nb(s.to_numpy(dtype=np.float64), order, offsets, pct)
+    return wrap_series(out, s.index, s.name)
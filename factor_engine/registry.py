@@ -1,10 +1,16 @@
 # factor_engine/registry.py
 from __future__ import annotations
-from typing import Dict, Optional, Callable, Any, List, Iterable
+import sys
+from types import MappingProxyType
+from typing import Dict, Optional, Callable, Any, List, Iterable, Mapping, Tuple
 import pandas as pd
 from .interfaces import FactorSpec
 
 _FACTOR_REGISTRY: Dict[str, FactorSpec] = {}
+# 已注册因子的只读视图，供外部查询，无需拷贝
+factors_view: Mapping[str, FactorSpec] = MappingProxyType(_FACTOR_REGISTRY)
+# list_factors 的结果缓存，注册新因子时失效
+_FACTOR_LIST_CACHE: Optional[Tuple[FactorSpec, ...]] = None
 
 def register_factor(
     name: Optional[str] = None,
@@ -12,21 +18,26 @@ def register_factor(
     params: Optional[Dict[str, Any]] = None,
     version: str = "v1",
     force_update: bool = False, # 如果指定为True，则允许覆盖已存在的因子
+    index_safe: bool = False, # 因子函数保证返回与输入相同的 index 时设为True，跳过对齐检查
 ):
     """
     装饰器：把函数注册为因子
     """
     def deco(func: Callable[..., pd.Series]):
+        global _FACTOR_LIST_CACHE
+        # 因子名与字段名在注册表查找、字段检查中反复比较，驻留后相同字符串共用同一对象
         spec = FactorSpec(
-            name=name or func.__name__,
+            name=sys.intern(name or func.__name__),
             func=func,
-            required_fields=required_fields or [],
+            required_fields=tuple(sys.intern(f) for f in (required_fields or ())),
             params=params or {},
             version=version,
+            index_safe=index_safe,
         )
         if spec.name in _FACTOR_REGISTRY and not force_update:
             raise KeyError(f"Factor '{spec.name}' already registered.")
         _FACTOR_REGISTRY[spec.name] = spec
+        _FACTOR_LIST_CACHE = None
         return func
     return deco
 
@@ -34,4 +45,8 @@ def get_factor(name: str) -> FactorSpec:
     return _FACTOR_REGISTRY[name]
 
 def list_factors() -> Iterable[FactorSpec]:
-    return _FACTOR_REGISTRY.values()
+    """返回已注册因子的不可变快照（注册顺序），迭代期间注册新因子不影响结果"""
+    global _FACTOR_LIST_CACHE
+    if _FACTOR_LIST_CACHE is None:
+        _FACTOR_LIST_CACHE = tuple(_FACTOR_REGISTRY.values())
+    return _FACTOR_LIST_CACHE
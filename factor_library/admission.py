@@ -1,8 +1,18 @@
 # factor_library/admission.py
 from dataclasses import dataclass
-from typing import Dict
+from typing import Dict, Sequence, Union
+import numpy as np
+import pandas as pd
 from evaluation.interfaces import EvalResult  # 你的 EvalResult
 
+# 入库判断用到的指标及其缺失时的默认值
+_METRIC_DEFAULTS: Dict[str, float] = {
+    "rank_ic_mean": 0.0,
+    "rank_ic_ir": 0.0,
+    "top_turnover_20_mean": 1.0,
+    "monotonic_mean": 0.0,
+}
+
 @dataclass
 class AdmissionRule:
     """
@@ -18,16 +28,44 @@ class AdmissionRule:
         """
         给一份 metrics（来自 EvalResult.metrics），判断是否满足入库标准
         """
-        rank_ic_mean = metrics.get("rank_ic_mean", 0.0)
-        rank_ic_ir = metrics.get("rank_ic_ir", 0.0)
-        top_turnover_20_mean = metrics.get("top_turnover_20_mean", 1.0)
-        monotonic_mean = metrics.get("monotonic_mean", 0.0)
+        return bool(self.pass_mask([metrics], [horizon])[0])
 
-        passed = (
-            abs(rank_ic_mean) >= self.min_rank_ic and
-            abs(rank_ic_ir) >= self.min_rank_ic_ir and
-            (top_turnover_20_mean / horizon) <= self.max_top_turnover_20_mean and
-            abs(monotonic_mean) >= self.min_monotonic_mean
+    def pass_mask(self, metrics_list: Sequence[Dict[str, float]], horizons: Sequence[int]) -> np.ndarray:
+        """
+        批量判断多份 metrics 是否满足入库标准，与逐个调用 is_pass 结果一致
+        Args:
+            metrics_list: metrics 列表（来自 EvalResult.metrics）
+            horizons: 与 metrics_list 一一对应的周期
+        Returns:
+            np.ndarray: bool 数组，True 表示通过
+        """
+        metrics_df = pd.DataFrame(
+            {name: [m.get(name, default) for m in metrics_list]
+             for name, default in _METRIC_DEFAULTS.items()},
+            dtype=float,
         )
+        return self.batch_is_pass(metrics_df, np.asarray(horizons, dtype=float))
+
+    def batch_is_pass(self, metrics_df: pd.DataFrame, horizon: Union[int, np.ndarray]) -> np.ndarray:
+        """
+        对一批候选因子的 metrics 表（每行一个因子，列为指标名）统一判断是否满足入库标准，
+        与逐行调用 is_pass 结果一致（缺失的列按 is_pass 的默认值处理）
+        Args:
+            metrics_df: metrics 表
+            horizon: 评价周期，也可以是与 metrics_df 逐行对应的周期数组
+        Returns:
+            np.ndarray: bool 数组，True 表示通过
+        """
+        n = len(metrics_df)
 
-        return passed
\ No newline at end of file
+        def column(name: str) -> np.ndarray:
+            if name not in metrics_df.columns:
+                return np.full(n, _METRIC_DEFAULTS[name])
+            return metrics_df[name].to_numpy(dtype=float)
+
+        return (
+            (np.abs(column("rank_ic_mean")) >= self.min_rank_ic) &
+            (np.abs(column("rank_ic_ir")) >= self.min_rank_ic_ir) &
+            (column("top_turnover_20_mean") / horizon <= self.max_top_turnover_20_mean) &
+            (np.abs(column("monotonic_mean")) >= self.min_monotonic_mean)
+        )
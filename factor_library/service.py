@@ -1,17 +1,75 @@
 # factor_library/service.py
+import os
+import hashlib
+import inspect
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, Iterable, Optional, List
+from typing import Any, Dict, Iterable, Optional, List, Tuple
+import numpy as np
 import pandas as pd
 
-from factor_engine.engine import FactorEngine
+from factor_engine import engine as engine_module, primitives as primitives_module
+from factor_engine.engine import FactorEngine, FACTOR_DTYPE
 from evaluation.engine import EvaluatorEngine, EvalResult
 
 from .interfaces import FactorEntry
-from .storage import FactorStore
+from .storage import FactorStore, _src_hash
 from .admission import AdmissionRule
 
 from factor_engine.registry import FactorSpec  # 直接复用你已有的
 
+
+def _df_fingerprint(df: pd.DataFrame, fields: tuple) -> str:
+    """df 在指定字段（含 index）上的内容指纹；每次按当前内容计算，df 原地修改后随之变化"""
+    use_df = df[list(fields)] if fields else df
+    row_hash = pd.util.hash_pandas_object(use_df, index=True).to_numpy()
+    h = hashlib.blake2b(digest_size=8)
+    h.update(repr(list(use_df.columns)).encode())
+    h.update(row_hash.tobytes())
+    return h.hexdigest()
+
+
+@lru_cache(maxsize=64)
+def _file_digest(path_str: str, mtime_ns: int, size: int) -> bytes:
+    """源文件内容的摘要（以 (路径, 修改时间, 文件大小) 为键，文件变化后自动失效）"""
+    with open(path_str, "rb") as f:
+        return hashlib.blake2b(f.read(), digest_size=16).digest()
+
+
+def _code_salt(func) -> str:
+    """
+    因子结果依赖的代码与精度的指纹：因子所在模块（含其调用的辅助函数）、
+    factor_engine 的引擎与计算原语源码，以及 FACTOR_DTYPE
+    """
+    paths = [engine_module.__file__, primitives_module.__file__]
+    try:
+        src = inspect.getsourcefile(func)
+    except TypeError:
+        src = None
+    if src is not None:
+        paths.append(src)
+
+    h = hashlib.blake2b(digest_size=8)
+    h.update(FACTOR_DTYPE.name.encode())
+    for path in paths:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        h.update(b"|")
+        h.update(_file_digest(os.path.abspath(path), stat.st_mtime_ns, stat.st_size))
+    return h.hexdigest()
+
+
+def _spec_fingerprint(spec: FactorSpec, params: Dict[str, Any]) -> str:
+    """因子函数源码与最终参数（同入库条目的 src_hash）+ 代码 / 精度指纹，任一变化后缓存失效"""
+    h = hashlib.blake2b(digest_size=8)
+    h.update(_src_hash(spec.func, sorted(params.items())).encode())
+    h.update(b"|")
+    h.update(_code_salt(spec.func).encode())
+    return h.hexdigest()
+
+
 class FactorLibrary:
     """
     对外暴露的“因子库”服务，负责：
@@ -28,12 +86,40 @@ class FactorLibrary:
         factor_engine: FactorEngine,
         evaluator_engine: EvaluatorEngine,
         admission_rule: Optional[AdmissionRule] = None,
+        cache_dir: Optional[Path] = None,
+        cache_max_bytes: Optional[int] = 2 * 1024 ** 3,
     ):
+        """
+        Args:
+            cache_dir: 因子计算结果的磁盘缓存目录，None 表示不缓存；
+                缓存键为 (因子名, 版本, 数据指纹, 函数与参数指纹)，只缓存数值类型的结果
+            cache_max_bytes: 缓存目录的总大小上限，超出时按最近使用时间淘汰最旧的文件；
+                None 表示不限制
+        """
         self.manual_store = manual_store
         self.auto_store = auto_store
         self.factor_engine = factor_engine
         self.evaluator_engine = evaluator_engine
         self.admission_rule = admission_rule
+        # (name, version) -> FactorEntry，入库时清空
+        self._entry_cache: Dict[Tuple[str, Optional[str]], FactorEntry] = {}
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else None
+        self.cache_max_bytes = cache_max_bytes
+        if self.cache_dir is not None:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def _find_entry(self, name: str, version: Optional[str] = None) -> Optional[FactorEntry]:
+        """先从 manual_store、再从 auto_store 查找因子条目，命中后缓存"""
+        key = (name, version)
+        entry = self._entry_cache.get(key)
+        if entry is None:
+            entry = (
+                self.manual_store.load_entry(name, version)
+                or self.auto_store.load_entry(name, version)
+            )
+            if entry is not None:
+                self._entry_cache[key] = entry
+        return entry
 
     # 1) 手动入库：只要给出 FactorSpec + 一些元信息，就入库
     def manual_admit(
@@ -54,6 +140,7 @@ class FactorLibrary:
             last_eval_metrics=eval_result.metrics if eval_result else {},
         )
         self.manual_store.save_entry(entry)
+        self._entry_cache.clear()
 
     # 2) 自动入库：评价达标则放入 auto 仓库
     def auto_admit_from_eval(
@@ -84,6 +171,7 @@ class FactorLibrary:
             last_eval_metrics=metrics,
         )
         self.auto_store.save_entry(entry)
+        self._entry_cache.clear()
         return True
 
     # 3) 对外接口：因子计算
@@ -99,22 +187,78 @@ class FactorLibrary:
         - 先从 manual_store 查找
         - 查不到再从 auto_store 查找
         - 找到对应 FactorSpec 后，交给 FactorEngine 计算
+        - 配置了 cache_dir 时，相同 (数据, 因子, 参数) 的结果直接从磁盘读取
         """
-        entry = (
-            self.manual_store.load_entry(name, version)
-            or self.auto_store.load_entry(name, version)
-        )
+        entry = self._find_entry(name, version)
         if entry is None:
             raise ValueError(f"Factor not found in library: {name} (version={version})")
         
+        spec = entry.spec
+        cache_path = None
+        if self.cache_dir is not None and isinstance(df.index, pd.MultiIndex):
+            fields = spec.required_fields if set(spec.required_fields) <= set(df.columns) else None
+            if fields is not None:
+                key = (
+                    f"{spec.name}_{spec.version}_{_df_fingerprint(df, fields)}"
+                    f"_{_spec_fingerprint(spec, {**spec.params, **params})}.npy"
+                )
+                cache_path = self.cache_dir / key
+                if cache_path.exists():
+                    values = np.load(cache_path)
+                    if len(values) == len(df):
+                        # 更新修改时间，记录最近使用，淘汰时保留常用的结果
+                        try:
+                            os.utime(cache_path)
+                        except OSError:
+                            pass
+                        return pd.Series(values, index=df.index, name=spec.name, copy=False)
+        
         # 关键设计点：
         #   计算因子时，依然使用 FactorEngine（保持你现有生态）
         #   这里不自己调用 spec.func，避免重复逻辑
-        return self.factor_engine.compute_one(
+        s = self.factor_engine.compute_one(
             df=df,
-            factor=entry.spec,   # 传递 FactorSpec 对象
+            factor=spec,   # 传递 FactorSpec 对象
             **params,
         )
+        
+        if cache_path is not None and s.dtype.kind in "biuf":
+            # 结果已对齐到 df.index，只保存数值；先写临时文件再替换，避免读到写了一半的文件
+            tmp_path = cache_path.with_name(cache_path.name + ".tmp")
+            try:
+                with open(tmp_path, "wb") as f:
+                    np.save(f, s.to_numpy())
+                os.replace(tmp_path, cache_path)
+            except OSError:
+                pass
+            else:
+                self._prune_cache()
+        return s
+
+    def _prune_cache(self) -> None:
+        """缓存目录超过 cache_max_bytes 时，按修改时间（最近使用时间）从旧到新删除结果文件"""
+        if self.cache_max_bytes is None:
+            return
+        files = []
+        total = 0
+        for path in self.cache_dir.glob("*.npy"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            files.append((stat.st_mtime_ns, stat.st_size, path))
+            total += stat.st_size
+        if total <= self.cache_max_bytes:
+            return
+        files.sort(key=lambda item: item[0])
+        for _, size, path in files:
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            total -= size
+            if total <= self.cache_max_bytes:
+                break
     
     def get_factor_spec(
         self,
@@ -126,10 +270,7 @@ class FactorLibrary:
         - 先从 manual_store 查找
         - 查不到再从 auto_store 查找
         """
-        entry = (
-            self.manual_store.load_entry(name, version)
-            or self.auto_store.load_entry(name, version)
-        )
+        entry = self._find_entry(name, version)
         if entry is None:
             return None
         return entry.spec
@@ -144,11 +285,7 @@ class FactorLibrary:
         - 先从 manual_store 查找
         - 查不到再从 auto_store 查找
         """
-        entry = (
-            self.manual_store.load_entry(name, version)
-            or self.auto_store.load_entry(name, version)
-        )
-        return entry
+        return self._find_entry(name, version)
     
     def list_all_factors(
         self,
@@ -184,6 +321,24 @@ class FactorLibrary:
         
         return entries
     
+    def iter_entry_names(
+        self,
+        source_type: Optional[str] = None,
+    ) -> Iterable[str]:
+        """
+        列出已入库因子的名称（只扫描目录，不加载因子函数）
+        
+        Args:
+            source_type: 筛选来源类型，None 表示全部，'manual' 或 'auto'
+            
+        Returns:
+            因子名称迭代器（不含版本号）
+        """
+        if source_type is None or source_type == "manual":
+            yield from self.manual_store.list_entry_names()
+        if source_type is None or source_type == "auto":
+            yield from self.auto_store.list_entry_names()
+    
     def list_factor_names(
         self,
         source_type: Optional[str] = None,
@@ -267,18 +422,29 @@ class FactorLibrary:
         horizons: Iterable[int],
         evaluator_name: str = "common_eval",
         version: Optional[str] = None,
+        analytics_dtype=None,
     ) -> Dict[int, EvalResult]:
         """
         对外统一的“因子评价报告”入口：
         - 内部先通过因子库算出该因子（compute_factor）
         - 再调用 EvaluatorEngine 评价，得到 {horizon: EvalResult}
+        
+        analytics_dtype:
+            截面统计使用的浮点类型（如 np.float32 以减半内存带宽），None 表示使用评价器默认精度；
+            量级很大的因子在 float32 下会出现并列值，入库筛选前可对照 EvalResult.precision
         """
         factor = self.compute_factor(df=df, name=name, version=version)
         
+        override_params = {}
+        if analytics_dtype is not None:
+            factor = factor.astype(analytics_dtype, copy=False)
+            override_params["analytics_dtype"] = analytics_dtype
+        
         reports = self.evaluator_engine.evaluate_multi_horizons(
             df=df,
             factor=factor,
             horizons=list(horizons),
             evaluator=evaluator_name,
+            **override_params,
         )
         return reports
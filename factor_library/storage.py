@@ -1,25 +1,245 @@
 # factor_library/storage.py
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
+from functools import lru_cache
+from contextlib import closing
+import os
 import json
 import pickle
+import shutil
+import sqlite3
+import hashlib
+import inspect
+import logging
+import importlib
 from .interfaces import FactorEntry, SourceType
 from factor_engine.registry import FactorSpec
 
+# orjson 可选：可用时用于更快地读写 meta.json
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+logger = logging.getLogger(__name__)
+
+
+def _dump_meta(meta_data: Dict) -> bytes:
+    """序列化元数据为 UTF-8 JSON（2 空格缩进）；orjson 将 NaN 写为 null，numpy 标量按数值写出"""
+    if orjson is not None:
+        return orjson.dumps(
+            meta_data, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY
+        )
+    return json.dumps(meta_data, indent=2, ensure_ascii=False).encode("utf-8")
+
+
+def _parse_meta(data: bytes) -> Dict:
+    """解析 meta.json；旧文件可能含 NaN 等非标准 JSON，orjson 解析失败时退回标准库"""
+    if orjson is not None:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(data)
+
+
+@lru_cache(maxsize=None)
+def _resolve_func_ref(module: str, qualname: str):
+    """按 (模块, 限定名) 导入函数对象，同一进程内每个引用只解析一次"""
+    obj = importlib.import_module(module)
+    for part in qualname.split("."):
+        obj = getattr(obj, part)
+    return obj
+
+
+def _func_ref(func) -> Optional[Dict[str, str]]:
+    """可按模块路径重新导入的函数返回 {"module", "qualname"}，否则返回 None（需 pickle 保存）"""
+    module = getattr(func, "__module__", None)
+    qualname = getattr(func, "__qualname__", None)
+    if not module or not qualname or module == "__main__" or "<" in qualname:
+        return None
+    try:
+        if _resolve_func_ref(module, qualname) is func:
+            return {"module": module, "qualname": qualname}
+    except (ImportError, AttributeError):
+        pass
+    return None
+
+
+def _entry_from_meta(meta_data: Dict, func_path_str: str, source_type: SourceType) -> FactorEntry:
+    """由元数据（+ func.pkl）重建 FactorEntry"""
+    # 1. 加载函数对象：优先按模块路径导入，旧条目或无法导入的函数读取 pickle
+    func_ref = meta_data.get("func_ref")
+    if func_ref is not None:
+        func = _resolve_func_ref(func_ref["module"], func_ref["qualname"])
+    else:
+        with open(func_path_str, "rb") as f:
+            func = pickle.load(f)
+
+    # 2. 重建 FactorSpec
+    spec = FactorSpec(
+        name=meta_data["name"],
+        func=func,
+        required_fields=meta_data.get("required_fields", ()),
+        params=meta_data.get("params", {}),
+        version=meta_data.get("version", "v1"),
+        index_safe=meta_data.get("index_safe", False),
+    )
+
+    # 3. 重建 FactorEntry
+    return FactorEntry(
+        spec=spec,
+        source_type=meta_data.get("source_type", source_type),
+        description=meta_data.get("description", ""),
+        tags=meta_data.get("tags", []),
+        # 指标中的 null（orjson 写出的 NaN）还原为 NaN
+        last_eval_metrics={
+            k: float("nan") if v is None else v
+            for k, v in meta_data.get("last_eval_metrics", {}).items()
+        },
+    )
+
+
+def _src_hash(func, params: Dict) -> str:
+    """因子函数源码（取不到源码时用字节码）与参数的 hash，用于判断条目内容是否变化"""
+    h = hashlib.blake2b(digest_size=16)
+    try:
+        h.update(inspect.getsource(func).encode("utf-8"))
+    except (OSError, TypeError):
+        code = getattr(func, "__code__", None)
+        h.update(code.co_code if code is not None else repr(func).encode("utf-8"))
+    h.update(b"|")
+    h.update(repr(params).encode("utf-8"))
+    return h.hexdigest()
+
+
+@lru_cache(maxsize=128)
+def _load_entry_cached(
+    meta_path_str: str,
+    meta_mtime_ns: int,
+    func_path_str: str,
+    func_mtime_ns: int,
+    source_type: SourceType,
+) -> FactorEntry:
+    """读取 meta.json（+ func.pkl）并重建 FactorEntry（以 (路径, 修改时间) 为键，文件重写后自动失效），
+    返回的结果不可原地修改"""
+    with open(meta_path_str, "rb") as f:
+        meta_data = _parse_meta(f.read())
+    return _entry_from_meta(meta_data, func_path_str, source_type)
+
 
 class FactorStore:
     """
     因子库的简单存储实现：
     - 负责把 FactorEntry 保存/加载到本地文件系统
-    - 使用 JSON 保存元数据，使用 pickle 保存函数对象
+    - 使用 JSON 保存元数据；可按模块路径导入的函数只记录引用（func_ref），其余使用 pickle 保存
     - 目录结构：base_dir/{factor_name}_{version}/
-        - meta.json: 元数据（name, version, description, tags, metrics等）
-        - func.pkl: 因子函数对象（pickle序列化）
+        - meta.json: 元数据（name, version, description, tags, metrics, func_ref等）
+        - func.pkl: 因子函数对象（pickle序列化，仅无法按模块路径导入的函数）
+    - base_dir/index.sqlite: 所有条目 meta.json 的镜像，由 save_entry / delete_entry 同步维护，
+      list_entries 只需一次查询；列出条目前会核对条目目录，手动删除的条目从索引中移除，
+      手动新增的条目目录触发重建索引（手动修改已有条目的 meta.json 后仍需调用 rebuild_index）
     """
+    INDEX_FILE = "index.sqlite"
+
     def __init__(self, base_dir: Path, source_type: SourceType):
         self.base_dir = Path(base_dir)
         self.source_type = source_type  # 'manual' or 'auto'
         self.base_dir.mkdir(parents=True, exist_ok=True)
+        self._index_path = self.base_dir / self.INDEX_FILE
+        # 已加载条目的内存缓存：{(name, version): (索引中的元数据文本, 条目)}，元数据变化时重新加载，
+        # 长期运行的进程反复 list_entries 时不再重复解析元数据、反序列化函数
+        self._cache: Dict[Tuple[str, str], Tuple[str, FactorEntry]] = {}
+        # 上次重建索引时无法索引的目录（无有效 meta.json 或目录名与 name_version 不符），核对时忽略
+        self._unindexed_dirs: set = set()
+
+        # 索引文件不存在时（新仓库或旧版本创建的仓库）按现有条目目录建立索引
+        fresh = not self._index_path.exists()
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS factors ("
+                "name TEXT NOT NULL, version TEXT NOT NULL, source_type TEXT, meta TEXT NOT NULL, "
+                "PRIMARY KEY (name, version))"
+            )
+        if fresh:
+            self.rebuild_index()
+
+    def _connect(self) -> sqlite3.Connection:
+        """打开索引数据库（每次操作单独连接，连接不跨进程共享）"""
+        conn = sqlite3.connect(self._index_path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def rebuild_index(self) -> None:
+        """按条目目录中的 meta.json 重建索引（手动修改条目目录后调用）"""
+        rows = []
+        unindexed = set()
+        with os.scandir(self.base_dir) as it:
+            for entry_dir in it:
+                if not entry_dir.is_dir():
+                    continue
+                try:
+                    with open(os.path.join(entry_dir.path, "meta.json"), "rb") as f:
+                        data = f.read()
+                    meta_data = _parse_meta(data)
+                except FileNotFoundError:
+                    unindexed.add(entry_dir.name)
+                    continue
+                except ValueError as e:
+                    logger.warning("Failed to index entry %s: %s", entry_dir.name, e)
+                    unindexed.add(entry_dir.name)
+                    continue
+                name = meta_data["name"]
+                version = meta_data.get("version", "v1")
+                if entry_dir.name != f"{name}_{version}":
+                    # load_entry / exists 按 name_version 定位目录，目录名不符的条目无法加载
+                    logger.warning(
+                        "Skipping entry directory %s: meta.json describes %s_%s",
+                        entry_dir.name, name, version,
+                    )
+                    unindexed.add(entry_dir.name)
+                    continue
+                rows.append((
+                    name,
+                    version,
+                    meta_data.get("source_type", self.source_type),
+                    data.decode("utf-8"),
+                ))
+        with closing(self._connect()) as conn, conn:
+            conn.execute("DELETE FROM factors")
+            conn.executemany("INSERT OR REPLACE INTO factors VALUES (?, ?, ?, ?)", rows)
+        self._cache.clear()
+        self._unindexed_dirs = unindexed
+
+    def _sync_index(self) -> None:
+        """
+        让索引与条目目录保持一致（只扫描一次 base_dir，不读取元数据）：
+        目录已被删除的记录从索引中移除，出现未索引的条目目录时重建索引
+        """
+        with os.scandir(self.base_dir) as it:
+            dirs = {entry_dir.name for entry_dir in it if entry_dir.is_dir()}
+        with closing(self._connect()) as conn:
+            rows = conn.execute("SELECT name, version FROM factors").fetchall()
+        indexed = {f"{name}_{version}": (name, version) for name, version in rows}
+
+        new_dirs = [
+            d for d in dirs - indexed.keys() - self._unindexed_dirs
+            if os.path.exists(os.path.join(self.base_dir, d, "meta.json"))
+        ]
+        if new_dirs:
+            logger.info("Rebuilding factor index: %d new entry directories found", len(new_dirs))
+            self.rebuild_index()
+            return
+
+        removed = [key for d, key in indexed.items() if d not in dirs]
+        if removed:
+            logger.info("Dropping %d factor index rows whose entry directory is missing", len(removed))
+            with closing(self._connect()) as conn, conn:
+                conn.executemany("DELETE FROM factors WHERE name = ? AND version = ?", removed)
+            for key in removed:
+                self._cache.pop(key, None)
     
     def _get_entry_dir(self, name: str, version: str = "v1") -> Path:
         """获取因子条目的存储目录"""
@@ -50,95 +270,125 @@ class FactorStore:
             "description": entry.description,
             "tags": entry.tags,
             "last_eval_metrics": entry.last_eval_metrics,
-            "required_fields": entry.spec.required_fields,
+            "required_fields": list(entry.spec.required_fields),
             "params": entry.spec.params,
+            "index_safe": entry.spec.index_safe,
         }
+        func_ref = _func_ref(entry.spec.func)
+        if func_ref is not None:
+            meta_data["func_ref"] = func_ref
+        meta_data["src_hash"] = _src_hash(entry.spec.func, entry.spec.params)
         
+        meta_bytes = _dump_meta(meta_data)
         meta_path = self._get_meta_path(name, version)
-        with open(meta_path, "w", encoding="utf-8") as f:
-            json.dump(meta_data, f, indent=2, ensure_ascii=False)
-        
-        # 2. 保存函数对象（pickle）
         func_path = self._get_func_path(name, version)
-        with open(func_path, "wb") as f:
-            pickle.dump(entry.spec.func, f)
-
-    def load_entry(self, name: str, version: Optional[str] = None) -> Optional[FactorEntry]:
-        """根据因子名 + 版本号加载记录"""
-        version = version or "v1"
         
-        meta_path = self._get_meta_path(name, version)
-        func_path = self._get_func_path(name, version)
+        # 元数据（含函数源码 hash）与已保存的完全一致且函数文件齐全时，跳过 meta.json / func.pkl 的重写
+        try:
+            with open(meta_path, "rb") as f:
+                unchanged = f.read() == meta_bytes
+        except FileNotFoundError:
+            unchanged = False
+        if unchanged and (func_ref is not None or func_path.exists()):
+            self._index_upsert(name, version, entry.source_type, meta_bytes)
+            return
+        
+        with open(meta_path, "wb") as f:
+            f.write(meta_bytes)
         
-        # 检查文件是否存在
-        if not meta_path.exists() or not func_path.exists():
+        # 2. 保存函数对象：有模块引用时不再写 pickle，并清理旧版本留下的 func.pkl
+        if func_ref is None:
+            with open(func_path, "wb") as f:
+                pickle.dump(entry.spec.func, f)
+        elif func_path.exists():
+            func_path.unlink()
+
+        # 3. 同步索引，丢弃该条目的内存缓存
+        self._index_upsert(name, version, entry.source_type, meta_bytes)
+        self._cache.pop((name, version), None)
+
+    def _index_upsert(self, name: str, version: str, source_type: SourceType, meta_bytes: bytes) -> None:
+        """写入（或覆盖）索引中的一条记录"""
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO factors VALUES (?, ?, ?, ?)",
+                (name, version, source_type, meta_bytes.decode("utf-8")),
+            )
+
+    def _load_dir(self, entry_dir: str) -> Optional[FactorEntry]:
+        """从因子条目目录加载记录（name/version 以 meta.json 为准），目录不完整时返回 None"""
+        meta_path = os.path.join(entry_dir, "meta.json")
+        func_path = os.path.join(entry_dir, "func.pkl")
+        
+        try:
+            # 文件不存在时 stat 抛出 FileNotFoundError
+            meta_mtime = os.stat(meta_path).st_mtime_ns
+        except FileNotFoundError:
             return None
+        try:
+            func_mtime = os.stat(func_path).st_mtime_ns
+        except FileNotFoundError:
+            # 只记录模块引用的条目没有 func.pkl
+            func_mtime = -1
         
         try:
-            # 1. 加载元数据
-            with open(meta_path, "r", encoding="utf-8") as f:
-                meta_data = json.load(f)
-            
-            # 2. 加载函数对象
-            with open(func_path, "rb") as f:
-                func = pickle.load(f)
-            
-            # 3. 重建 FactorSpec
-            spec = FactorSpec(
-                name=meta_data["name"],
-                func=func,
-                required_fields=meta_data.get("required_fields", []),
-                params=meta_data.get("params", {}),
-                version=meta_data.get("version", "v1"),
-            )
-            
-            # 4. 重建 FactorEntry
-            entry = FactorEntry(
-                spec=spec,
-                source_type=meta_data.get("source_type", self.source_type),
-                description=meta_data.get("description", ""),
-                tags=meta_data.get("tags", []),
-                last_eval_metrics=meta_data.get("last_eval_metrics", {}),
-            )
-            
-            return entry
+            return _load_entry_cached(meta_path, meta_mtime, func_path, func_mtime, self.source_type)
             
         except Exception as e:
-            print(f"Failed to load entry {name}_{version}: {e}")
+            logger.warning("Failed to load entry %s: %s", os.path.basename(entry_dir), e)
             return None
 
+    def load_entry(self, name: str, version: Optional[str] = None) -> Optional[FactorEntry]:
+        """根据因子名 + 版本号加载记录"""
+        version = version or "v1"
+        return self._load_dir(str(self._get_entry_dir(name, version)))
+
     def list_entries(self) -> List[FactorEntry]:
-        """列出当前仓库的所有因子记录"""
+        """列出当前仓库的所有因子记录（一次查询索引，元数据未变化的条目直接复用已加载的结果）"""
         entries: List[FactorEntry] = []
+        self._sync_index()
         
-        if not self.base_dir.exists():
-            return entries
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT name, version, meta FROM factors ORDER BY name, version"
+            ).fetchall()
         
-        # 遍历所有因子目录
-        for entry_dir in self.base_dir.iterdir():
-            if not entry_dir.is_dir():
+        for name, version, meta_text in rows:
+            cached = self._cache.get((name, version))
+            if cached is not None and cached[0] == meta_text:
+                entries.append(cached[1])
                 continue
-            
-            # 解析目录名：factor_name_version
-            parts = entry_dir.name.rsplit("_", 1)
-            if len(parts) != 2:
+            func_path = str(self._get_func_path(name, version))
+            try:
+                entry = _entry_from_meta(
+                    _parse_meta(meta_text.encode("utf-8")), func_path, self.source_type
+                )
+            except Exception as e:
+                logger.warning("Failed to load entry %s_%s: %s", name, version, e)
                 continue
-            
-            name, version = parts
-            entry = self.load_entry(name, version)
-            if entry is not None:
-                entries.append(entry)
+            self._cache[(name, version)] = (meta_text, entry)
+            entries.append(entry)
         
         return entries
 
+    def list_entry_names(self) -> List[str]:
+        """列出当前仓库的所有因子名称（只查询索引，不加载条目）"""
+        self._sync_index()
+        with closing(self._connect()) as conn:
+            rows = conn.execute("SELECT name FROM factors ORDER BY name, version").fetchall()
+        return [name for (name,) in rows]
+
     def delete_entry(self, name: str, version: Optional[str] = None) -> None:
         """删除指定因子记录（可选功能）"""
         version = version or "v1"
         entry_dir = self._get_entry_dir(name, version)
         
         if entry_dir.exists():
-            import shutil
             shutil.rmtree(entry_dir)
+        
+        with closing(self._connect()) as conn, conn:
+            conn.execute("DELETE FROM factors WHERE name = ? AND version = ?", (name, version))
+        self._cache.pop((name, version), None)
     
     def exists(self, name: str, version: Optional[str] = None) -> bool:
         """检查因子是否存在"""
@@ -6,40 +6,234 @@ import numpy as np
 import pandas as pd
 
 from factor_engine import register_factor
+from factor_engine.primitives import (
+    ROLLING_METHODS,
+    group_rolling,
+    group_rolling_corr,
+    group_rolling_multi,
+)
 
 WINDOWS = [1, 5, 20, 60]
 
 
-def _rolling_op(series: pd.Series, window: int, method: str, **kwargs) -> pd.Series:
-    return (
-        series.groupby(level="code")
-        .apply(lambda x: getattr(x.rolling(window), method)(**kwargs))
-        .droplevel(0)
+def _shared(ctx, key: str, compute):
+    # Intermediates shared by many factors are memoized on the engine's FactorContext
+    # (one per compute_all / compute_iter call); without a context they are computed directly
+    return compute() if ctx is None else ctx.cached(key, compute)
+
+
+def _nonzero(series: pd.Series) -> pd.Series:
+    # Zero denominators -> NaN with a single np.where over the buffer (no replace pass)
+    values = series.to_numpy()
+    return pd.Series(
+        np.where(values == 0, np.nan, values), index=series.index, copy=False
+    )
+
+
+def _safe_col(df: pd.DataFrame, column: str, ctx=None) -> pd.Series:
+    return _shared(ctx, f"safe_{column}", lambda: _nonzero(df[column]))
+
+
+def _safe_close(df: pd.DataFrame, ctx=None) -> pd.Series:
+    return _safe_col(df, "close", ctx)
+
+
+def _log_close(df: pd.DataFrame, ctx=None) -> pd.Series:
+    return _shared(ctx, "log_close", lambda: np.log(_safe_close(df, ctx)))
+
+
+def _daily_ret(df: pd.DataFrame, ctx=None) -> pd.Series:
+    return _shared(
+        ctx, "daily_ret", lambda: df.groupby(level="code")["close"].pct_change()
     )
 
 
-def _rolling_corr(series: pd.Series, other: pd.Series, window: int) -> pd.Series:
-    def corr_fn(group: pd.Series) -> pd.Series:
-        matched = other.loc[group.index]
-        return group.rolling(window).corr(matched)
+def _abs_ret(df: pd.DataFrame, ctx=None) -> pd.Series:
+    return _shared(ctx, "abs_ret", lambda: _daily_ret(df, ctx).abs())
 
-    return series.groupby(level="code").apply(corr_fn).droplevel(0)
+
+def _prev_close(df: pd.DataFrame, ctx=None) -> pd.Series:
+    return _shared(
+        ctx, "prev_close", lambda: df.groupby(level="code")["close"].shift(1)
+    )
+
+
+def _safe_prev_close(df: pd.DataFrame, ctx=None) -> pd.Series:
+    return _shared(ctx, "safe_prev_close", lambda: _nonzero(_prev_close(df, ctx)))
+
+
+def _rolling_op(
+    series: pd.Series, window: int, method: str, ctx=None, **kwargs
+) -> pd.Series:
+    # Common reductions go through the shared grouped kernels, reusing the context's
+    # per-code layout when given (otherwise the layout is cached per index)
+    if method in ROLLING_METHODS and not kwargs:
+        return group_rolling(series, window, method, ctx=ctx)
+    # Native grouped rolling instead of a per-group Python apply
+    rolling = series.groupby(level="code", sort=False).rolling(window)
+    return getattr(rolling, method)(**kwargs).droplevel(0)
+
+
+def _rolling_corr(
+    series: pd.Series, other: pd.Series, window: int, ctx=None
+) -> pd.Series:
+    # Incremental per-code kernel over the shared layout instead of a per-group apply
+    return group_rolling_corr(series, other, window, ctx=ctx)
+
+
+def _shared_rolling(
+    intermediate, df: pd.DataFrame, window: int, method: str, ctx=None
+) -> pd.Series:
+    # Rolling statistic of a shared intermediate that several factors reuse
+    # (e.g. the rolling sum of |ret| in both up- and downside share), memoized like
+    # the intermediate itself so the common subexpression is evaluated once
+    key = f"{intermediate.__name__}:{method}:{window}"
+    return _shared(
+        ctx, key, lambda: _rolling_op(intermediate(df, ctx), window, method, ctx)
+    )
 
 
-def _true_range(df: pd.DataFrame) -> pd.Series:
-    grouped = df.groupby(level="code")
-    prev_close = grouped["close"].shift(1)
-    ranges = pd.concat(
-        [
-            grouped["high"] - grouped["low"],
-            (grouped["high"] - prev_close).abs(),
-            (grouped["low"] - prev_close).abs(),
-        ],
-        axis=1,
+def _batched_rolling(
+    intermediate, df: pd.DataFrame, window: int, method: str, ctx=None, family=None
+) -> pd.Series:
+    # A factor family evaluates the same intermediate once per entry of WINDOWS; when the
+    # engine has queued several windows of `family` in the same pass (ctx.pending), the
+    # first call computes all of them in one kernel pass and parks the results on the
+    # context, each later window picks up (and releases) its own series. Single-factor
+    # calls and parallel workers queue nothing, so they compute just their own window
+    windows = ()
+    if ctx is not None and family is not None and method in ("sum", "mean", "std"):
+        windows = tuple(w for w in WINDOWS if f"{family}_{w}d" in ctx.pending)
+    if len(windows) < 2 or window not in windows:
+        return _rolling_op(intermediate(df, ctx), window, method, ctx)
+    pending = _shared(
+        ctx,
+        f"{intermediate.__name__}:{method}:windows:{windows}",
+        lambda: group_rolling_multi(intermediate(df, ctx), windows, method, ctx=ctx),
     )
-    tr = ranges.max(axis=1)
-    tr.index = df.index
-    return tr
+    out = pending.pop(window, None)
+    if out is None:
+        # Already handed out (same window requested again): compute it on its own
+        return _rolling_op(intermediate(df, ctx), window, method, ctx)
+    return out
+
+
+def _true_range(df: pd.DataFrame, ctx=None) -> pd.Series:
+    def compute() -> pd.Series:
+        high = df["high"].to_numpy(dtype=np.float64)
+        low = df["low"].to_numpy(dtype=np.float64)
+        prev_close = _prev_close(df, ctx).to_numpy(dtype=np.float64)
+        # max(high - low, |high - prev_close|, |low - prev_close|) in one pass over
+        # NumPy buffers; fmax skips NaN like DataFrame.max(axis=1) (first day per code)
+        tr = high - low
+        np.fmax(tr, np.abs(high - prev_close), out=tr)
+        np.fmax(tr, np.abs(low - prev_close), out=tr)
+        return pd.Series(tr, index=df.index, copy=False)
+
+    return _shared(ctx, "true_range", compute)
+
+
+def _body_bound(df: pd.DataFrame, ctx, upper: bool) -> pd.Series:
+    def compute() -> pd.Series:
+        # Element-wise max/min of open and close on the NumPy buffers instead of a
+        # row-wise DataFrame reduction; fmax/fmin skip NaN like DataFrame.max(axis=1)
+        op = np.fmax if upper else np.fmin
+        values = op(df["open"].to_numpy(), df["close"].to_numpy())
+        return pd.Series(values, index=df.index, copy=False)
+
+    return _shared(ctx, "body_high" if upper else "body_low", compute)
+
+
+def _body(df: pd.DataFrame, ctx=None) -> pd.Series:
+    return _shared(ctx, "body", lambda: (df["close"] - df["open"]).abs())
+
+
+def _limit_mask(df: pd.DataFrame, status: int, ctx=None) -> pd.Series:
+    # 0/1 indicator of a limit status, built once per panel for all windows; kept as
+    # uint8 (1/8 of a float64 buffer), the rolling kernel widens it in its single pass
+    def compute() -> pd.Series:
+        mask = (df["limit_status"].to_numpy() == status).view(np.uint8)
+        return pd.Series(mask, index=df.index, copy=False)
+
+    return _shared(ctx, f"limit_mask:{status}", compute)
+
+
+def _close(df: pd.DataFrame, ctx=None) -> pd.Series:
+    return df["close"]
+
+
+def _volume(df: pd.DataFrame, ctx=None) -> pd.Series:
+    return df["volume"]
+
+
+def _range_ratio(df: pd.DataFrame, ctx=None) -> pd.Series:
+    return _shared(
+        ctx, "range_ratio", lambda: (df["high"] - df["low"]) / _safe_close(df, ctx)
+    )
+
+
+def _high_close_spread(df: pd.DataFrame, ctx=None) -> pd.Series:
+    return (df["high"] - df["close"]) / _safe_close(df, ctx)
+
+
+def _low_close_spread(df: pd.DataFrame, ctx=None) -> pd.Series:
+    return (df["close"] - df["low"]) / _safe_close(df, ctx)
+
+
+def _norm_true_range(df: pd.DataFrame, ctx=None) -> pd.Series:
+    return _true_range(df, ctx) / _safe_close(df, ctx)
+
+
+def _turnover_float(df: pd.DataFrame, ctx=None) -> pd.Series:
+    return df["amount"] / _safe_col(df, "market_cap_float", ctx)
+
+
+def _turnover_total(df: pd.DataFrame, ctx=None) -> pd.Series:
+    return df["amount"] / _safe_col(df, "market_cap_total", ctx)
+
+
+def _money_flow(df: pd.DataFrame, ctx=None) -> pd.Series:
+    intraday = (df["close"] - df["open"]) / _safe_col(df, "open", ctx)
+    return intraday * df["amount"]
+
+
+def _pos_ret(df: pd.DataFrame, ctx=None) -> pd.Series:
+    return _daily_ret(df, ctx).clip(lower=0)
+
+
+def _neg_ret(df: pd.DataFrame, ctx=None) -> pd.Series:
+    return _daily_ret(df, ctx).clip(upper=0).abs()
+
+
+def _gap(df: pd.DataFrame, ctx=None) -> pd.Series:
+    def compute() -> pd.Series:
+        return (df["open"] - _prev_close(df, ctx)) / _safe_prev_close(df, ctx)
+
+    return _shared(ctx, "gap", compute)
+
+
+def _limit_up(df: pd.DataFrame, ctx=None) -> pd.Series:
+    return _limit_mask(df, 1, ctx)
+
+
+def _limit_down(df: pd.DataFrame, ctx=None) -> pd.Series:
+    return _limit_mask(df, -1, ctx)
+
+
+def _limit_weighted_ret(df: pd.DataFrame, ctx=None) -> pd.Series:
+    return _daily_ret(df, ctx) * df["limit_status"]
+
+
+def _upper_shadow(df: pd.DataFrame, ctx=None) -> pd.Series:
+    return (df["high"] - _body_bound(df, ctx, upper=True)) / _safe_close(df, ctx)
+
+
+def _lower_shadow(df: pd.DataFrame, ctx=None) -> pd.Series:
+    return (_body_bound(df, ctx, upper=False) - df["low"]) / _safe_close(df, ctx)
+
+
+def _body_range_ratio(df: pd.DataFrame, ctx=None) -> pd.Series:
+    return _body(df, ctx) / _nonzero(df["high"] - df["low"])
 
 
 def _register_dynamic(name: str, required_fields: list[str]):
@@ -60,7 +254,7 @@ def _register_dynamic(name: str, required_fields: list[str]):
 for window in WINDOWS:
     @_register_dynamic(f"close_pct_change_{window}d", ["close"])
     def close_pct_change_factor(
-        df: pd.DataFrame, window: int = window
+        df: pd.DataFrame, window: int = window, ctx=None
     ) -> pd.Series:
         return df.groupby(level="code")["close"].pct_change(window)
 
@@ -68,28 +262,28 @@ for window in WINDOWS:
 # Log returns over different horizons
 for window in WINDOWS:
     @_register_dynamic(f"log_return_{window}d", ["close"])
-    def log_return_factor(df: pd.DataFrame, window: int = window) -> pd.Series:
-        log_close = np.log(df["close"].replace(0, np.nan))
+    def log_return_factor(df: pd.DataFrame, window: int = window, ctx=None) -> pd.Series:
+        log_close = _log_close(df, ctx)
         return log_close.groupby(level="code").diff(window)
 
 
 # Bias of close to simple moving average
 for window in WINDOWS:
     @_register_dynamic(f"close_ma_bias_{window}d", ["close"])
-    def close_ma_bias_factor(df: pd.DataFrame, window: int = window) -> pd.Series:
-        close = df["close"]
-        ma = _rolling_op(close, window, "mean")
-        return close / ma - 1
+    def close_ma_bias_factor(df: pd.DataFrame, window: int = window, ctx=None) -> pd.Series:
+        ma = _batched_rolling(_close, df, window, "mean", ctx, "close_ma_bias")
+        return df["close"] / ma - 1
 
 
 # Bias of close to exponential moving average
 for window in WINDOWS:
     @_register_dynamic(f"close_ema_bias_{window}d", ["close"])
-    def close_ema_bias_factor(df: pd.DataFrame, window: int = window) -> pd.Series:
+    def close_ema_bias_factor(df: pd.DataFrame, window: int = window, ctx=None) -> pd.Series:
         close = df["close"]
         ema = (
-            close.groupby(level="code")
-            .apply(lambda x: x.ewm(span=window, adjust=False).mean())
+            close.groupby(level="code", sort=False)
+            .ewm(span=window, adjust=False)
+            .mean()
             .droplevel(0)
         )
         return (close - ema) / ema
@@ -99,63 +293,65 @@ for window in WINDOWS:
 for window in WINDOWS:
     @_register_dynamic(f"return_volatility_{window}d", ["close"])
     def return_volatility_factor(
-        df: pd.DataFrame, window: int = window
+        df: pd.DataFrame, window: int = window, ctx=None
     ) -> pd.Series:
-        daily_ret = df.groupby(level="code")["close"].pct_change()
-        return _rolling_op(daily_ret, window, "std")
+        return _batched_rolling(_daily_ret, df, window, "std", ctx, "return_volatility")
 
 
 # Volatility of intraday range
 for window in WINDOWS:
     @_register_dynamic(f"range_volatility_{window}d", ["high", "low", "close"])
     def range_volatility_factor(
-        df: pd.DataFrame, window: int = window
+        df: pd.DataFrame, window: int = window, ctx=None
     ) -> pd.Series:
-        range_ratio = (df["high"] - df["low"]) / df["close"].replace(0, np.nan)
-        return _rolling_op(range_ratio, window, "std")
+        return _batched_rolling(
+            _range_ratio, df, window, "std", ctx, "range_volatility"
+        )
 
 
 # Mean intraday range ratio
 for window in WINDOWS:
     @_register_dynamic(f"range_mean_{window}d", ["high", "low", "close"])
-    def range_mean_factor(df: pd.DataFrame, window: int = window) -> pd.Series:
-        range_ratio = (df["high"] - df["low"]) / df["close"].replace(0, np.nan)
-        return _rolling_op(range_ratio, window, "mean")
+    def range_mean_factor(df: pd.DataFrame, window: int = window, ctx=None) -> pd.Series:
+        return _batched_rolling(_range_ratio, df, window, "mean", ctx, "range_mean")
 
 
 # Average distance of high to close
 for window in WINDOWS:
     @_register_dynamic(f"high_close_spread_{window}d", ["high", "close"])
     def high_close_spread_factor(
-        df: pd.DataFrame, window: int = window
+        df: pd.DataFrame, window: int = window, ctx=None
     ) -> pd.Series:
-        spread = (df["high"] - df["close"]) / df["close"].replace(0, np.nan)
-        return _rolling_op(spread, window, "mean")
+        return _batched_rolling(
+            _high_close_spread, df, window, "mean", ctx, "high_close_spread"
+        )
 
 
 # Average distance of close to low
 for window in WINDOWS:
     @_register_dynamic(f"low_close_spread_{window}d", ["low", "close"])
     def low_close_spread_factor(
-        df: pd.DataFrame, window: int = window
+        df: pd.DataFrame, window: int = window, ctx=None
     ) -> pd.Series:
-        spread = (df["close"] - df["low"]) / df["close"].replace(0, np.nan)
-        return _rolling_op(spread, window, "mean")
+        return _batched_rolling(
+            _low_close_spread, df, window, "mean", ctx, "low_close_spread"
+        )
 
 
 # Normalized average true range
 for window in WINDOWS:
     @_register_dynamic(f"atr_normalized_{window}d", ["high", "low", "close"])
-    def atr_normalized_factor(df: pd.DataFrame, window: int = window) -> pd.Series:
-        norm_tr = _true_range(df) / df["close"].replace(0, np.nan)
-        return _rolling_op(norm_tr, window, "mean")
+    def atr_normalized_factor(df: pd.DataFrame, window: int = window, ctx=None) -> pd.Series:
+        return _batched_rolling(
+            _norm_true_range, df, window, "mean", ctx, "atr_normalized"
+        )
 
 
 # Volume momentum
 for window in WINDOWS:
     @_register_dynamic(f"volume_momentum_{window}d", ["volume"])
     def volume_momentum_factor(
-        df: pd.DataFrame, window: int = window
+        df: pd.DataFrame, window: int = window, ctx=None
     ) -> pd.Series:
         return df.groupby(level="code")["volume"].pct_change(window)
 
@@ -163,18 +359,17 @@ for window in WINDOWS:
 # Volume z-score within window
 for window in WINDOWS:
     @_register_dynamic(f"volume_zscore_{window}d", ["volume"])
-    def volume_zscore_factor(df: pd.DataFrame, window: int = window) -> pd.Series:
-        volume = df["volume"]
-        mean = _rolling_op(volume, window, "mean")
-        std = _rolling_op(volume, window, "std")
-        return (volume - mean) / std.replace(0, np.nan)
+    def volume_zscore_factor(df: pd.DataFrame, window: int = window, ctx=None) -> pd.Series:
+        mean = _batched_rolling(_volume, df, window, "mean", ctx, "volume_zscore")
+        std = _batched_rolling(_volume, df, window, "std", ctx, "volume_zscore")
+        return (df["volume"] - mean) / _nonzero(std)
 
 
 # Amount momentum
 for window in WINDOWS:
     @_register_dynamic(f"amount_momentum_{window}d", ["amount"])
     def amount_momentum_factor(
-        df: pd.DataFrame, window: int = window
+        df: pd.DataFrame, window: int = window, ctx=None
     ) -> pd.Series:
         return df.groupby(level="code")["amount"].pct_change(window)
 
@@ -185,10 +380,11 @@ for window in WINDOWS:
         f"turnover_float_mean_{window}d", ["amount", "market_cap_float"]
     )
     def turnover_float_mean_factor(
-        df: pd.DataFrame, window: int = window
+        df: pd.DataFrame, window: int = window, ctx=None
     ) -> pd.Series:
-        turnover = df["amount"] / df["market_cap_float"].replace(0, np.nan)
-        return _rolling_op(turnover, window, "mean")
+        return _batched_rolling(
+            _turnover_float, df, window, "mean", ctx, "turnover_float_mean"
+        )
 
 
 # Mean total turnover by value
@@ -197,78 +393,78 @@ for window in WINDOWS:
         f"turnover_total_mean_{window}d", ["amount", "market_cap_total"]
     )
     def turnover_total_mean_factor(
-        df: pd.DataFrame, window: int = window
+        df: pd.DataFrame, window: int = window, ctx=None
     ) -> pd.Series:
-        turnover = df["amount"] / df["market_cap_total"].replace(0, np.nan)
-        return _rolling_op(turnover, window, "mean")
+        return _batched_rolling(
+            _turnover_total, df, window, "mean", ctx, "turnover_total_mean"
+        )
 
 
 # Money flow bias using intraday return and amount
 for window in WINDOWS:
     @_register_dynamic(f"money_flow_balance_{window}d", ["open", "close", "amount"])
     def money_flow_balance_factor(
-        df: pd.DataFrame, window: int = window
+        df: pd.DataFrame, window: int = window, ctx=None
     ) -> pd.Series:
-        intraday = (df["close"] - df["open"]) / df["open"].replace(0, np.nan)
-        money_flow = intraday * df["amount"]
-        return _rolling_op(money_flow, window, "sum")
+        return _batched_rolling(
+            _money_flow, df, window, "sum", ctx, "money_flow_balance"
+        )
 
 
 # Correlation between return and volume change
 for window in WINDOWS:
     @_register_dynamic(f"return_volume_corr_{window}d", ["close", "volume"])
     def return_volume_corr_factor(
-        df: pd.DataFrame, window: int = window
+        df: pd.DataFrame, window: int = window, ctx=None
     ) -> pd.Series:
-        ret = df.groupby(level="code")["close"].pct_change()
-        vol_chg = df.groupby(level="code")["volume"].pct_change()
-        return _rolling_corr(ret, vol_chg, window)
+        ret = _daily_ret(df, ctx)
+        vol_chg = _shared(
+            ctx, "volume_chg", lambda: df.groupby(level="code")["volume"].pct_change()
+        )
+        return _rolling_corr(ret, vol_chg, window, ctx)
 
 
 # Mean absolute return
 for window in WINDOWS:
     @_register_dynamic(f"abs_return_mean_{window}d", ["close"])
     def abs_return_mean_factor(
-        df: pd.DataFrame, window: int = window
+        df: pd.DataFrame, window: int = window, ctx=None
     ) -> pd.Series:
-        ret = df.groupby(level="code")["close"].pct_change().abs()
-        return _rolling_op(ret, window, "mean")
+        return _batched_rolling(_abs_ret, df, window, "mean", ctx, "abs_return_mean")
 
 
 # Share of upside moves
 for window in WINDOWS:
     @_register_dynamic(f"upside_return_share_{window}d", ["close"])
     def upside_return_share_factor(
-        df: pd.DataFrame, window: int = window
+        df: pd.DataFrame, window: int = window, ctx=None
     ) -> pd.Series:
-        ret = df.groupby(level="code")["close"].pct_change()
-        pos = ret.clip(lower=0)
-        abs_ret = ret.abs()
-        pos_sum = _rolling_op(pos, window, "sum")
-        abs_sum = _rolling_op(abs_ret, window, "sum")
-        return pos_sum / abs_sum.replace(0, np.nan)
+        pos_sum = _batched_rolling(
+            _pos_ret, df, window, "sum", ctx, "upside_return_share"
+        )
+        abs_sum = _shared_rolling(_abs_ret, df, window, "sum", ctx)
+        return pos_sum / _nonzero(abs_sum)
 
 
 # Share of downside moves
 for window in WINDOWS:
     @_register_dynamic(f"downside_return_share_{window}d", ["close"])
     def downside_return_share_factor(
-        df: pd.DataFrame, window: int = window
+        df: pd.DataFrame, window: int = window, ctx=None
     ) -> pd.Series:
-        ret = df.groupby(level="code")["close"].pct_change()
-        neg = ret.clip(upper=0).abs()
-        abs_ret = ret.abs()
-        neg_sum = _rolling_op(neg, window, "sum")
-        abs_sum = _rolling_op(abs_ret, window, "sum")
-        return neg_sum / abs_sum.replace(0, np.nan)
+        neg_sum = _batched_rolling(
+            _neg_ret, df, window, "sum", ctx, "downside_return_share"
+        )
+        abs_sum = _shared_rolling(_abs_ret, df, window, "sum", ctx)
+        return neg_sum / _nonzero(abs_sum)
 
 
 # Rolling drawdown from local highs
 for window in WINDOWS:
     @_register_dynamic(f"drawdown_{window}d", ["close"])
-    def drawdown_factor(df: pd.DataFrame, window: int = window) -> pd.Series:
+    def drawdown_factor(df: pd.DataFrame, window: int = window, ctx=None) -> pd.Series:
         close = df["close"]
-        roll_max = _rolling_op(close, window, "max")
+        roll_max = _rolling_op(close, window, "max", ctx)
         return close / roll_max - 1
 
 
@@ -276,10 +472,10 @@ for window in WINDOWS:
 for window in WINDOWS:
     @_register_dynamic(f"rebound_strength_{window}d", ["close"])
     def rebound_strength_factor(
-        df: pd.DataFrame, window: int = window
+        df: pd.DataFrame, window: int = window, ctx=None
     ) -> pd.Series:
         close = df["close"]
-        roll_min = _rolling_op(close, window, "min")
+        roll_min = _rolling_op(close, window, "min", ctx)
         return close / roll_min - 1
 
 
@@ -287,42 +483,36 @@ for window in WINDOWS:
 for window in WINDOWS:
     @_register_dynamic(f"gap_return_mean_{window}d", ["open", "close"])
     def gap_return_mean_factor(
-        df: pd.DataFrame, window: int = window
+        df: pd.DataFrame, window: int = window, ctx=None
     ) -> pd.Series:
-        prev_close = df.groupby(level="code")["close"].shift(1)
-        gap = (df["open"] - prev_close) / prev_close.replace(0, np.nan)
-        return _rolling_op(gap, window, "mean")
+        return _batched_rolling(_gap, df, window, "mean", ctx, "gap_return_mean")
 
 
 # Gap volatility
 for window in WINDOWS:
     @_register_dynamic(f"gap_volatility_{window}d", ["open", "close"])
     def gap_volatility_factor(
-        df: pd.DataFrame, window: int = window
+        df: pd.DataFrame, window: int = window, ctx=None
     ) -> pd.Series:
-        prev_close = df.groupby(level="code")["close"].shift(1)
-        gap = (df["open"] - prev_close) / prev_close.replace(0, np.nan)
-        return _rolling_op(gap, window, "std")
+        return _batched_rolling(_gap, df, window, "std", ctx, "gap_volatility")
 
 
 # Frequency of limit-up events
 for window in WINDOWS:
     @_register_dynamic(f"limit_up_rate_{window}d", ["limit_status"])
     def limit_up_rate_factor(
-        df: pd.DataFrame, window: int = window
+        df: pd.DataFrame, window: int = window, ctx=None
     ) -> pd.Series:
-        limit_up = (df["limit_status"] == 1).astype(float)
-        return _rolling_op(limit_up, window, "mean")
+        return _batched_rolling(_limit_up, df, window, "mean", ctx, "limit_up_rate")
 
 
 # Frequency of limit-down events
 for window in WINDOWS:
     @_register_dynamic(f"limit_down_rate_{window}d", ["limit_status"])
     def limit_down_rate_factor(
-        df: pd.DataFrame, window: int = window
+        df: pd.DataFrame, window: int = window, ctx=None
     ) -> pd.Series:
-        limit_down = (df["limit_status"] == -1).astype(float)
-        return _rolling_op(limit_down, window, "mean")
+        return _batched_rolling(_limit_down, df, window, "mean", ctx, "limit_down_rate")
 
 
 # Return-weighted limit behavior
@@ -331,33 +521,33 @@ for window in WINDOWS:
         f"limit_return_impact_{window}d", ["close", "limit_status"]
     )
     def limit_return_impact_factor(
-        df: pd.DataFrame, window: int = window
+        df: pd.DataFrame, window: int = window, ctx=None
     ) -> pd.Series:
-        ret = df.groupby(level="code")["close"].pct_change()
-        weighted = ret * df["limit_status"]
-        return _rolling_op(weighted, window, "sum")
+        return _batched_rolling(
+            _limit_weighted_ret, df, window, "sum", ctx, "limit_return_impact"
+        )
 
 
 # Upper shadow proportion
 for window in WINDOWS:
     @_register_dynamic(f"upper_shadow_mean_{window}d", ["open", "high", "close"])
     def upper_shadow_mean_factor(
-        df: pd.DataFrame, window: int = window
+        df: pd.DataFrame, window: int = window, ctx=None
     ) -> pd.Series:
-        body_high = df[["open", "close"]].max(axis=1)
-        upper_shadow = (df["high"] - body_high) / df["close"].replace(0, np.nan)
-        return _rolling_op(upper_shadow, window, "mean")
+        return _batched_rolling(
+            _upper_shadow, df, window, "mean", ctx, "upper_shadow_mean"
+        )
 
 
 # Lower shadow proportion
 for window in WINDOWS:
     @_register_dynamic(f"lower_shadow_mean_{window}d", ["open", "low", "close"])
     def lower_shadow_mean_factor(
-        df: pd.DataFrame, window: int = window
+        df: pd.DataFrame, window: int = window, ctx=None
     ) -> pd.Series:
-        body_low = df[["open", "close"]].min(axis=1)
-        lower_shadow = (body_low - df["low"]) / df["close"].replace(0, np.nan)
-        return _rolling_op(lower_shadow, window, "mean")
+        return _batched_rolling(
+            _lower_shadow, df, window, "mean", ctx, "lower_shadow_mean"
+        )
 
 
 # Body-to-range ratio
@@ -366,9 +556,8 @@ for window in WINDOWS:
         f"body_range_ratio_mean_{window}d", ["open", "high", "low", "close"]
     )
     def body_range_ratio_mean_factor(
-        df: pd.DataFrame, window: int = window
+        df: pd.DataFrame, window: int = window, ctx=None
     ) -> pd.Series:
-        body = (df["close"] - df["open"]).abs()
-        range_span = (df["high"] - df["low"]).replace(0, np.nan)
-        ratio = body / range_span
-        return _rolling_op(ratio, window, "mean")
+        return _batched_rolling(
+            _body_range_ratio, df, window, "mean", ctx, "body_range_ratio_mean"
+        )
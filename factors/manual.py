@@ -13,11 +13,25 @@ from factor_engine import register_factor
     force_update=True,
 )
 def liquidity_momentum_deviation_factor(df: pd.DataFrame) -> pd.Series:
-    def cal(g) -> pd.Series:
-        mean = ((np.log(g["close"] / g["open"])) * g["amount"]).median()
-        up_power =  ((np.log(g["close"] / g["open"])) * g["amount"] - mean) ** 2
-        return up_power
-    
-    factor = df.groupby("date").apply(cal)
-    factor.index = factor.index.droplevel(0)
-    return factor
\ No newline at end of file
+    # 每日截面：x = log(close / open) * amount，因子为 x 与当日 x 中位数之差的平方
+    # 全部日期一次向量化计算：按 (date, x) 排序后，每个日期是一段连续区间，直接取段内中位数
+    x = np.log(df["close"].to_numpy(dtype=np.float64) / df["open"].to_numpy(dtype=np.float64))
+    x *= df["amount"].to_numpy(dtype=np.float64)
+
+    index = df.index
+    date_codes = np.asarray(index.codes[index.names.index("date")])
+    n_dates = len(index.levels[index.names.index("date")])
+
+    order = np.lexsort((x, date_codes))  # 同一日期内 NaN 排在末尾
+    sorted_x = x[order]
+    starts = np.zeros(n_dates, dtype=np.int64)
+    np.cumsum(np.bincount(date_codes, minlength=n_dates)[:-1], out=starts[1:])
+    valid = np.bincount(date_codes, weights=~np.isnan(x), minlength=n_dates).astype(np.int64)
+
+    median = np.full(n_dates, np.nan)
+    has = valid > 0
+    lo = starts[has] + (valid[has] - 1) // 2
+    hi = starts[has] + valid[has] // 2
+    median[has] = (sorted_x[lo] + sorted_x[hi]) / 2.0
+
+    return pd.Series((x - median[date_codes]) ** 2, index=index)
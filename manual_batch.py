@@ -1,4 +1,7 @@
 # 导入所有手动挖的因子
+import os
+from concurrent.futures import ProcessPoolExecutor
+
 import factors.manual  # noqa: F401
 # 注册自定义因子
 try:
@@ -6,13 +9,28 @@ try:
 except ImportError:
     pass
 
-from factor_engine import list_factors
+from factor_engine import list_factors, FactorSpec
 
 from app import get_factor_library
 factor_lib = get_factor_library()
 
+# 并行入库的最大进程数（各因子的 meta.json / func 写入相互独立）
+MAX_WORKERS = 8
+
+
+def _admit_one(spec: FactorSpec) -> str:
+    """子进程中入库单个因子（因子库实例按配置在子进程内获取）"""
+    get_factor_library().manual_admit(spec)
+    return spec.name
+
+
 # 批量注册因子
 if __name__ == "__main__":
-    all_factors = list_factors()
-    for factor in all_factors:
-        factor_lib.manual_admit(factor)
\ No newline at end of file
+    all_factors = list(list_factors())
+    max_workers = min(MAX_WORKERS, os.cpu_count() or 1, len(all_factors))
+    if max_workers > 1:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            list(executor.map(_admit_one, all_factors))
+    else:
+        for factor in all_factors:
+            factor_lib.manual_admit(factor)
@@ -22,5 +22,6 @@ setup(
     ],
     extras_require={
         "notebook": ["ipywidgets>=7.6.0", "jupyter>=1.0.0"],
+        "fast": ["orjson>=3.6.0"],
     },
 )
\ No newline at end of file
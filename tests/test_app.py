@@ -0,0 +1,20 @@
+import os
+
+from app import AppConfig
+
+
+def test_load_config_picks_up_edits_and_returns_copies(tmp_path):
+    config_path = tmp_path / "config.yaml"
+    config_path.write_text("storage:\n  base_dir: a\n", encoding="utf-8")
+    first = AppConfig.load_config(config_path)
+    first["storage"]["base_dir"] = "mutated"
+
+    assert AppConfig.load_config(config_path)["storage"]["base_dir"] == "a"
+
+    # 内容和修改时间都变化（同一时间戳内的编辑由文件大小区分）
+    config_path.write_text("storage:\n  base_dir: bb\n", encoding="utf-8")
+    stat = config_path.stat()
+    os.utime(config_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+
+    assert AppConfig.load_config(config_path)["storage"]["base_dir"] == "bb"
+    AppConfig.reset()
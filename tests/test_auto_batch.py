@@ -0,0 +1,36 @@
+import pytest
+
+import auto_batch
+from app import AppConfig
+
+
+@pytest.fixture
+def isolated_library(tmp_path):
+    """指向临时目录的因子库配置，测试结束后恢复全局单例与日志配置"""
+    config_path = tmp_path / "config.yaml"
+    config_path.write_text(
+        'storage:\n  base_dir: "./factor_store"\n  is_absolute: true\n',
+        encoding="utf-8",
+    )
+    AppConfig.reset()
+    AppConfig.create_factor_library(config_path)
+
+    handlers = list(auto_batch.logger.handlers)
+    level, propagate = auto_batch.logger.level, auto_batch.logger.propagate
+    yield tmp_path
+
+    auto_batch.logger.handlers = handlers
+    auto_batch.logger.setLevel(level)
+    auto_batch.logger.propagate = propagate
+    AppConfig.reset()
+
+
+def test_init_prints_hash_record_summary_once(isolated_library, capsys):
+    auto_batch._configure_logging("INFO")
+
+    auto_batch.AutoFactorProcessor(
+        hash_record_path=str(isolated_library / "hash_records.json"),
+    )
+
+    out = capsys.readouterr().out
+    assert out.count("Hash 记录:") == 1
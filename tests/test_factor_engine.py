@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import factors.auto as auto
+from factor_engine import FactorEngine
+
+FAMILY = [f"range_mean_{w}d" for w in auto.WINDOWS]
+
+
+@pytest.fixture
+def ohlc():
+    """3 只股票 80 个交易日的随机 OHLC 行情，MultiIndex(date, code)"""
+    rng = np.random.default_rng(0)
+    index = pd.MultiIndex.from_product(
+        [pd.date_range("2024-01-01", periods=80), ["a", "b", "c"]],
+        names=["date", "code"],
+    )
+    close = 10 + rng.random(len(index))
+    return pd.DataFrame(
+        {
+            "high": close + rng.random(len(index)),
+            "low": close - rng.random(len(index)),
+            "close": close,
+        },
+        index=index,
+    )
+
+
+@pytest.fixture
+def multi_calls(monkeypatch):
+    """记录 group_rolling_multi 每次调用的窗口"""
+    calls = []
+    original = auto.group_rolling_multi
+
+    def spy(s, windows, method, **kwargs):
+        calls.append(tuple(windows))
+        return original(s, windows, method, **kwargs)
+
+    monkeypatch.setattr(auto, "group_rolling_multi", spy)
+    return calls
+
+
+def test_compute_one_computes_only_its_own_window(ohlc, multi_calls):
+    FactorEngine().compute_one(ohlc, "range_mean_5d")
+
+    assert multi_calls == []
+
+
+def test_compute_all_batches_only_queued_windows(ohlc, multi_calls):
+    engine = FactorEngine()
+    queued = FAMILY[:2]
+
+    batched = engine.compute_all(ohlc, queued)
+
+    assert multi_calls == [tuple(auto.WINDOWS[:2])]
+    for name in queued:
+        expected = engine.compute_one(ohlc, name)
+        np.testing.assert_allclose(
+            batched[name].to_numpy(), expected.to_numpy(), rtol=1e-10
+        )